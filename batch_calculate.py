@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+离职员工剩余年假计算器
+批量计算入口
+
+用法:
+    python batch_calculate.py 离职名单.csv -o 计算结果.xlsx -w 8
+    python batch_calculate.py 离职名单.csv --profile run    # 剖析全部计算，汇总输出到 logs/profiles/
+
+输入文件为CSV或XLSX，包含“姓名”和“离职日期”两列（无表头时取前两列）。
+结果文件格式由扩展名决定，支持 CSV、JSONL 和 XLSX。
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# 添加src目录到Python路径
+current_dir = Path(__file__).parent
+src_dir = current_dir / "src"
+sys.path.insert(0, str(src_dir))
+
+from main import add_profile_argument, enable_profiling, setup_logging
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批量计算离职员工剩余年假")
+    parser.add_argument("input", help="输入文件路径（CSV 或 XLSX）")
+    parser.add_argument("-o", "--output",
+                        help="结果输出路径（.csv/.jsonl/.xlsx），默认为 <输入文件名>_结果.csv")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="最大并发线程数，默认读取 BATCH_MAX_WORKERS 配置")
+    add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+
+def write_report(report, output_path: Path) -> None:
+    """将批量计算结果流式写入结果文件"""
+    from business.exporter import BATCH_COLUMNS, ResultExporter, batch_row
+
+    ResultExporter(BATCH_COLUMNS).export((batch_row(r) for r in report.results), str(output_path))
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    enable_profiling(args.profile)
+    setup_logging()
+    logger = logging.getLogger(__name__)
+
+    from business.controller import BusinessController
+    from business.batch_processor import BatchProcessor
+    from business.exporter import detect_format
+
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_结果.csv")
+
+    # 在计算前检查输出格式，避免算完才发现无法写出
+    try:
+        detect_format(str(output_path))
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+    controller = BusinessController()
+    try:
+        items = BatchProcessor(controller).read_input(str(input_path))
+    except (OSError, ValueError) as e:
+        logger.error(f"读取输入文件失败: {e}")
+        return 1
+
+    if not items:
+        logger.warning("输入文件中没有待计算的数据")
+        return 0
+
+    report = controller.process_batch_calculation(items, max_workers=args.workers)
+    write_report(report, output_path)
+    if controller.profiler is not None:
+        controller.profiler.flush()
+
+    print(f"\n✅ 批量计算完成: 共 {len(report.results)} 行, 成功 {report.success_count}, 失败 {report.failure_count}")
+    print(f"   总耗时: {report.total_seconds:.2f} 秒, 吞吐: {report.throughput:.1f} 行/秒")
+    print(f"   单行耗时: P50 {report.latency_percentile(50):.0f}ms, "
+          f"P95 {report.latency_percentile(95):.0f}ms, 最大 {report.latency_percentile(100):.0f}ms")
+    print(f"   结果文件: {output_path}")
+    return 0 if report.failure_count == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+性能测试工具包
+
+包含本地企业微信API模拟器，用于在不访问 qyapi.weixin.qq.com 的情况下压测完整计算流程。
+"""
+import sys
+from pathlib import Path
+
+# 与 main.py 一致，将 src 目录加入 Python 路径
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
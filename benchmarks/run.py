@@ -0,0 +1,97 @@
+"""
+基准测试入口
+
+用法:
+    python -m benchmarks.run                                # 运行全部用例并与基线比较
+    python -m benchmarks.run --sizes 1000,10000 -k parse    # 只运行名称包含 parse 的用例
+    python -m benchmarks.run --update-baseline              # 以本次结果覆盖基线
+
+存在超过阈值的性能回退时以退出码1结束，便于在CI中使用。
+"""
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+from .suite import DEFAULT_SIZES, DEFAULT_THRESHOLD, build_cases, compare, run_cases
+
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "latest.json"
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.3f}µs"
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="离职年假计算器基准测试")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="按组织规模参数化的用例所使用的规模，逗号分隔")
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的用例")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="结果JSON文件路径")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线JSON文件路径")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="允许的中位数耗时增幅，0.25 表示 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="以本次结果覆盖基线")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    args = parse_args(argv)
+    # 计算流程中的INFO/WARNING日志会干扰计时
+    logging.basicConfig(level=logging.ERROR)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    cases = [case for case in build_cases(sizes) if args.filter in case.name]
+    if not cases:
+        print(f"没有匹配 '{args.filter}' 的用例")
+        return 1
+
+    def on_result(name, result):
+        print(f"{name:<60} {_format_seconds(result['median']):>12}  {result['items_per_second']:>14,.0f} 条/秒")
+
+    print(f"运行 {len(cases)} 个用例...")
+    current = run_cases(cases, on_result)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n📄 结果已写入: {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📌 基线已更新: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"⚠️ 基线文件不存在: {baseline_path}，使用 --update-baseline 生成")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    comparisons = compare(current, baseline, args.threshold)
+    regressions = [item for item in comparisons if item["regressed"]]
+
+    print(f"\n与基线比较 ({baseline.get('meta', {}).get('created_at', '未知时间')}):")
+    for item in comparisons:
+        flag = "❌" if item["regressed"] else "✅"
+        print(f"{flag} {item['name']:<58} {item['ratio']:>6.2f}x  (阈值 {1 + item['threshold']:.2f}x)")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} 个用例性能回退超过阈值")
+        return 1
+    print("\n✅ 未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+HTTP服务压测
+
+在进程内启动HTTP服务（企业微信接口使用进程内模拟API），由多个客户端线程通过长连接
+并发调用 /calculate，统计吞吐量与延迟分布。
+
+用法:
+    python -m benchmarks.server_load                          # 16个客户端，持续10秒
+    python -m benchmarks.server_load -c 64 -d 30 --workers 64
+    python -m benchmarks.server_load --min-rps 200            # 吞吐低于200请求/秒时以退出码1结束
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import statistics
+import http.client
+from typing import Dict, List
+
+from .suite import PIPELINE_ORG_SIZE, _make_service
+
+from business.controller import BusinessController
+from server.http_server import LeaveCalculatorServer
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _client(host: str, port: int, names: List[str], offset: int, stop_at: float,
+            latencies: List[float], errors: List[str]) -> None:
+    """单个客户端：在一条长连接上循环发送请求，直到截止时间"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    i = offset
+    try:
+        while time.perf_counter() < stop_at:
+            body = json.dumps({"employee_name": names[i % len(names)], "resignation_date": "2025-06-30"})
+            i += 1
+            started = time.perf_counter()
+            try:
+                connection.request("POST", "/calculate", body=body.encode("utf-8"), headers=headers)
+                response = connection.getresponse()
+                payload = json.loads(response.read())
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+                connection.close()
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status != 200 or not payload.get("success"):
+                errors.append(payload.get("error") or payload.get("error_message") or str(response.status))
+    finally:
+        connection.close()
+
+
+def run_load(clients: int = 16, duration: float = 10.0, workers: int = 32,
+             org_size: int = PIPELINE_ORG_SIZE) -> Dict[str, float]:
+    """
+    执行压测
+
+    Args:
+        clients: 并发客户端数（每个客户端一条长连接）
+        duration: 持续时间（秒）
+        workers: 服务端最大并发请求数
+        org_size: 模拟组织的员工数
+
+    Returns:
+        dict: 请求数、错误数、吞吐量及延迟分位数（毫秒）
+    """
+    # _make_service 会关闭计算历史记录，压测不写入本地数据库
+    service, api = _make_service(org_size)
+    controller = BusinessController()
+    controller._wechat_service = service
+
+    server = LeaveCalculatorServer(controller, port=0, max_workers=workers)
+    server.warm_up()
+    server.start()
+    host, port = server.address
+    names = [user["name"] for user in api.org.userlist[:1000]]
+
+    latencies: List[List[float]] = [[] for _ in range(clients)]
+    errors: List[str] = []
+    started = time.perf_counter()
+    stop_at = started + duration
+    threads = [
+        threading.Thread(target=_client, args=(host, port, names, i * 37, stop_at, latencies[i], errors))
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    merged = [value for values in latencies for value in values]
+    return {
+        "clients": clients,
+        "workers": workers,
+        "requests": len(merged),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(merged) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(merged, 50),
+        "p95_ms": _percentile(merged, 95),
+        "p99_ms": _percentile(merged, 99),
+        "mean_ms": statistics.fmean(merged) if merged else 0.0
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP服务压测")
+    parser.add_argument("-c", "--clients", type=int, default=16, help="并发客户端数")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="持续时间（秒）")
+    parser.add_argument("-w", "--workers", type=int, default=32, help="服务端最大并发请求数")
+    parser.add_argument("--org-size", type=int, default=PIPELINE_ORG_SIZE, help="模拟组织的员工数")
+    parser.add_argument("--min-rps", type=float, default=0.0, help="吞吐量下限，低于该值时以退出码1结束")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+
+    result = run_load(args.clients, args.duration, args.workers, args.org_size)
+    print(f"请求数: {result['requests']}  错误: {result['errors']}  耗时: {result['seconds']:.1f}s")
+    print(f"吞吐: {result['requests_per_second']:.0f} 请求/秒")
+    print(f"延迟: P50 {result['p50_ms']:.1f}ms  P95 {result['p95_ms']:.1f}ms  "
+          f"P99 {result['p99_ms']:.1f}ms  平均 {result['mean_ms']:.1f}ms")
+
+    if result["errors"]:
+        return 1
+    if args.min_rps and result["requests_per_second"] < args.min_rps:
+        print(f"❌ 吞吐低于下限 {args.min_rps:.0f} 请求/秒")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+冷启动耗时报告
+
+在全新的解释器进程中（-X importtime）按 main.py 的启动顺序执行环境检查并创建主窗口，
+测量从进程启动到窗口显示的耗时，列出窗口显示前耗时最多的导入，并检查是否超出预算。
+
+用法:
+    python -m benchmarks.startup                     # 默认预算 1500ms，运行3次取中位数
+    python -m benchmarks.startup --budget-ms 800 --top 20 -o startup.json
+    python -m benchmarks.startup --headless          # 无显示环境（CI）中只测量到主窗口模块导入完成
+
+超出预算时以退出码1结束；环境检查或窗口创建失败时以退出码2结束。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1500.0
+RESULT_MARKER = "@@startup-result@@"
+SHOWN_MARKER = "@@window-shown@@"
+
+# 子进程中执行的启动流程，与 main.main() 一致（不配置日志文件、不进入主循环、不创建 .env 文件）
+CHILD_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+import main
+if not main.check_environment(create_env_file=False):
+    print({result!r} + json.dumps({{"error": "环境检查失败"}}), flush=True)
+    sys.exit(2)
+from gui.main_window import MainWindow
+if {headless!r}:
+    shown = time.time()
+    sys.stderr.write({shown!r} + "\\n")
+else:
+    app = MainWindow()
+    app.root.update()
+    shown = time.time()
+    sys.stderr.write({shown!r} + "\\n")
+    app.root.destroy()
+print({result!r} + json.dumps({{"shown_at": shown}}), flush=True)
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    解析 -X importtime 输出
+
+    Args:
+        stderr: 子进程的标准错误输出
+
+    Returns:
+        list: 每个导入的 {"module", "self_us", "cumulative_us", "depth"}，按输出顺序排列
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        name = parts[2][1:]  # 去掉分隔符后的一个空格，其余缩进表示嵌套层级
+        stripped = name.lstrip(" ")
+        entries.append({
+            "module": stripped,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(stripped)) // 2
+        })
+    return entries
+
+
+def run_once(headless: bool = False) -> Dict:
+    """
+    启动一次子进程并测量
+
+    Returns:
+        dict: window_ms（进程启动到窗口显示）、import_ms（窗口显示前的导入总耗时）及导入明细；
+              失败时包含 error
+    """
+    script = CHILD_SCRIPT.format(root=str(PROJECT_ROOT), result=RESULT_MARKER,
+                                 shown=SHOWN_MARKER, headless=headless)
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env=dict(os.environ, PYTHONIOENCODING="utf-8")
+    )
+
+    result: Optional[Dict] = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if result is None:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        return {"error": f"子进程异常退出 (退出码 {proc.returncode}):\n{tail}"}
+    if "error" in result:
+        return result
+
+    # 只统计窗口显示前完成的导入（之后为后台预加载等）
+    before_shown = proc.stderr.split(SHOWN_MARKER, 1)[0]
+    imports = parse_importtime(before_shown)
+    return {
+        "window_ms": (result["shown_at"] - started) * 1000,
+        "import_ms": sum(item["cumulative_us"] for item in imports if item["depth"] == 0) / 1000,
+        "imports": imports
+    }
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="冷启动耗时报告")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="进程启动到窗口显示的耗时预算（毫秒）")
+    parser.add_argument("--runs", type=int, default=3, help="运行次数，取中位数")
+    parser.add_argument("--top", type=int, default=15, help="列出耗时最多的顶层导入数")
+    parser.add_argument("--headless", action="store_true", help="不创建窗口，只测量到主窗口模块导入完成")
+    parser.add_argument("-o", "--output", help="结果JSON文件路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    args = parse_args(argv)
+    runs = []
+    for i in range(args.runs):
+        run = run_once(headless=args.headless)
+        if "error" in run:
+            print(f"❌ 第{i + 1}次启动失败: {run['error']}")
+            return 2
+        runs.append(run)
+        print(f"第{i + 1}次: 窗口显示 {run['window_ms']:.0f}ms, 其中导入 {run['import_ms']:.0f}ms")
+
+    window_ms = statistics.median(run["window_ms"] for run in runs)
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    target = "主窗口模块导入完成" if args.headless else "窗口显示"
+
+    # 以中位数那次运行的导入明细为准
+    representative = min(runs, key=lambda run: abs(run["window_ms"] - window_ms))
+    top_level = sorted(
+        (item for item in representative["imports"] if item["depth"] == 0),
+        key=lambda item: item["cumulative_us"],
+        reverse=True
+    )[:args.top]
+
+    print(f"\n{target}前耗时最多的顶层导入:")
+    for item in top_level:
+        print(f"  {item['cumulative_us'] / 1000:>8.1f}ms  {item['module']}")
+
+    print(f"\n进程启动到{target}: {window_ms:.0f}ms (中位数，预算 {args.budget_ms:.0f}ms)")
+    print(f"其中模块导入: {import_ms:.0f}ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "budget_ms": args.budget_ms,
+            "headless": args.headless,
+            "window_ms": window_ms,
+            "import_ms": import_ms,
+            "runs": [{"window_ms": run["window_ms"], "import_ms": run["import_ms"]} for run in runs],
+            "top_imports": top_level
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if window_ms > args.budget_ms:
+        print(f"❌ 超出冷启动预算 {window_ms - args.budget_ms:.0f}ms")
+        return 1
+    print("✅ 冷启动耗时在预算内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+基准测试用例与计时工具
+
+每个用例由 setup 函数构建，setup 完成数据准备（不计时）并返回被测的无参函数。
+结果以每次调用耗时（秒）的中位数为准，与基线比较时超过阈值即视为性能回退。
+"""
+import os
+import json
+import timeit
+import platform
+import statistics
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .wechat_simulator import SimulatorConfig, SimulatedWeChatAPI, SyntheticOrg
+from .transport import install
+
+from models import LeaveBalance
+from business.controller import BusinessController
+from business.leave_calculator import LeaveCalculator
+from services.config_service import ConfigService
+from services.employee_table import EmployeeTable
+from services.wechat_service import WeChatWorkService
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.25
+# 端到端用例使用的组织规模
+PIPELINE_ORG_SIZE = 10000
+# 大量分配对象、受GC和内存分配影响波动较大的用例使用的阈值
+NOISY_THRESHOLD = 0.5
+# 余额缓存命中用例轮流计算的员工数，全部预热后每次计算都命中缓存
+CACHED_NAME_COUNT = 20
+# 员工表查找用例每次调用的查找次数
+LOOKUP_COUNT = 1000
+SIMULATED_BASE_URL = "http://wechat.simulator"
+
+
+@dataclass
+class BenchmarkCase:
+    """基准测试用例"""
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    # 每次调用处理的条目数，用于计算吞吐量
+    items: int = 1
+    repeat: int = 5
+    # 单独的回退阈值，写入结果后随 --update-baseline 保存到基线；为None时使用全局阈值
+    threshold: Optional[float] = None
+
+
+def configure_environment() -> None:
+    """
+    将企业微信配置指向模拟API
+
+    同时关闭跨进程token文件缓存、客户端限流和计算历史记录：只测量客户端自身开销，
+    也不向本地 logs/history.db 写入合成数据。
+    """
+    os.environ.update({
+        "WECHAT_CORP_ID": "bench-corp",
+        "WECHAT_CORP_SECRET": "bench-secret",
+        "WECHAT_AGENT_ID": "1000001",
+        "WECHAT_BASE_URL": SIMULATED_BASE_URL,
+        "TOKEN_CACHE_FILE": "",
+        "RATE_LIMIT_ENABLED": "false",
+        "HISTORY_ENABLED": "false"
+    })
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, items: int = 1) -> Dict[str, float]:
+    """
+    测量函数耗时
+
+    每轮的调用次数由 timeit 自动确定（单轮至少约0.2秒），共执行 repeat 轮。
+
+    Args:
+        func: 被测函数
+        repeat: 轮数
+        items: 每次调用处理的条目数
+
+    Returns:
+        dict: 每次调用耗时的最小值/中位数/最大值（秒）及每秒处理条目数
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(per_call)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "items": items,
+        "min": min(per_call),
+        "median": median,
+        "max": max(per_call),
+        "items_per_second": items / median if median else 0.0
+    }
+
+
+def _sample_balance() -> LeaveBalance:
+    return LeaveBalance(used_hours=40.0, remaining_hours=80.0, theoretical_hours=120.0, year=2025)
+
+
+def _make_service(org_size: int) -> tuple:
+    """创建挂载了模拟API的企业微信服务"""
+    configure_environment()
+    api = SimulatedWeChatAPI(SimulatorConfig(users=org_size))
+    service = WeChatWorkService(ConfigService())
+    install(service, api)
+    return service, api
+
+
+def calculator_cases() -> List[BenchmarkCase]:
+    """年假计算器用例"""
+    def remaining_leave():
+        calculator = LeaveCalculator()
+        balance = _sample_balance()
+        resignation_date = date(2025, 6, 30)
+        return lambda: calculator.calculate_remaining_leave(balance, resignation_date)
+
+    def time_ratio():
+        calculator = LeaveCalculator()
+        resignation_date = date(2025, 6, 30)
+        return lambda: calculator.calculate_time_ratio(resignation_date)
+
+    return [
+        BenchmarkCase("calculator.calculate_remaining_leave", remaining_leave),
+        BenchmarkCase("calculator.calculate_time_ratio", time_ratio)
+    ]
+
+
+def batch_calculator_case(size: int) -> BenchmarkCase:
+    """批量计算用例"""
+    def setup():
+        calculator = LeaveCalculator()
+        theoretical = [120.0] * size
+        used = [float(i % 80) for i in range(size)]
+        dates = [date(2025, 1 + i % 12, 1 + i % 28) for i in range(size)]
+        return lambda: calculator.calculate_remaining_leave_batch(theoretical, used, dates)
+
+    return BenchmarkCase(f"calculator.calculate_remaining_leave_batch[{size}]", setup, items=size, repeat=3)
+
+
+def user_list_case(size: int) -> BenchmarkCase:
+    """通讯录响应解析及索引构建用例"""
+    def setup():
+        service, _ = _make_service(0)
+        org = SyntheticOrg(size)
+        payload = json.dumps(
+            {"errcode": 0, "errmsg": "ok", "userlist": org.userlist}, ensure_ascii=False
+        ).encode("utf-8")
+
+        def parse():
+            result = service._handle_api_response(json.loads(payload))
+            service._directory.load(result["userlist"])
+
+        return parse
+
+    return BenchmarkCase(f"wechat.parse_user_list[{size}]", setup, items=size, repeat=3,
+                         threshold=NOISY_THRESHOLD)
+
+
+def directory_lookup_case(size: int) -> BenchmarkCase:
+    """员工表按姓名和userid查找用例（每次调用各查找 LOOKUP_COUNT 次）"""
+    def setup():
+        org = SyntheticOrg(size)
+        table = EmployeeTable(org.userlist)
+        step = max(1, size // LOOKUP_COUNT)
+        users = org.userlist[::step][:LOOKUP_COUNT]
+        names = [user["name"] for user in users]
+        user_ids = [user["userid"] for user in users]
+
+        def lookup():
+            for name in names:
+                table.rows_by_name(name)
+            for user_id in user_ids:
+                table.get_by_userid(user_id)
+
+        return lookup
+
+    return BenchmarkCase(f"directory.lookup[{size}]", setup, items=2 * LOOKUP_COUNT)
+
+
+def quota_case(size: int) -> BenchmarkCase:
+    """假期余额响应解析用例"""
+    def setup():
+        service, _ = _make_service(0)
+        org = SyntheticOrg(size)
+        table = EmployeeTable(org.userlist)
+        employees = [table.employee(row) for row in range(len(table))]
+        payloads = [
+            json.dumps(org.quota_payload(employee.user_id), ensure_ascii=False).encode("utf-8")
+            for employee in employees
+        ]
+        pairs = list(zip(employees, payloads))
+
+        def parse():
+            for employee, payload in pairs:
+                service._parse_leave_balance(employee, 2025, service._handle_api_response(json.loads(payload)))
+
+        return parse
+
+    return BenchmarkCase(f"wechat.parse_quota[{size}]", setup, items=size, repeat=3,
+                         threshold=NOISY_THRESHOLD)
+
+
+def pipeline_cases() -> List[BenchmarkCase]:
+    """端到端计算流程用例（进程内模拟传输）"""
+    def build(cold: bool):
+        def setup():
+            service, api = _make_service(PIPELINE_ORG_SIZE)
+            controller = BusinessController()
+            controller._wechat_service = service
+            # 命中用例只轮流计算少量员工，未命中用例每次计算前清空余额缓存
+            count = 1000 if cold else CACHED_NAME_COUNT
+            names = [user["name"] for user in api.org.userlist[:count]]
+            state = {"i": 0}
+            # 预热：拉取token和通讯录；命中用例同时缓存全部员工的余额
+            for name in (names[:1] if cold else names):
+                controller.process_leave_calculation(name, "2025-06-30")
+
+            def run():
+                name = names[state["i"] % len(names)]
+                state["i"] += 1
+                if cold:
+                    service.quota_cache.clear()
+                controller.process_leave_calculation(name, "2025-06-30")
+
+            return run
+        return setup
+
+    return [
+        BenchmarkCase("controller.process_leave_calculation.quota_cached", build(cold=False),
+                      threshold=NOISY_THRESHOLD),
+        BenchmarkCase("controller.process_leave_calculation.quota_uncached", build(cold=True),
+                      threshold=NOISY_THRESHOLD)
+    ]
+
+
+def build_cases(sizes: Sequence[int] = DEFAULT_SIZES) -> List[BenchmarkCase]:
+    """
+    构建全部用例
+
+    Args:
+        sizes: 按组织规模参数化的用例所使用的规模列表
+    """
+    cases = calculator_cases()
+    for size in sizes:
+        cases.append(batch_calculator_case(size))
+    for size in sizes:
+        cases.append(user_list_case(size))
+    for size in sizes:
+        cases.append(directory_lookup_case(size))
+    for size in sizes:
+        cases.append(quota_case(size))
+    cases.extend(pipeline_cases())
+    return cases
+
+
+def run_cases(
+    cases: Iterable[BenchmarkCase],
+    on_result: Optional[Callable[[str, Dict[str, float]], None]] = None
+) -> Dict[str, Any]:
+    """
+    依次执行用例
+
+    Args:
+        cases: 用例列表
+        on_result: 每个用例完成后的回调 (name, result)
+
+    Returns:
+        dict: 可直接写出为JSON的结果，包含运行环境信息
+    """
+    results = {}
+    for case in cases:
+        result = measure(case.setup(), repeat=case.repeat, items=case.items)
+        if case.threshold is not None:
+            result["threshold"] = case.threshold
+        results[case.name] = result
+        if on_result:
+            on_result(case.name, result)
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine()
+        },
+        "results": results
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    与基线比较
+
+    基线中的用例可以单独设置 threshold 字段覆盖全局阈值；基线中不存在的用例不参与比较。
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 允许的中位数耗时增幅（0.25 表示 25%）
+
+    Returns:
+        list: 每个参与比较的用例的比较结果，regressed 为 True 表示超过阈值
+    """
+    comparisons = []
+    baseline_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        base = baseline_results.get(name)
+        if not base or not base.get("median"):
+            continue
+        limit = base.get("threshold", threshold)
+        ratio = result["median"] / base["median"]
+        comparisons.append({
+            "name": name,
+            "baseline": base["median"],
+            "current": result["median"],
+            "ratio": ratio,
+            "threshold": limit,
+            "regressed": ratio > 1 + limit
+        })
+    return comparisons
@@ -0,0 +1,61 @@
+"""
+进程内模拟传输层
+
+将 requests 会话的请求直接交给 SimulatedWeChatAPI 处理，不经过套接字，
+用于在基准测试中隔离网络开销、只测量客户端自身的处理耗时。
+"""
+import json
+from urllib.parse import parse_qs, urlparse
+
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from .wechat_simulator import SimulatedWeChatAPI
+
+
+class SimulatorAdapter(BaseAdapter):
+    """把请求路由到进程内模拟API的 requests 传输适配器"""
+
+    def __init__(self, api: SimulatedWeChatAPI):
+        """
+        初始化适配器
+
+        Args:
+            api: 模拟API实例
+        """
+        super().__init__()
+        self.api = api
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> Response:
+        parsed = urlparse(request.url)
+        body = json.loads(request.body) if request.body else None
+        payload = self.api.handle(request.method, parsed.path, parse_qs(parsed.query), body)
+
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        response._content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def install(service, api: SimulatedWeChatAPI) -> SimulatorAdapter:
+    """
+    将企业微信服务的HTTP会话切换到模拟API
+
+    Args:
+        service: WeChatWorkService 实例
+        api: 模拟API实例
+
+    Returns:
+        SimulatorAdapter: 已挂载的适配器
+    """
+    adapter = SimulatorAdapter(api)
+    service._session.mount(service.config.base_url, adapter)
+    return adapter
@@ -0,0 +1,446 @@
+"""
+企业微信API本地模拟器
+
+实现 gettoken、user/list、oa/vacation/getuservacationquota 和 oa/getapprovaldata 四个接口，
+按配置生成任意规模的合成组织，并支持注入延迟、错误码（如 42001、45009）和可调的响应大小。
+
+用法:
+    python -m benchmarks.wechat_simulator --users 20000 --port 18080 --latency-ms 30
+    # 另一个终端中
+    WECHAT_BASE_URL=http://127.0.0.1:18080 python batch_calculate.py 离职名单.csv
+"""
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈"
+GIVEN_CHARS = "伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英华玉萍红娥玲芬燕彬辉鹏飞宇浩然子涵欣怡梓轩思雨"
+
+TOKEN_PATH = "/cgi-bin/gettoken"
+USER_LIST_PATH = "/cgi-bin/user/list"
+QUOTA_PATH = "/cgi-bin/oa/vacation/getuservacationquota"
+APPROVAL_PATH = "/cgi-bin/oa/getapprovaldata"
+
+ERROR_MESSAGES = {
+    40001: "invalid credential",
+    40014: "invalid access_token",
+    42001: "access_token expired",
+    45009: "api freq out of limit",
+    60111: "userid not found"
+}
+
+
+@dataclass
+class SimulatorConfig:
+    """模拟器配置"""
+    users: int = 1000
+    seed: int = 42
+    departments: int = 50
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # 错误码 -> 注入概率，对 gettoken 以外的接口生效
+    error_rates: Dict[int, float] = field(default_factory=dict)
+    # 每个接口每秒允许的请求数，超出返回 45009；0 表示不限
+    rate_limit: float = 0.0
+    token_ttl: int = 7200
+    # 每名员工返回的非年假假期类型数量，用于放大余额响应
+    extra_vacation_types: int = 3
+    # 每名员工附加的填充字节数，用于模拟大体积通讯录
+    user_padding_bytes: int = 0
+    approvals_per_user: int = 5
+
+
+class SyntheticOrg:
+    """确定性生成的合成组织"""
+
+    def __init__(self, users: int, seed: int = 42, departments: int = 50, user_padding_bytes: int = 0):
+        """
+        生成合成组织
+
+        Args:
+            users: 员工人数
+            seed: 随机种子，相同参数生成完全相同的组织
+            departments: 部门数
+            user_padding_bytes: 每名员工附加的填充字节数
+        """
+        rng = random.Random(seed)
+        padding = "x" * user_padding_bytes
+        self.userlist: List[dict] = []
+        for i in range(users):
+            given = "".join(rng.choice(GIVEN_CHARS) for _ in range(rng.choice((1, 2))))
+            user = {
+                "userid": f"u{i:06d}",
+                "name": rng.choice(SURNAMES) + given,
+                "department": [rng.randint(2, departments + 1)],
+                "position": rng.choice(("工程师", "产品经理", "设计师", "销售", "运营", "行政")),
+                "email": f"u{i:06d}@example.com",
+                "status": 1
+            }
+            if padding:
+                user["extattr"] = {"attrs": [{"type": 0, "name": "备注", "text": {"value": padding}}]}
+            self.userlist.append(user)
+        self.by_userid = {user["userid"]: user for user in self.userlist}
+
+    @staticmethod
+    def _user_hash(userid: str) -> int:
+        return int(hashlib.md5(userid.encode("utf-8")).hexdigest()[:8], 16)
+
+    def quota_payload(self, userid: str, extra_vacation_types: int = 3) -> Optional[dict]:
+        """
+        生成员工的假期余额响应
+
+        Returns:
+            Optional[dict]: 响应数据，员工不存在时为None
+        """
+        if userid not in self.by_userid:
+            return None
+        h = self._user_hash(userid)
+        assigned = (5 + h % 11) * 8 * 3600          # 5-15天，单位秒
+        used = min(assigned, (h >> 8) % 7 * 8 * 3600)
+        lists = [{
+            "id": 1,
+            "vacationname": "年假",
+            "assigned": assigned,
+            "real_assigned": assigned,
+            "usedduration": used,
+            "leftduration": assigned - used
+        }]
+        for i in range(extra_vacation_types):
+            lists.append({
+                "id": i + 2,
+                "vacationname": f"其他假期{i + 1}",
+                "assigned": 0,
+                "real_assigned": 0,
+                "usedduration": 0,
+                "leftduration": 0
+            })
+        return {"errcode": 0, "errmsg": "ok", "lists": lists}
+
+    def approval_records(self, userid: str, count: int) -> List[dict]:
+        """生成员工的审批记录"""
+        h = self._user_hash(userid)
+        return [
+            {
+                "sp_num": f"{h % 100000:05d}{i:04d}",
+                "spname": "请假",
+                "apply_name": self.by_userid[userid]["name"],
+                "apply_user_id": userid,
+                "sp_status": 2,
+                "apply_time": 1735689600 + i * 86400
+            }
+            for i in range(count)
+        ]
+
+
+class _RateLimiter:
+    """按接口统计的固定窗口限流器"""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Tuple[int, int]] = {}
+
+    def allow(self, path: str) -> bool:
+        if self.limit <= 0:
+            return True
+        second = int(time.monotonic())
+        with self._lock:
+            window, count = self._windows.get(path, (second, 0))
+            if window != second:
+                window, count = second, 0
+            count += 1
+            self._windows[path] = (window, count)
+            return count <= self.limit
+
+
+class SimulatedWeChatAPI:
+    """企业微信API的模拟实现，不涉及网络，可被HTTP服务或进程内传输层复用"""
+
+    def __init__(self, config: SimulatorConfig):
+        """
+        初始化模拟API
+
+        Args:
+            config: 模拟器配置
+        """
+        self.config = config
+        self.org = SyntheticOrg(config.users, config.seed, config.departments, config.user_padding_bytes)
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self._rate_limiter = _RateLimiter(config.rate_limit)
+        self._tokens: Dict[str, float] = {}
+        self._tokens_lock = threading.Lock()
+        self._stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, int]:
+        """各接口及错误码的请求计数"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def _sleep(self) -> None:
+        """模拟网络和服务端处理延迟"""
+        delay = self.config.latency_ms
+        if self.config.jitter_ms:
+            with self._rng_lock:
+                delay += self._rng.uniform(0, self.config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _injected_error(self) -> Optional[int]:
+        """按配置概率返回需要注入的错误码"""
+        if not self.config.error_rates:
+            return None
+        with self._rng_lock:
+            roll = self._rng.random()
+        for errcode, rate in self.config.error_rates.items():
+            if roll < rate:
+                return errcode
+            roll -= rate
+        return None
+
+    def _check_token(self, query: Dict[str, List[str]]) -> Optional[int]:
+        """校验access_token，返回错误码或None"""
+        token = query.get("access_token", [""])[0]
+        with self._tokens_lock:
+            expires_at = self._tokens.get(token)
+        if expires_at is None:
+            return 40014
+        if time.time() >= expires_at:
+            return 42001
+        return None
+
+    def _issue_token(self) -> dict:
+        token = hashlib.sha256(f"{time.time_ns()}-{threading.get_ident()}".encode()).hexdigest()
+        with self._tokens_lock:
+            self._tokens[token] = time.time() + self.config.token_ttl
+        return {"errcode": 0, "errmsg": "ok", "access_token": token, "expires_in": self.config.token_ttl}
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Optional[dict]) -> dict:
+        """
+        处理一次API请求
+
+        Returns:
+            dict: 响应JSON
+        """
+        self._count(path)
+        self._sleep()
+
+        if path == TOKEN_PATH:
+            return self._issue_token()
+
+        if path not in (USER_LIST_PATH, QUOTA_PATH, APPROVAL_PATH):
+            return {"errcode": 404, "errmsg": f"unknown api: {path}"}
+
+        errcode = self._check_token(query)
+        if errcode is None and not self._rate_limiter.allow(path):
+            errcode = 45009
+        if errcode is None:
+            errcode = self._injected_error()
+        if errcode is not None:
+            self._count(f"errcode.{errcode}")
+            return {"errcode": errcode, "errmsg": ERROR_MESSAGES.get(errcode, "simulated error")}
+
+        if path == USER_LIST_PATH:
+            return {"errcode": 0, "errmsg": "ok", "userlist": self.org.userlist}
+
+        body = body or {}
+        userid = body.get("userid") if path == QUOTA_PATH else _applyer(body)
+        if userid not in self.org.by_userid:
+            self._count("errcode.60111")
+            return {"errcode": 60111, "errmsg": ERROR_MESSAGES[60111]}
+
+        if path == QUOTA_PATH:
+            return self.org.quota_payload(userid, self.config.extra_vacation_types)
+
+        records = self.org.approval_records(userid, self.config.approvals_per_user)
+        cursor = int(body.get("cursor", 0))
+        size = int(body.get("size", 100))
+        page = records[cursor:cursor + size]
+        next_cursor = cursor + len(page) if cursor + len(page) < len(records) else 0
+        return {"errcode": 0, "errmsg": "ok", "count": len(page), "total": len(records),
+                "next_cursor": next_cursor, "data": page}
+
+
+class WeChatSimulator:
+    """企业微信API模拟服务（HTTP）"""
+
+    def __init__(self, config: SimulatorConfig, host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模拟服务
+
+        Args:
+            config: 模拟器配置
+            host: 监听地址
+            port: 监听端口，为0时自动分配
+        """
+        self.config = config
+        self.api = SimulatedWeChatAPI(config)
+        self.logger = logging.getLogger(__name__)
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def org(self) -> SyntheticOrg:
+        """模拟的合成组织"""
+        return self.api.org
+
+    def stats(self) -> Dict[str, int]:
+        """各接口及错误码的请求计数"""
+        return self.api.stats()
+
+    @property
+    def base_url(self) -> str:
+        """模拟服务地址，可直接用作 WECHAT_BASE_URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'WeChatSimulator':
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="wechat-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """在当前线程中运行服务，直到被中断"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'WeChatSimulator':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 以支持客户端长连接
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self, method: str) -> None:
+                parsed = urlparse(self.path)
+                body = None
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    try:
+                        body = json.loads(self.rfile.read(length))
+                    except ValueError:
+                        body = None
+                payload = json.dumps(simulator.api.handle(method, parsed.path, parse_qs(parsed.query), body),
+                                     ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path == "/__stats":
+                    payload = json.dumps(simulator.stats()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def log_message(self, format, *args):
+                simulator.logger.debug(format % args)
+
+        return Handler
+
+
+def _applyer(body: dict) -> Optional[str]:
+    """从审批查询条件中取出申请人"""
+    for item in body.get("filters", []):
+        if item.get("key") == "applyer":
+            return item.get("value")
+    return None
+
+
+def _parse_error_rate(value: str) -> Tuple[int, float]:
+    """解析 --error 参数，格式为 错误码:概率"""
+    try:
+        errcode, rate = value.split(":", 1)
+        return int(errcode), float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"错误注入格式应为 错误码:概率，例如 45009:0.05，实际为 {value}")
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="企业微信API本地模拟器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=18080, help="监听端口")
+    parser.add_argument("--users", type=int, default=1000, help="合成组织的员工人数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--departments", type=int, default=50, help="部门数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每个请求的固定延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="附加的随机延迟上限（毫秒）")
+    parser.add_argument("--error", type=_parse_error_rate, action="append", default=[],
+                        help="注入错误码及概率，如 --error 45009:0.05，可重复指定")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="每个接口每秒请求上限，超出返回45009")
+    parser.add_argument("--token-ttl", type=int, default=7200, help="access_token有效期（秒）")
+    parser.add_argument("--extra-vacation-types", type=int, default=3, help="余额响应中附加的假期类型数")
+    parser.add_argument("--user-padding-bytes", type=int, default=0, help="每名员工附加的填充字节数")
+    parser.add_argument("--approvals-per-user", type=int, default=5, help="每名员工的审批记录数")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    """主函数"""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    config = SimulatorConfig(
+        users=args.users,
+        seed=args.seed,
+        departments=args.departments,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rates=dict(args.error),
+        rate_limit=args.rate_limit,
+        token_ttl=args.token_ttl,
+        extra_vacation_types=args.extra_vacation_types,
+        user_padding_bytes=args.user_padding_bytes,
+        approvals_per_user=args.approvals_per_user
+    )
+    simulator = WeChatSimulator(config, host=args.host, port=args.port)
+    print(f"🧪 企业微信模拟器已启动: {simulator.base_url} ({config.users} 名员工)")
+    print(f"   设置 WECHAT_BASE_URL={simulator.base_url} 即可将计算器指向模拟器，Ctrl+C 退出")
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"请求统计: {simulator.stats()}")
+
+
+if __name__ == "__main__":
+    main()
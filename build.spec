@@ -22,6 +22,8 @@ datas = [
     (str(project_dir / "docs"), "docs"),
     # README文件
     (str(project_dir / "README.md"), "."),
+    # 法定节假日数据
+    (str(src_dir / "business" / "data"), "business/data"),
 ]
 
 # 隐藏导入模块（解决动态导入问题）
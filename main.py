@@ -10,6 +10,8 @@
 import sys
 import os
 import logging
+import argparse
+import importlib.util
 from pathlib import Path
 
 # 添加src目录到Python路径
@@ -57,6 +59,38 @@ def setup_logging():
     logging.getLogger('business.controller').setLevel(logging.INFO)  # 保持业务逻辑日志
     logging.getLogger('gui.main_window').setLevel(logging.INFO)  # 保持GUI日志
 
+def add_profile_argument(parser):
+    """为入口脚本添加 --profile 参数"""
+    parser.add_argument(
+        "--profile", nargs="?", const="each", choices=("each", "run"),
+        help="使用cProfile剖析每次计算，结果保存到 logs/profiles/（each 每次计算一组文件，run 汇总整个运行）"
+    )
+
+def enable_profiling(mode):
+    """按命令行参数开启性能剖析（覆盖 PROFILE_MODE 配置）"""
+    if mode:
+        os.environ["PROFILE_MODE"] = mode
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="离职员工剩余年假计算器")
+    add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+# 必要依赖: (模块名, 描述, 安装提示)
+REQUIRED_DEPENDENCIES = (
+    ("tkinter", "tkinter GUI库", "请安装Python的tkinter支持"),
+    ("requests", "requests HTTP库", "请运行: pip install requests"),
+    ("dotenv", "python-dotenv配置库", "请运行: pip install python-dotenv"),
+)
+
+def _module_available(module_name):
+    """检查模块是否可导入（不执行模块代码）"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
 def check_virtual_environment():
     """检查是否在虚拟环境中运行"""
     logger = logging.getLogger(__name__)
@@ -80,8 +114,13 @@ def check_virtual_environment():
         logger.info("  3. 激活虚拟环境后再运行程序")
         return False
 
-def check_environment():
-    """检查运行环境"""
+def check_environment(create_env_file: bool = True):
+    """
+    检查运行环境
+
+    Args:
+        create_env_file: .env 不存在时是否从 .env.template 复制一份（冷启动测量时关闭，避免在仓库中留下文件）
+    """
     logger = logging.getLogger(__name__)
     
     # 检查虚拟环境（警告但不阻止运行）
@@ -100,7 +139,7 @@ def check_environment():
         
         # 尝试复制模板文件
         template_file = current_dir / ".env.template"
-        if template_file.exists():
+        if create_env_file and template_file.exists():
             try:
                 import shutil
                 shutil.copy2(template_file, env_file)
@@ -108,40 +147,27 @@ def check_environment():
             except Exception as e:
                 logger.error(f"创建.env文件失败: {e}")
     
-    # 检查必要的依赖
-    try:
-        import tkinter
-        logger.info("tkinter GUI库检查通过")
-    except ImportError:
-        logger.error("tkinter库未安装，请安装Python的tkinter支持")
-        return False
-    
-    try:
-        import requests
-        logger.info("requests HTTP库检查通过")
-    except ImportError:
-        logger.error("requests库未安装，请运行: pip install requests")
-        return False
-    
-    try:
-        import dotenv
-        logger.info("python-dotenv配置库检查通过")
-    except ImportError:
-        logger.error("python-dotenv库未安装，请运行: pip install python-dotenv")
-        return False
+    # 检查必要的依赖：只查找模块是否存在而不实际导入，避免拖慢启动
+    for module_name, description, install_hint in REQUIRED_DEPENDENCIES:
+        if not _module_available(module_name):
+            logger.error(f"{description}未安装，{install_hint}")
+            return False
+        logger.info(f"{description}检查通过")
     
     # 检查可选依赖
-    try:
-        import tkcalendar
+    if _module_available("tkcalendar"):
         logger.info("tkcalendar日期选择器检查通过")
-    except ImportError:
+    else:
         logger.warning("tkcalendar库未安装，将使用文本输入框代替日期选择器")
         logger.info("建议安装: pip install tkcalendar")
     
     return True
 
-def main():
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
+    enable_profiling(args.profile)
+    
     # 设置日志
     setup_logging()
     logger = logging.getLogger(__name__)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+离职员工剩余年假计算器
+HTTP服务入口
+
+用法:
+    python serve.py --port 8765 --workers 32
+    python serve.py --profile                 # 每个请求的计算输出一组剖析文件到 logs/profiles/
+
+    curl -X POST http://127.0.0.1:8765/calculate \\
+         -d '{"employee_name": "张三", "resignation_date": "2025-06-30"}'
+
+未指定的参数读取 SERVER_* 配置。
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# 添加src目录到Python路径
+current_dir = Path(__file__).parent
+src_dir = current_dir / "src"
+sys.path.insert(0, str(src_dir))
+
+from main import add_profile_argument, enable_profiling, setup_logging
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="以HTTP JSON接口提供年假计算服务")
+    parser.add_argument("--host", help="监听地址，默认读取 SERVER_HOST 配置")
+    parser.add_argument("--port", type=int, help="监听端口，默认读取 SERVER_PORT 配置")
+    parser.add_argument("-w", "--workers", type=int, help="工作线程数（最大并发请求数），默认读取 SERVER_MAX_WORKERS 配置")
+    parser.add_argument("--no-warm-up", action="store_true", help="启动时不预热通讯录")
+    add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    enable_profiling(args.profile)
+    setup_logging()
+    logger = logging.getLogger(__name__)
+
+    from business.controller import BusinessController
+    from server.http_server import LeaveCalculatorServer
+
+    # 所有请求共享同一个控制器，通讯录索引与缓存在请求之间复用
+    controller = BusinessController()
+    config = controller.config_service.get_server_config()
+
+    try:
+        server = LeaveCalculatorServer(
+            controller,
+            host=args.host or config["host"],
+            port=args.port if args.port is not None else config["port"],
+            max_workers=args.workers or config["max_workers"],
+            keepalive_timeout=config["keepalive_timeout"],
+            backlog=config["backlog"]
+        )
+    except OSError as e:
+        logger.error(f"❌ HTTP服务启动失败: {str(e)}")
+        return 1
+
+    if not args.no_warm_up:
+        server.warm_up()
+
+    host, port = server.address
+    print(f"🚀 HTTP服务已启动: http://{host}:{port}  (Ctrl+C 停止)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 服务已停止")
+    finally:
+        if controller.profiler is not None:
+            controller.profiler.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+批量年假计算模块
+
+读取包含 (员工姓名, 离职日期) 的CSV/XLSX文件，
+通过有界线程池并发执行 process_leave_calculation，按输入顺序返回结果。
+"""
+import csv
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, TYPE_CHECKING
+
+from models import BatchItem, BatchItemResult, BatchReport, CalculationResult
+
+if TYPE_CHECKING:
+    from .controller import BusinessController
+
+
+# 表头别名（小写比较）
+NAME_HEADERS = {"姓名", "员工姓名", "name", "employee", "employee_name"}
+DATE_HEADERS = {"离职日期", "日期", "resignation_date", "date", "leave_date"}
+
+
+class BatchProcessor:
+    """批量年假计算处理器"""
+
+    def __init__(self, controller: 'BusinessController', max_workers: int = 8):
+        """
+        初始化批量处理器
+
+        Args:
+            controller: 业务控制器，所有工作线程共享同一实例（共享通讯录索引和token）
+            max_workers: 最大并发线程数
+        """
+        self.logger = logging.getLogger(__name__)
+        self.controller = controller
+        self.max_workers = max(1, max_workers)
+
+    def read_input(self, path: str) -> List[BatchItem]:
+        """
+        读取批量输入文件
+
+        Args:
+            path: CSV 或 XLSX 文件路径
+
+        Returns:
+            List[BatchItem]: 输入行列表
+
+        Raises:
+            ValueError: 文件格式不支持或缺少必要列时抛出
+        """
+        suffix = Path(path).suffix.lower()
+        if suffix == ".csv":
+            rows = self._read_csv_rows(path)
+        elif suffix in (".xlsx", ".xlsm"):
+            rows = self._read_xlsx_rows(path)
+        else:
+            raise ValueError(f"不支持的文件格式: {suffix}，请使用 CSV 或 XLSX 文件")
+        return self._parse_rows(rows)
+
+    @staticmethod
+    def _read_csv_rows(path: str) -> List[list]:
+        """读取CSV文件的所有行（兼容Excel导出的UTF-8 BOM）"""
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return [row for row in csv.reader(f)]
+
+    @staticmethod
+    def _read_xlsx_rows(path: str) -> List[list]:
+        """读取XLSX文件第一个工作表的所有行"""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("读取XLSX文件需要安装openpyxl，请运行: pip install openpyxl")
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            return [list(row) for row in sheet.iter_rows(values_only=True)]
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _cell_to_text(value) -> str:
+        """将单元格内容转换为文本，日期类型格式化为 YYYY-MM-DD"""
+        if value is None:
+            return ""
+        if isinstance(value, (datetime, date)):
+            return value.strftime("%Y-%m-%d")
+        return str(value).strip()
+
+    def _parse_rows(self, rows: List[list]) -> List[BatchItem]:
+        """解析原始行为输入模型，自动识别表头"""
+        name_col, date_col = 0, 1
+        start = 0
+
+        if rows:
+            header = [self._cell_to_text(cell).lower() for cell in rows[0]]
+            if any(h in NAME_HEADERS for h in header) or any(h in DATE_HEADERS for h in header):
+                name_col = next((i for i, h in enumerate(header) if h in NAME_HEADERS), None)
+                date_col = next((i for i, h in enumerate(header) if h in DATE_HEADERS), None)
+                if name_col is None or date_col is None:
+                    raise ValueError("输入文件缺少“姓名”或“离职日期”列")
+                start = 1
+
+        items = []
+        for row_number, row in enumerate(rows[start:], start=start + 1):
+            cells = [self._cell_to_text(cell) for cell in row]
+            # 跳过空行
+            if not any(cells):
+                continue
+            name = cells[name_col] if name_col < len(cells) else ""
+            resignation_date = cells[date_col] if date_col < len(cells) else ""
+            items.append(BatchItem(
+                row_number=row_number,
+                employee_name=name,
+                resignation_date=resignation_date
+            ))
+        return items
+
+    def _process_item(self, item: BatchItem) -> BatchItemResult:
+        """计算单行，记录耗时"""
+        started = time.perf_counter()
+        try:
+            result = self.controller.process_leave_calculation(item.employee_name, item.resignation_date)
+        except Exception as e:
+            # process_leave_calculation 本身不抛异常，这里兜底防止单行失败中断整批
+            result = CalculationResult(
+                remaining_days=0.0,
+                success=False,
+                error_message=f"处理过程中发生未知错误: {str(e)}"
+            )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return BatchItemResult(item=item, result=result, elapsed_ms=elapsed_ms)
+
+    def _warm_up(self) -> None:
+        """并发前预先加载通讯录索引，避免所有线程同时等待首次刷新"""
+        try:
+            self.controller.wechat_service.directory.ensure_fresh()
+        except Exception as e:
+            self.logger.warning(f"⚠️ 预加载通讯录失败，将在逐行计算时重试: {str(e)}")
+
+    def run(
+        self,
+        items: Iterable[BatchItem],
+        progress_callback: Optional[Callable[[BatchItemResult], None]] = None
+    ) -> BatchReport:
+        """
+        并发执行批量计算
+
+        Args:
+            items: 输入行
+            progress_callback: 每行完成时的回调（按输入顺序调用）
+
+        Returns:
+            BatchReport: 按输入顺序排列的结果及吞吐统计
+        """
+        items = list(items)
+        report = BatchReport()
+        if not items:
+            return report
+
+        self.logger.info(f"开始批量计算: {len(items)} 行, 并发数 {self.max_workers}")
+        started = time.perf_counter()
+        self._warm_up()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            # executor.map 按提交顺序产出结果
+            for item_result in executor.map(self._process_item, items):
+                report.results.append(item_result)
+                if progress_callback is not None:
+                    progress_callback(item_result)
+
+        report.total_seconds = time.perf_counter() - started
+        self.logger.info(
+            f"批量计算完成: 成功 {report.success_count}, 失败 {report.failure_count}, "
+            f"耗时 {report.total_seconds:.2f}s, 吞吐 {report.throughput:.1f} 行/秒, "
+            f"P50 {report.latency_percentile(50):.0f}ms, P95 {report.latency_percentile(95):.0f}ms"
+        )
+        return report
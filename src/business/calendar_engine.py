@@ -0,0 +1,83 @@
+"""
+日历计算模块
+
+按年份预先计算“年内第几天 -> 时间比例”查询表，表在进程内按年份缓存，
+之后任意年份的时间比例计算都只是一次数组下标访问，不再逐次构造年初日期、判断闰年。
+"""
+from array import array
+from datetime import date
+from functools import lru_cache
+
+
+def is_leap_year(year: int) -> bool:
+    """
+    判断是否为闰年
+
+    Args:
+        year: 年份
+
+    Returns:
+        bool: 是否为闰年
+    """
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def days_in_year(year: int) -> int:
+    """
+    获取指定年份的总天数
+
+    Args:
+        year: 年份
+
+    Returns:
+        int: 365 或 366
+    """
+    return 366 if is_leap_year(year) else 365
+
+
+@lru_cache(maxsize=None)
+def year_start_ordinal(year: int) -> int:
+    """指定年份1月1日的序数（date.toordinal）"""
+    return date(year, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=None)
+def ratio_table(year: int) -> array:
+    """
+    获取指定年份的时间比例查询表
+
+    Args:
+        year: 年份
+
+    Returns:
+        array: 长度为 当年天数+1 的 array('d')，下标 n 为截至当年第 n 天（含）的时间比例，下标0为0
+    """
+    total = days_in_year(year)
+    return array("d", (day / total for day in range(total + 1)))
+
+
+def day_of_year(target_date: date) -> int:
+    """
+    计算指定日期是当年第几天（1月1日为1）
+
+    Args:
+        target_date: 目标日期
+
+    Returns:
+        int: 天数
+    """
+    return target_date.toordinal() - year_start_ordinal(target_date.year) + 1
+
+
+def time_ratio(target_date: date) -> float:
+    """
+    计算年初至指定日期（含当天）占全年的比例
+
+    Args:
+        target_date: 目标日期
+
+    Returns:
+        float: 时间比例 (0-1之间)
+    """
+    year = target_date.year
+    return ratio_table(year)[target_date.toordinal() - year_start_ordinal(year) + 1]
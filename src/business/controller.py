@@ -1,14 +1,30 @@
 """
 业务控制器模块
 """
+import time
 import logging
+import threading
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple, Union
 
-from models import CalculationInput, CalculationResult, ValidationResult
+from models import (
+    BatchItem, BatchItemResult, BatchReport, CalculationInput, CalculationResult, HistoryPage, ValidationResult
+)
 from services.wechat_service import WeChatWorkService, WeChatAPIError, EmployeeNotFoundError
 from services.config_service import ConfigService
-from .leave_calculator import LeaveCalculator
+from services.history_store import HistoryStore
+from services.metrics import CALCULATION_STAGE_LATENCY, CALCULATIONS, REGISTRY
+from services.profiling import PROFILE_MODES, CalculationProfiler
+from services.tracing import trace_request
+from .leave_calculator import LeaveCalculator, PRORATION_MODES
+from .batch_processor import BatchProcessor
+from .exporter import ResultExporter, calculation_row
+
+
+# 计算被调用方取消时返回的错误信息
+CANCELLED_MESSAGE = "计算已取消"
 
 
 class BusinessController:
@@ -18,8 +34,35 @@ class BusinessController:
         """初始化业务控制器"""
         self.logger = logging.getLogger(__name__)
         self.config_service = ConfigService()
-        self.calculator = LeaveCalculator()
+        self.calculator = self._create_calculator()
         self._wechat_service: Optional[WeChatWorkService] = None
+        self._history_store: Optional[HistoryStore] = None
+        self._history_disabled = not self.config_service.get_history_config()["enabled"]
+        self._history_lock = threading.Lock()
+        self.profiler = self._create_profiler()
+
+    def _create_calculator(self) -> LeaveCalculator:
+        """根据 PRORATION_MODE 配置创建年假计算器，配置无效时按自然日计算"""
+        config = self.config_service.get_annual_leave_config()
+        mode = config["proration_mode"]
+        if mode not in PRORATION_MODES:
+            self.logger.warning(f"⚠️ 无效的 PRORATION_MODE: {mode}，已改为按自然日计算时间比例")
+            mode = "calendar"
+        if mode == "workday":
+            self.logger.info("📅 时间比例按工作日计算（考虑法定节假日与调休）")
+        return LeaveCalculator(mode, config["holiday_file"] or None)
+
+    def _create_profiler(self) -> Optional[CalculationProfiler]:
+        """根据 PROFILE_MODE 配置创建剖析器，未开启时为None"""
+        config = self.config_service.get_profile_config()
+        mode = config["mode"]
+        if mode not in PROFILE_MODES:
+            self.logger.warning(f"⚠️ 无效的 PROFILE_MODE: {mode}，已关闭性能剖析")
+            return None
+        if mode == "off":
+            return None
+        self.logger.info(f"🔬 已开启性能剖析（{mode}），结果保存到 {config['output_dir']}")
+        return CalculationProfiler(config["output_dir"], mode)
 
     @property
     def wechat_service(self) -> WeChatWorkService:
@@ -28,24 +71,96 @@ class BusinessController:
             self._wechat_service = WeChatWorkService(self.config_service)
         return self._wechat_service
 
-    def process_leave_calculation(self, employee_name: str, resignation_date_str: str) -> CalculationResult:
+    def process_leave_calculation(
+        self,
+        employee_name: str,
+        resignation_date_str: str,
+        trace: bool = False,
+        cancel_event: Optional[threading.Event] = None
+    ) -> CalculationResult:
         """
         处理年假计算流程
         
         Args:
             employee_name: 员工姓名
             resignation_date_str: 离职日期字符串 (YYYY-MM-DD)
+            trace: 是否为本次计算开启详细追踪（用于排查单个员工的问题）
+            cancel_event: 取消标志；在各网络调用之间检查，置位后尽快返回 CANCELLED_MESSAGE 错误结果
             
         Returns:
             CalculationResult: 计算结果
         """
+        profiler = self.profiler
+        started = time.perf_counter()
+        with trace_request(trace), (profiler.profile(employee_name) if profiler else nullcontext()):
+            result = self._process_leave_calculation(employee_name, resignation_date_str, cancel_event)
+        elapsed = time.perf_counter() - started
+        CALCULATION_STAGE_LATENCY.observe(elapsed, stage="total")
+        if result.error_message == CANCELLED_MESSAGE:
+            CALCULATIONS.inc(outcome="cancelled")
+        else:
+            CALCULATIONS.inc(outcome="success" if result.success else "failure")
+            self._record_history(employee_name, resignation_date_str, result, elapsed * 1000)
+        return result
+
+    @property
+    def history_store(self) -> Optional[HistoryStore]:
+        """获取计算历史存储（懒加载），未启用或无法打开数据库时为None"""
+        if self._history_store is None and not self._history_disabled:
+            with self._history_lock:
+                if self._history_store is None and not self._history_disabled:
+                    config = self.config_service.get_history_config()
+                    try:
+                        self._history_store = HistoryStore(
+                            config["db_file"],
+                            batch_size=config["batch_size"],
+                            flush_interval=config["flush_interval"]
+                        )
+                    except Exception as e:
+                        self._history_disabled = True
+                        self.logger.warning(f"⚠️ 无法打开计算历史数据库，本次运行不记录历史: {str(e)}")
+        return self._history_store
+
+    def _record_history(
+        self,
+        employee_name: str,
+        resignation_date_str: str,
+        result: CalculationResult,
+        elapsed_ms: float
+    ) -> None:
+        """记录计算历史（非阻塞），失败不影响计算结果"""
+        store = self.history_store
+        if store is None:
+            return
+        try:
+            store.record(employee_name, resignation_date_str, result, elapsed_ms)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 记录计算历史失败: {str(e)}")
+
+    def _cancelled(self, cancel_event: Optional[threading.Event], employee_name: str) -> Optional[CalculationResult]:
+        """若计算已被取消，返回取消结果"""
+        if cancel_event is None or not cancel_event.is_set():
+            return None
+        self.logger.info(f"员工 {employee_name} 的年假计算已取消")
+        return CalculationResult(
+            remaining_days=0.0,
+            success=False,
+            error_message=CANCELLED_MESSAGE
+        )
+
+    def _process_leave_calculation(
+        self,
+        employee_name: str,
+        resignation_date_str: str,
+        cancel_event: Optional[threading.Event] = None
+    ) -> CalculationResult:
+        """执行年假计算流程"""
         try:
             # 1. 验证和解析输入数据
             validation_result = self._validate_input(employee_name, resignation_date_str)
             if not validation_result.is_valid:
                 return CalculationResult(
                     remaining_days=0.0,
-                    calculation_details={},
                     success=False,
                     error_message=validation_result.error_message
                 )
@@ -61,40 +176,52 @@ class BusinessController:
             if not input_validation.is_valid:
                 return CalculationResult(
                     remaining_days=0.0,
-                    calculation_details={},
                     success=False,
                     error_message=input_validation.error_message
                 )
 
             # 3. 查找员工信息
+            cancelled = self._cancelled(cancel_event, employee_name)
+            if cancelled:
+                return cancelled
             self.logger.info(f"开始处理员工 {employee_name} 的年假计算")
             
             try:
-                employee = self.wechat_service.find_employee_by_name(employee_name)
+                with CALCULATION_STAGE_LATENCY.time(stage="find_employee"):
+                    employee = self.wechat_service.find_employee_by_name(employee_name)
                 self.logger.info(f"找到员工: {employee.name} (ID: {employee.user_id})")
             except EmployeeNotFoundError as e:
+                error_message = f"未找到员工 '{employee_name}'，请检查姓名是否正确"
+                if e.suggestions:
+                    error_message += f"。您是否要找: {'、'.join(e.suggestions)}"
                 return CalculationResult(
                     remaining_days=0.0,
-                    calculation_details={},
                     success=False,
-                    error_message=f"未找到员工 '{employee_name}'，请检查姓名是否正确"
+                    error_message=error_message
                 )
 
             # 4. 获取假期余额
+            cancelled = self._cancelled(cancel_event, employee_name)
+            if cancelled:
+                return cancelled
             try:
-                leave_balance = self.wechat_service.get_leave_balance(employee, 2025)
+                with CALCULATION_STAGE_LATENCY.time(stage="leave_balance"):
+                    leave_balance = self.wechat_service.get_leave_balance(employee, resignation_date.year)
                 self.logger.info(f"获取到假期余额: 理论{leave_balance.theoretical_hours}h, "
                                f"已用{leave_balance.used_hours}h, 剩余{leave_balance.remaining_hours}h")
             except WeChatAPIError as e:
                 return CalculationResult(
                     remaining_days=0.0,
-                    calculation_details={},
                     success=False,
                     error_message=f"获取假期余额失败: {e.errmsg}"
                 )
 
             # 5. 计算剩余年假
-            result = self.calculator.calculate_remaining_leave(leave_balance, resignation_date)
+            cancelled = self._cancelled(cancel_event, employee_name)
+            if cancelled:
+                return cancelled
+            with CALCULATION_STAGE_LATENCY.time(stage="calculate"):
+                result = self.calculator.calculate_remaining_leave(leave_balance, resignation_date)
             
             if result.success:
                 self.logger.info(f"年假计算完成: {result.remaining_days}天")
@@ -108,7 +235,6 @@ class BusinessController:
             self.logger.error(error_msg)
             return CalculationResult(
                 remaining_days=0.0,
-                calculation_details={},
                 success=False,
                 error_message=error_msg
             )
@@ -117,11 +243,58 @@ class BusinessController:
             self.logger.error(error_msg, exc_info=True)
             return CalculationResult(
                 remaining_days=0.0,
-                calculation_details={},
                 success=False,
                 error_message=error_msg
             )
 
+    def process_batch_calculation(
+        self,
+        items: Iterable[BatchItem],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[BatchItemResult], None]] = None
+    ) -> BatchReport:
+        """
+        并发处理批量年假计算
+
+        Args:
+            items: 输入行
+            max_workers: 最大并发线程数，默认读取 BATCH_MAX_WORKERS 配置
+            progress_callback: 每行完成时的回调
+
+        Returns:
+            BatchReport: 按输入顺序排列的结果及吞吐统计
+        """
+        if max_workers is None:
+            max_workers = self.config_service.get_batch_config()["max_workers"]
+        processor = BatchProcessor(self, max_workers=max_workers)
+        return processor.run(items, progress_callback=progress_callback)
+
+    def suggest_employee_names(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        根据姓名或拼音首字母前缀联想员工姓名
+
+        只查询已加载的通讯录索引，不发起网络请求，可在每次按键时调用。
+
+        Args:
+            prefix: 输入前缀
+            limit: 最多返回的候选数
+
+        Returns:
+            List[str]: 候选姓名，通讯录尚未加载时为空列表
+        """
+        if self._wechat_service is None or not prefix.strip():
+            return []
+        return self._wechat_service.directory.suggest(prefix, limit)
+
+    def preload_employee_directory(self) -> None:
+        """
+        预先拉取通讯录并构建员工表及姓名联想、模糊匹配索引（供界面启动后在后台调用）
+
+        Raises:
+            WeChatAPIError: 拉取通讯录失败时抛出
+        """
+        self.wechat_service.directory.ensure_fresh()
+
     def _validate_input(self, employee_name: str, resignation_date_str: str) -> ValidationResult:
         """
         验证输入数据
@@ -172,6 +345,25 @@ class BusinessController:
         """
         return self.config_service.get_config_status()
 
+    def get_metrics(self, fmt: str = "json") -> Union[dict, str]:
+        """
+        获取运行指标（接口延迟、重试、错误码、缓存命中及计算各阶段耗时）
+
+        Args:
+            fmt: json 返回快照字典，prometheus 返回 Prometheus 文本格式
+
+        Returns:
+            dict 或 str: 指标快照
+
+        Raises:
+            ValueError: 格式不受支持时抛出
+        """
+        if fmt == "json":
+            return REGISTRY.snapshot()
+        if fmt == "prometheus":
+            return REGISTRY.to_prometheus()
+        raise ValueError(f"不支持的指标格式: {fmt}，请使用 json 或 prometheus")
+
     def handle_api_error(self, error: WeChatAPIError) -> str:
         """
         处理API错误，返回用户友好的错误信息
@@ -195,28 +387,87 @@ class BusinessController:
         
         return user_message
 
-    def get_calculation_history(self) -> list:
+    def get_calculation_history(
+        self,
+        employee_name: Optional[str] = None,
+        resignation_date_from: Optional[str] = None,
+        resignation_date_to: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> HistoryPage:
         """
-        获取计算历史记录（预留接口）
+        按时间倒序分页获取计算历史记录
+        
+        记录由后台线程批量写入，最近一次计算可能在 HISTORY_FLUSH_INTERVAL 秒后才可查询；
+        GUI中应在后台线程调用本方法。
+        
+        Args:
+            employee_name: 只查询该员工
+            resignation_date_from: 离职日期下限（含，YYYY-MM-DD）
+            resignation_date_to: 离职日期上限（含，YYYY-MM-DD）
+            limit: 每页记录数
+            cursor: 上一页返回的 next_cursor
         
         Returns:
-            list: 历史记录列表
+            HistoryPage: 本页记录及下一页游标，未启用历史记录时为空页
         """
-        # 这里可以实现计算历史记录的存储和检索
-        # 例如存储到本地文件或数据库
-        return []
+        store = self.history_store
+        if store is None:
+            return HistoryPage()
+        return store.query(
+            employee_name=employee_name,
+            resignation_date_from=resignation_date_from,
+            resignation_date_to=resignation_date_to,
+            limit=limit,
+            cursor=cursor
+        )
 
-    def export_calculation_result(self, result: CalculationResult, employee_name: str) -> str:
+    def export_calculation_result(
+        self,
+        result: CalculationResult,
+        employee_name: str,
+        output_path: Optional[str] = None
+    ) -> str:
         """
-        导出计算结果（预留接口）
+        导出单个计算结果
         
         Args:
             result: 计算结果
             employee_name: 员工姓名
+            output_path: 输出文件路径（.csv/.jsonl/.xlsx），默认为 exports/<姓名>_<时间>.csv
+            
+        Returns:
+            str: 导出文件路径，导出失败时为空字符串
+        """
+        if output_path is None:
+            output_path = str(Path("exports") / f"{employee_name}_{datetime.now():%Y%m%d_%H%M%S}.csv")
+        try:
+            ResultExporter().export([calculation_row(employee_name, result)], output_path)
+            return output_path
+        except (OSError, ValueError) as e:
+            self.logger.error(f"导出计算结果失败: {str(e)}")
+            return ""
+
+    def export_calculation_results(
+        self,
+        results: Iterable[Tuple[str, CalculationResult]],
+        output_path: str,
+        fmt: Optional[str] = None
+    ) -> int:
+        """
+        流式导出多个计算结果，内存占用与结果数量无关
+        
+        Args:
+            results: (员工姓名, 计算结果) 迭代器，可以是生成器
+            output_path: 输出文件路径
+            fmt: csv / jsonl / xlsx，为None时根据扩展名判断
             
         Returns:
-            str: 导出文件路径
+            int: 导出的行数
+            
+        Raises:
+            ValueError: 格式不受支持时抛出
+            OSError: 文件写入失败时抛出
         """
-        # 这里可以实现结果导出功能
-        # 例如导出为Excel或PDF文件
-        return ""
\ No newline at end of file
+        rows = (calculation_row(employee_name, result) for employee_name, result in results)
+        return ResultExporter().export(rows, output_path, fmt)
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+计算结果导出模块
+
+将计算结果逐行流式写入CSV、JSONL或XLSX文件：输入为迭代器，写出时不在内存中累积整张表，
+XLSX使用openpyxl的只写模式，因此导出10行和10万行的内存占用基本相同。
+"""
+import os
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models import BatchItemResult, CalculationResult
+
+
+# (字段名, 表头)；JSONL使用字段名，CSV/XLSX使用表头
+RESULT_COLUMNS: List[Tuple[str, str]] = [
+    ("employee_name", "姓名"),
+    ("resignation_date", "离职日期"),
+    ("success", "是否成功"),
+    ("remaining_days", "剩余年假(天)"),
+    ("theoretical_hours", "理论时长(小时)"),
+    ("used_hours", "已用时长(小时)"),
+    ("time_ratio", "时间比例"),
+    ("error_message", "错误信息")
+]
+
+BATCH_COLUMNS: List[Tuple[str, str]] = (
+    [("row_number", "行号")] + RESULT_COLUMNS + [("elapsed_ms", "耗时(ms)")]
+)
+
+SUPPORTED_FORMATS = ("csv", "jsonl", "xlsx")
+
+# CSV写缓冲区大小
+CSV_BUFFER_SIZE = 1 << 20
+
+
+def calculation_row(
+    employee_name: str,
+    result: CalculationResult,
+    resignation_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    将计算结果转换为导出行
+
+    Args:
+        employee_name: 员工姓名
+        result: 计算结果
+        resignation_date: 离职日期，未提供时取计算详情中的日期
+
+    Returns:
+        dict: 以 RESULT_COLUMNS 字段名为键的行数据
+    """
+    # 直接读取原始中间量，不生成详细信息字典和公式文本
+    figures = result.figures
+    if figures is None:
+        # 以旧方式构造的结果只有详细信息字典
+        details = result.calculation_details
+        if resignation_date is None:
+            resignation_date = details.get("resignation_date")
+        theoretical_hours = details.get("theoretical_hours")
+        used_hours = details.get("used_hours")
+        time_ratio = details.get("time_ratio")
+    else:
+        if resignation_date is None:
+            resignation_date = figures.resignation_date.strftime("%Y-%m-%d")
+        theoretical_hours = figures.theoretical_hours
+        used_hours = figures.used_hours
+        time_ratio = round(figures.time_ratio, 4)
+    return {
+        "employee_name": employee_name,
+        "resignation_date": resignation_date,
+        "success": result.success,
+        "remaining_days": result.remaining_days if result.success else None,
+        "theoretical_hours": theoretical_hours,
+        "used_hours": used_hours,
+        "time_ratio": time_ratio,
+        "error_message": result.error_message or ""
+    }
+
+
+def batch_row(item_result: BatchItemResult) -> Dict[str, Any]:
+    """将批量计算的单行结果转换为导出行（BATCH_COLUMNS）"""
+    row = calculation_row(
+        item_result.item.employee_name,
+        item_result.result,
+        item_result.item.resignation_date
+    )
+    row["row_number"] = item_result.item.row_number
+    row["elapsed_ms"] = round(item_result.elapsed_ms, 1)
+    return row
+
+
+def detect_format(path: str) -> str:
+    """
+    根据文件扩展名判断导出格式
+
+    Raises:
+        ValueError: 扩展名不受支持时抛出
+    """
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix == "json":
+        suffix = "jsonl"
+    if suffix not in SUPPORTED_FORMATS:
+        raise ValueError(f"不支持的导出格式: {suffix or '(无扩展名)'}，请使用 CSV、JSONL 或 XLSX")
+    return suffix
+
+
+def _cell_value(value: Any) -> Any:
+    """表格单元格取值：布尔值显示为 是/否，空值显示为空"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "是" if value else "否"
+    return value
+
+
+class ResultExporter:
+    """计算结果流式导出器"""
+
+    def __init__(self, columns: Optional[List[Tuple[str, str]]] = None):
+        """
+        初始化导出器
+
+        Args:
+            columns: 导出的列 (字段名, 表头)，默认为 RESULT_COLUMNS
+        """
+        self.logger = logging.getLogger(__name__)
+        self.columns = columns or RESULT_COLUMNS
+
+    def export(self, rows: Iterable[Dict[str, Any]], path: str, fmt: Optional[str] = None) -> int:
+        """
+        将行数据流式写入文件
+
+        先写入同目录下的临时文件，完成后再替换目标文件，导出中途失败不会留下不完整的结果文件。
+
+        Args:
+            rows: 行数据迭代器（键为字段名）
+            path: 输出文件路径
+            fmt: csv / jsonl / xlsx，为None时根据扩展名判断
+
+        Returns:
+            int: 写出的行数
+
+        Raises:
+            ValueError: 格式不受支持或缺少openpyxl时抛出
+            OSError: 文件写入失败时抛出
+        """
+        fmt = fmt or detect_format(path)
+        writer = getattr(self, f"_write_{fmt}", None)
+        if writer is None:
+            raise ValueError(f"不支持的导出格式: {fmt}，请使用 CSV、JSONL 或 XLSX")
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f".{target.name}.tmp")
+        try:
+            count = writer(rows, temp)
+            os.replace(temp, target)
+        except BaseException:
+            if temp.exists():
+                temp.unlink()
+            raise
+
+        self.logger.info(f"📤 已导出 {count} 行计算结果: {target}")
+        return count
+
+    def _write_csv(self, rows: Iterable[Dict[str, Any]], path: Path) -> int:
+        """写入CSV（带BOM，便于Excel直接打开）"""
+        count = 0
+        keys = [key for key, _ in self.columns]
+        with open(path, "w", encoding="utf-8-sig", newline="", buffering=CSV_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow([header for _, header in self.columns])
+            for row in rows:
+                writer.writerow([_cell_value(row.get(key)) for key in keys])
+                count += 1
+        return count
+
+    def _write_jsonl(self, rows: Iterable[Dict[str, Any]], path: Path) -> int:
+        """写入JSON Lines，每行一个JSON对象，保留原始类型"""
+        count = 0
+        keys = [key for key, _ in self.columns]
+        with open(path, "w", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as f:
+            for row in rows:
+                f.write(json.dumps({key: row.get(key) for key in keys}, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        return count
+
+    def _write_xlsx(self, rows: Iterable[Dict[str, Any]], path: Path) -> int:
+        """使用只写模式写入XLSX，行数据直接写入临时文件而不在内存中保留"""
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValueError("导出XLSX文件需要安装openpyxl，请运行: pip install openpyxl")
+
+        count = 0
+        keys = [key for key, _ in self.columns]
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("计算结果")
+        sheet.append([header for _, header in self.columns])
+        for row in rows:
+            sheet.append([_cell_value(row.get(key)) for key in keys])
+            count += 1
+        workbook.save(str(path))
+        return count
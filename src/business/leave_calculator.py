@@ -2,18 +2,141 @@
 年假计算业务逻辑模块
 """
 import logging
+from array import array
 from datetime import date, datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
 
-from models import LeaveBalance, CalculationResult, CalculationInput
+from models import LeaveBalance, CalculationFigures, CalculationResult, CalculationInput
+from . import calendar_engine
+from .workday_calendar import WorkdayCalendar
+
+# 时间比例的计算方式：calendar 按自然日；workday 按工作日（考虑法定节假日与调休）
+PRORATION_MODES = ("calendar", "workday")
+
+# numpy 为可选依赖，仅批量接口使用；导入耗时较长，首次批量计算时才加载
+_numpy = None
+
+
+def _load_numpy():
+    """加载numpy，未安装时返回None（批量接口退化为逐行循环）"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def _build_calculation_result(
+    theoretical_hours: float,
+    used_hours: float,
+    remaining_hours_before_calc: float,
+    resignation_date: date,
+    time_ratio: float,
+    entitled_hours: float,
+    remaining_hours: float,
+    remaining_days: float,
+    proration_mode: str = "calendar"
+) -> CalculationResult:
+    """根据计算中间量构建计算结果，详细信息和公式文本在访问时才生成"""
+    return CalculationResult(
+        remaining_days=remaining_days,
+        success=True,
+        figures=CalculationFigures(
+            theoretical_hours=theoretical_hours,
+            used_hours=used_hours,
+            remaining_hours_before_calc=remaining_hours_before_calc,
+            resignation_date=resignation_date,
+            time_ratio=time_ratio,
+            entitled_hours=entitled_hours,
+            remaining_hours=remaining_hours,
+            remaining_days=remaining_days,
+            proration_mode=proration_mode
+        )
+    )
+
+
+class LeaveCalculationColumns:
+    """批量计算的列式结果，逐行结果对象仅在需要时构建"""
+
+    def __init__(
+        self,
+        theoretical_hours: Sequence[float],
+        used_hours: Sequence[float],
+        resignation_dates: List[date],
+        time_ratio: Sequence[float],
+        entitled_hours: Sequence[float],
+        remaining_hours: Sequence[float],
+        remaining_days: Sequence[float],
+        proration_mode: str = "calendar"
+    ):
+        self.theoretical_hours = theoretical_hours
+        self.used_hours = used_hours
+        self.resignation_dates = resignation_dates
+        self.time_ratio = time_ratio
+        self.entitled_hours = entitled_hours
+        self.remaining_hours = remaining_hours
+        self.remaining_days = remaining_days
+        self.proration_mode = proration_mode
+
+    def __len__(self) -> int:
+        return len(self.remaining_days)
+
+    def result_at(self, index: int) -> CalculationResult:
+        """
+        构建第 index 行的计算结果
+
+        Args:
+            index: 行号（从0开始）
+
+        Returns:
+            CalculationResult: 与 calculate_remaining_leave 相同格式的结果
+        """
+        theoretical_hours = float(self.theoretical_hours[index])
+        used_hours = float(self.used_hours[index])
+        return _build_calculation_result(
+            theoretical_hours=theoretical_hours,
+            used_hours=used_hours,
+            remaining_hours_before_calc=theoretical_hours - used_hours,
+            resignation_date=self.resignation_dates[index],
+            time_ratio=float(self.time_ratio[index]),
+            entitled_hours=float(self.entitled_hours[index]),
+            remaining_hours=float(self.remaining_hours[index]),
+            remaining_days=float(self.remaining_days[index]),
+            proration_mode=self.proration_mode
+        )
+
+    def to_results(self) -> List[CalculationResult]:
+        """构建所有行的计算结果"""
+        return [self.result_at(i) for i in range(len(self))]
 
 
 class LeaveCalculator:
     """年假计算器"""
 
-    def __init__(self):
-        """初始化年假计算器"""
+    def __init__(self, proration_mode: str = "calendar", holiday_file: Optional[str] = None):
+        """
+        初始化年假计算器
+
+        Args:
+            proration_mode: 时间比例计算方式，calendar 按自然日，workday 按工作日
+            holiday_file: workday 模式使用的节假日数据文件，默认使用内置数据
+
+        Raises:
+            ValueError: 计算方式无效时抛出
+        """
+        if proration_mode not in PRORATION_MODES:
+            raise ValueError(f"无效的时间比例计算方式: {proration_mode}，请使用 calendar 或 workday")
         self.logger = logging.getLogger(__name__)
+        self.proration_mode = proration_mode
+        self.workday_calendar: Optional[WorkdayCalendar] = None
+        if proration_mode == "workday":
+            self.workday_calendar = WorkdayCalendar(holiday_file)
+            self._time_ratio = self.workday_calendar.time_ratio
+        else:
+            self._time_ratio = calendar_engine.time_ratio
 
     def calculate_remaining_leave(
         self,
@@ -26,6 +149,7 @@ class LeaveCalculator:
         算法：
         1. 理论时长 = 已用时长 + 实际剩余时长
         2. 时间比例 = (当年1月1日至离职日期天数) / 当年总天数
+           （workday 模式下分子、分母均为工作日数）
         3. 剩余年假 = 理论时长 × 时间比例 - 已用时长
         
         Args:
@@ -54,28 +178,19 @@ class LeaveCalculator:
             # 保留2位小数
             remaining_days = round(remaining_days, 2)
             
-            # 构建详细计算信息
-            calculation_details = {
-                "theoretical_hours": leave_balance.theoretical_hours,
-                "used_hours": leave_balance.used_hours,
-                "remaining_hours_before_calc": leave_balance.remaining_hours,
-                "resignation_date": resignation_date.strftime("%Y-%m-%d"),
-                "time_ratio": round(time_ratio, 4),
-                "entitled_hours": round(entitled_hours, 2),
-                "final_remaining_hours": round(remaining_hours, 2),
-                "final_remaining_days": remaining_days,
-                "calculation_formula": (
-                    f"剩余年假 = ({leave_balance.theoretical_hours} × {time_ratio:.4f}) - {leave_balance.used_hours} "
-                    f"= {entitled_hours:.2f} - {leave_balance.used_hours} = {remaining_hours:.2f}小时 = {remaining_days}天"
-                )
-            }
-            
             self.logger.info(f"年假计算完成: {remaining_days}天")
             
-            return CalculationResult(
+            # 构建计算结果（详细信息在访问时生成）
+            return _build_calculation_result(
+                theoretical_hours=leave_balance.theoretical_hours,
+                used_hours=leave_balance.used_hours,
+                remaining_hours_before_calc=leave_balance.remaining_hours,
+                resignation_date=resignation_date,
+                time_ratio=time_ratio,
+                entitled_hours=entitled_hours,
+                remaining_hours=remaining_hours,
                 remaining_days=remaining_days,
-                calculation_details=calculation_details,
-                success=True
+                proration_mode=self.proration_mode
             )
             
         except Exception as e:
@@ -84,11 +199,121 @@ class LeaveCalculator:
             
             return CalculationResult(
                 remaining_days=0.0,
-                calculation_details={},
                 success=False,
                 error_message=error_msg
             )
 
+    def calculate_remaining_leave_batch(
+        self,
+        theoretical_hours: Sequence[float],
+        used_hours: Sequence[float],
+        resignation_dates: Sequence
+    ) -> LeaveCalculationColumns:
+        """
+        批量计算剩余年假天数（列式输入/输出）
+
+        与 calculate_remaining_leave 使用相同算法，安装numpy时一次向量化完成
+        时间比例、应得时长和剩余时长的计算，不为每行构建格式化文本。
+
+        Args:
+            theoretical_hours: 理论时长列
+            used_hours: 已用时长列
+            resignation_dates: 离职日期列（date、YYYY-MM-DD 字符串或 datetime64）
+
+        Returns:
+            LeaveCalculationColumns: 列式计算结果
+
+        Raises:
+            ValueError: 各列长度不一致或日期无法解析时抛出
+        """
+        if not (len(theoretical_hours) == len(used_hours) == len(resignation_dates)):
+            raise ValueError("批量计算的各列长度必须一致")
+
+        if _load_numpy() is not None:
+            return self._calculate_batch_numpy(theoretical_hours, used_hours, resignation_dates)
+        return self._calculate_batch_python(theoretical_hours, used_hours, resignation_dates)
+
+    def _calculate_batch_numpy(self, theoretical_hours, used_hours, resignation_dates) -> LeaveCalculationColumns:
+        """使用numpy向量化计算"""
+        np = _load_numpy()
+        theoretical = np.asarray(theoretical_hours, dtype=np.float64)
+        used = np.asarray(used_hours, dtype=np.float64)
+        dates = np.asarray(resignation_dates, dtype="datetime64[D]")
+
+        # 年初和次年年初之差即当年总天数，自动处理闰年
+        years = dates.astype("datetime64[Y]")
+        year_start = years.astype("datetime64[D]")
+        next_year_start = (years + 1).astype("datetime64[D]")
+        days_worked = (dates - year_start).astype(np.int64) + 1  # 包含离职当天
+
+        if self.workday_calendar is None:
+            total_days = (next_year_start - year_start).astype(np.int64)
+            time_ratio = days_worked / total_days
+        else:
+            # 按年份分组查询工作日比例表
+            year_numbers = years.astype(np.int64) + 1970
+            time_ratio = np.empty(len(dates), dtype=np.float64)
+            for year in np.unique(year_numbers).tolist():
+                mask = year_numbers == year
+                table = np.frombuffer(self.workday_calendar.ratio_table(year), dtype=np.float64)
+                time_ratio[mask] = table[days_worked[mask]]
+        entitled = theoretical * time_ratio
+        remaining = np.maximum(entitled - used, 0.0)
+        remaining_days = np.round(remaining / 24, 2)
+
+        self.logger.info(f"批量年假计算完成: {len(remaining_days)} 行")
+        return LeaveCalculationColumns(
+            theoretical_hours=theoretical,
+            used_hours=used,
+            resignation_dates=dates.astype(object).tolist(),
+            time_ratio=time_ratio,
+            entitled_hours=entitled,
+            remaining_hours=remaining,
+            remaining_days=remaining_days,
+            proration_mode=self.proration_mode
+        )
+
+    def _calculate_batch_python(self, theoretical_hours, used_hours, resignation_dates) -> LeaveCalculationColumns:
+        """未安装numpy时的逐行计算，结果存放在紧凑的 array('d') 中"""
+        dates = [self._to_date(value) for value in resignation_dates]
+        theoretical = array("d", theoretical_hours)
+        used = array("d", used_hours)
+        time_ratio = array("d")
+        entitled = array("d")
+        remaining = array("d")
+        remaining_days = array("d")
+
+        ratio_of = self._time_ratio
+        for i, resignation_date in enumerate(dates):
+            ratio = ratio_of(resignation_date)
+            entitled_hours = theoretical[i] * ratio
+            remaining_hours = max(0.0, entitled_hours - used[i])
+            time_ratio.append(ratio)
+            entitled.append(entitled_hours)
+            remaining.append(remaining_hours)
+            remaining_days.append(round(remaining_hours / 24, 2))
+
+        self.logger.info(f"批量年假计算完成: {len(remaining_days)} 行")
+        return LeaveCalculationColumns(
+            theoretical_hours=theoretical,
+            used_hours=used,
+            resignation_dates=dates,
+            time_ratio=time_ratio,
+            entitled_hours=entitled,
+            remaining_hours=remaining,
+            remaining_days=remaining_days,
+            proration_mode=self.proration_mode
+        )
+
+    @staticmethod
+    def _to_date(value) -> date:
+        """将日期列中的单个值转换为 date"""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
     def calculate_time_ratio(self, resignation_date: date) -> float:
         """
         计算时间比例
@@ -99,19 +324,17 @@ class LeaveCalculator:
         Returns:
             float: 时间比例 (0-1之间)
         """
-        year = resignation_date.year
-        
-        # 计算年初到离职日期的天数
-        year_start = date(year, 1, 1)
-        days_worked = (resignation_date - year_start).days + 1  # 包含离职当天
-        
-        # 计算当年总天数
-        total_days = self.get_year_total_days(year)
+        # 查询按年份缓存的比例表（包含离职当天）
+        ratio = self._time_ratio(resignation_date)
         
-        # 计算比例
-        ratio = days_worked / total_days
-        
-        self.logger.debug(f"时间比例计算: {days_worked}/{total_days} = {ratio:.4f}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            if self.workday_calendar is None:
+                days_worked = calendar_engine.day_of_year(resignation_date)
+                total_days = calendar_engine.days_in_year(resignation_date.year)
+            else:
+                days_worked = self.workday_calendar.workdays_through(resignation_date)
+                total_days = self.workday_calendar.workdays_in_year(resignation_date.year)
+            self.logger.debug(f"时间比例计算: {days_worked}/{total_days} = {ratio:.4f}")
         
         return ratio
 
@@ -125,10 +348,7 @@ class LeaveCalculator:
         Returns:
             int: 总天数
         """
-        if self.is_leap_year(year):
-            return 366
-        else:
-            return 365
+        return calendar_engine.days_in_year(year)
 
     def is_leap_year(self, year: int) -> bool:
         """
@@ -140,7 +360,7 @@ class LeaveCalculator:
         Returns:
             bool: 是否为闰年
         """
-        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        return calendar_engine.is_leap_year(year)
 
     def get_days_from_year_start(self, target_date: date) -> int:
         """
@@ -152,8 +372,7 @@ class LeaveCalculator:
         Returns:
             int: 天数
         """
-        year_start = date(target_date.year, 1, 1)
-        return (target_date - year_start).days + 1
+        return calendar_engine.day_of_year(target_date)
 
     def validate_calculation_input(self, input_data: CalculationInput) -> bool:
         """
@@ -185,11 +404,24 @@ class LeaveCalculator:
         if not result.success:
             return f"计算失败: {result.error_message}"
         
-        details = result.calculation_details
+        figures = result.figures
+        if figures is None:
+            details = result.calculation_details
+            if not details:
+                return f"剩余年假: {result.remaining_days}天"
+            # 以旧方式构造的结果只有详细信息字典
+            return (
+                f"剩余年假: {result.remaining_days}天\n"
+                f"理论时长: {details.get('theoretical_hours', 0)}小时\n"
+                f"已用时长: {details.get('used_hours', 0)}小时\n"
+                f"时间比例: {details.get('time_ratio', 0):.2%}\n"
+                f"计算公式: {details.get('calculation_formula', '')}"
+            )
         return (
             f"剩余年假: {result.remaining_days}天\n"
-            f"理论时长: {details.get('theoretical_hours', 0)}小时\n"
-            f"已用时长: {details.get('used_hours', 0)}小时\n"
-            f"时间比例: {details.get('time_ratio', 0):.2%}\n"
-            f"计算公式: {details.get('calculation_formula', '')}"
+            f"理论时长: {figures.theoretical_hours}小时\n"
+            f"已用时长: {figures.used_hours}小时\n"
+            f"时间比例: {round(figures.time_ratio, 4):.2%}"
+            f"{'（按工作日）' if figures.proration_mode == 'workday' else ''}\n"
+            f"计算公式: {figures.formula()}"
         )
\ No newline at end of file
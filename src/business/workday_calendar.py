@@ -0,0 +1,186 @@
+"""
+工作日日历模块
+
+从本地数据文件加载法定节假日与调休上班日，为每个年份构建：
+
+- 按天的工作日标记（bytearray，下标 n 为当年第 n 天，1 为工作日）
+- 工作日前缀和（array('H')，下标 n 为截至当年第 n 天（含）的工作日数）
+
+年份首次使用时构建一次，之后统计任意两个日期之间的工作日数、按工作日计算时间比例
+都只是几次数组下标访问，批量计算时不再逐天循环。
+"""
+import json
+import logging
+import threading
+from array import array
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from . import calendar_engine
+
+
+DEFAULT_HOLIDAY_FILE = Path(__file__).parent / "data" / "holidays_cn.json"
+
+
+class _WorkdayYear:
+    """单个年份的工作日标记及前缀和"""
+
+    __slots__ = ("flags", "prefix", "ratios")
+
+    def __init__(self, year: int, holidays: Set[date], workdays: Set[date]):
+        """
+        Args:
+            year: 年份
+            holidays: 当年的法定节假日（含调休放假的工作日）
+            workdays: 当年的调休上班日（周末）
+        """
+        total = calendar_engine.days_in_year(year)
+        start = date(year, 1, 1)
+        flags = bytearray(total + 1)
+        prefix = array("H", [0]) * (total + 1)
+        count = 0
+        for day in range(1, total + 1):
+            current = start + timedelta(days=day - 1)
+            if current in workdays or (current.weekday() < 5 and current not in holidays):
+                flags[day] = 1
+                count += 1
+            prefix[day] = count
+        self.flags = bytes(flags)
+        self.prefix = prefix
+        # 下标 n 为截至当年第 n 天（含）的工作日占全年工作日的比例
+        self.ratios = array("d", (worked / count for worked in prefix)) if count else array("d", [0.0]) * (total + 1)
+
+
+class WorkdayCalendar:
+    """工作日日历（构建后只读，可在线程间共享）"""
+
+    def __init__(self, data_file: Optional[str] = None):
+        """
+        加载节假日数据
+
+        数据文件缺失或格式错误时记录错误，所有年份退化为按周一至周五计算工作日。
+
+        Args:
+            data_file: 节假日数据文件路径，默认使用内置的 data/holidays_cn.json
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_file = Path(data_file) if data_file else DEFAULT_HOLIDAY_FILE
+        self._adjustments: Dict[int, Tuple[Set[date], Set[date]]] = self._load(self.data_file)
+        self._years: Dict[int, _WorkdayYear] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, path: Path) -> Dict[int, Tuple[Set[date], Set[date]]]:
+        """读取数据文件，返回 年份 -> (节假日集合, 调休上班日集合)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            adjustments = {}
+            for year, entry in data["years"].items():
+                holidays = {date.fromisoformat(value) for value in entry.get("holidays", [])}
+                workdays = {date.fromisoformat(value) for value in entry.get("workdays", [])}
+                adjustments[int(year)] = (holidays, workdays)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            self.logger.error(f"❌ 加载节假日数据失败: {path} - {str(e)}，按周一至周五计算工作日")
+            return {}
+        self.logger.debug(f"📅 已加载节假日数据: {path}（{', '.join(map(str, sorted(adjustments)))}年）")
+        return adjustments
+
+    def has_year(self, year: int) -> bool:
+        """数据文件中是否包含指定年份的节假日安排"""
+        return year in self._adjustments
+
+    def _year(self, year: int) -> _WorkdayYear:
+        """获取指定年份的工作日表，首次使用时构建"""
+        table = self._years.get(year)
+        if table is None:
+            with self._lock:
+                table = self._years.get(year)
+                if table is None:
+                    adjustment = self._adjustments.get(year)
+                    if adjustment is None:
+                        self.logger.warning(f"⚠️ 节假日数据中没有{year}年，按周一至周五计算工作日")
+                        adjustment = (set(), set())
+                    table = _WorkdayYear(year, *adjustment)
+                    self._years[year] = table
+        return table
+
+    def is_workday(self, target_date: date) -> bool:
+        """
+        判断指定日期是否为工作日
+
+        Args:
+            target_date: 目标日期
+
+        Returns:
+            bool: 是否为工作日
+        """
+        return self._year(target_date.year).flags[calendar_engine.day_of_year(target_date)] == 1
+
+    def workdays_in_year(self, year: int) -> int:
+        """
+        获取指定年份的工作日总数
+
+        Args:
+            year: 年份
+
+        Returns:
+            int: 工作日数
+        """
+        return self._year(year).prefix[-1]
+
+    def workdays_through(self, target_date: date) -> int:
+        """
+        计算年初至指定日期（含当天）的工作日数
+
+        Args:
+            target_date: 目标日期
+
+        Returns:
+            int: 工作日数
+        """
+        return self._year(target_date.year).prefix[calendar_engine.day_of_year(target_date)]
+
+    def count_workdays(self, start: date, end: date) -> int:
+        """
+        统计两个日期之间（均含）的工作日数
+
+        Args:
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            int: 工作日数，结束日期早于开始日期时为0
+        """
+        if end < start:
+            return 0
+        count = self.workdays_through(end) - self.workdays_through(start) + self._year(start.year).flags[
+            calendar_engine.day_of_year(start)
+        ]
+        for year in range(start.year, end.year):
+            count += self.workdays_in_year(year)
+        return count
+
+    def ratio_table(self, year: int) -> array:
+        """
+        获取指定年份按工作日计算的时间比例查询表
+
+        Args:
+            year: 年份
+
+        Returns:
+            array: 与 calendar_engine.ratio_table 相同布局的 array('d')，下标 n 为截至当年第 n 天（含）的工作日比例
+        """
+        return self._year(year).ratios
+
+    def time_ratio(self, target_date: date) -> float:
+        """
+        计算年初至指定日期（含当天）的工作日占全年工作日的比例
+
+        Args:
+            target_date: 目标日期
+
+        Returns:
+            float: 时间比例 (0-1之间)
+        """
+        return self._year(target_date.year).ratios[calendar_engine.day_of_year(target_date)]
@@ -9,16 +9,38 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, date
 import threading
+import itertools
 import queue
 import logging
-from tkcalendar import DateEntry
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.insert(0, project_root)
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from business.controller import BusinessController
+# 计算进行期间主线程检查结果队列的间隔（毫秒）
+RESULT_POLL_INTERVAL_MS = 50
+
+
+class CalculationHandle:
+    """一次后台计算的句柄，用于取消和识别过期结果"""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, employee_name, leave_date):
+        self.id = next(self._ids)
+        self.employee_name = employee_name
+        self.leave_date = leave_date
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """请求取消计算"""
+        self.cancel_event.set()
+    
+    @property
+    def cancelled(self):
+        """是否已取消"""
+        return self.cancel_event.is_set()
 
 
 class MainWindow:
@@ -27,7 +49,9 @@ class MainWindow:
     def __init__(self):
         """初始化主窗口"""
         self.logger = logging.getLogger(__name__)
-        self.controller = BusinessController()
+        # 业务控制器依赖 requests 等较重的模块，窗口显示后再在后台加载
+        self._controller = None
+        self._controller_lock = threading.Lock()
         
         # 创建主窗口
         self.root = tk.Tk()
@@ -35,18 +59,43 @@ class MainWindow:
         self.root.geometry("500x400")
         self.root.resizable(False, False)
         
-        # 线程安全的结果队列
+        # 线程安全的结果队列：后台线程只写入队列，主线程用 after 定时取出，后台线程不调用任何Tk方法
         self.result_queue = queue.Queue()
+        self._current_calculation = None
+        # 结果队列轮询的 after 任务ID，没有进行中的计算时为None
+        self._result_poll_id = None
         
         # 创建界面
         self._create_widgets()
         self._setup_layout()
         
-        # 启动结果检查器
-        self._check_results()
+        # 窗口显示后预加载业务控制器，首次计算时无需等待导入
+        self.root.after_idle(self._preload_controller)
         
         self.logger.info("GUI界面初始化完成")
     
+    @property
+    def controller(self):
+        """获取业务控制器（懒加载）"""
+        if self._controller is None:
+            with self._controller_lock:
+                if self._controller is None:
+                    from business.controller import BusinessController
+                    self._controller = BusinessController()
+        return self._controller
+    
+    def _preload_controller(self):
+        """在后台线程中加载业务控制器"""
+        def preload():
+            try:
+                # 同时拉取通讯录，供姓名联想使用
+                self.controller.preload_employee_directory()
+            except Exception as e:
+                # 失败时留到首次计算再报告
+                self.logger.warning(f"预加载业务控制器失败: {e}")
+        
+        threading.Thread(target=preload, daemon=True).start()
+    
     def _create_widgets(self):
         """创建界面组件"""
         # 主框架
@@ -63,6 +112,15 @@ class MainWindow:
         self.name_entry = ttk.Entry(main_frame, width=30)
         self.name_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5)
         
+        # 姓名联想下拉列表，有候选时浮动显示在输入框下方
+        self.suggestion_list = tk.Listbox(main_frame, height=6, activestyle=tk.DOTBOX)
+        self.name_entry.bind("<KeyRelease>", self._on_name_key)
+        self.name_entry.bind("<Down>", self._focus_suggestions)
+        self.name_entry.bind("<FocusOut>", lambda event: self.root.after(150, self._hide_suggestions_unless_focused))
+        self.suggestion_list.bind("<Return>", self._accept_suggestion)
+        self.suggestion_list.bind("<Double-Button-1>", self._accept_suggestion)
+        self.suggestion_list.bind("<Escape>", lambda event: self._hide_suggestions())
+        
         # 离职日期
         ttk.Label(main_frame, text="离职日期:").grid(row=2, column=0, sticky=tk.W, pady=5)
         
@@ -103,6 +161,11 @@ class MainWindow:
                                  command=self._on_clear)
         clear_button.pack(side=tk.LEFT, padx=5)
         
+        # 取消按钮，仅在计算进行中可用
+        self.cancel_button = ttk.Button(button_frame, text="取消",
+                                       command=self._on_cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
         # 结果显示区域
         result_frame = ttk.LabelFrame(main_frame, text="计算结果", padding="10")
         result_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
@@ -135,6 +198,56 @@ class MainWindow:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
+    def _on_name_key(self, event):
+        """姓名输入变化时更新联想候选"""
+        if event.keysym in ("Down", "Up", "Return", "Tab", "Escape"):
+            if event.keysym == "Escape":
+                self._hide_suggestions()
+            return
+        
+        # 控制器尚未在后台加载完成时不联想，避免阻塞界面
+        controller = self._controller
+        names = controller.suggest_employee_names(self.name_entry.get()) if controller else []
+        if not names:
+            self._hide_suggestions()
+            return
+        
+        self.suggestion_list.delete(0, tk.END)
+        for name in names:
+            self.suggestion_list.insert(tk.END, name)
+        self.suggestion_list.config(height=min(len(names), 6))
+        self.suggestion_list.place(in_=self.name_entry, x=0, rely=1.0, relwidth=1.0)
+        self.suggestion_list.lift()
+    
+    def _focus_suggestions(self, event=None):
+        """按下方向键时进入候选列表"""
+        if self.suggestion_list.winfo_ismapped():
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, tk.END)
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+        return "break"
+    
+    def _accept_suggestion(self, event=None):
+        """选中候选姓名"""
+        selection = self.suggestion_list.curselection()
+        if selection:
+            self.name_entry.delete(0, tk.END)
+            self.name_entry.insert(0, self.suggestion_list.get(selection[0]))
+        self._hide_suggestions()
+        self.name_entry.focus_set()
+        self.name_entry.icursor(tk.END)
+        return "break"
+    
+    def _hide_suggestions(self):
+        """隐藏联想列表"""
+        self.suggestion_list.place_forget()
+    
+    def _hide_suggestions_unless_focused(self):
+        """输入框失去焦点时隐藏联想列表（焦点移到列表上时除外）"""
+        if self.root.focus_get() is not self.suggestion_list:
+            self._hide_suggestions()
+    
     def _show_calendar(self):
         """显示日历选择器"""
         try:
@@ -215,50 +328,88 @@ class MainWindow:
         #     messagebox.showerror("错误", "离职日期不能超过今天")
         #     return
         
-        # 禁用按钮，显示计算状态
-        self.calc_button.config(state=tk.DISABLED)
+        # 新的计算取代进行中的计算，而不是排在其后
+        if self._current_calculation is not None:
+            self._current_calculation.cancel()
+            self.logger.info(f"已取消上一次计算: 员工={self._current_calculation.employee_name}")
+        
+        handle = CalculationHandle(employee_name, leave_date)
+        self._current_calculation = handle
+        
+        # 计算期间仍可再次点击计算，取消按钮可用
+        self.cancel_button.config(state=tk.NORMAL)
         self._update_result_display("正在计算年假，请稍候...", "blue")
         
         # 启动后台计算
-        thread = threading.Thread(target=self._calculate_background, 
-                                 args=(employee_name, leave_date))
+        thread = threading.Thread(target=self._calculate_background, args=(handle,))
         thread.daemon = True
         thread.start()
+        self._schedule_result_poll()
         
         self.logger.info(f"开始计算: 员工={employee_name}, 离职日期={leave_date}")
     
-    def _calculate_background(self, employee_name, leave_date):
+    def _on_cancel(self):
+        """取消按钮点击事件"""
+        handle = self._current_calculation
+        if handle is None:
+            return
+        handle.cancel()
+        self._current_calculation = None
+        self._update_result_display("已取消计算", "gray")
+        self._set_idle()
+        self.logger.info(f"用户取消计算: 员工={handle.employee_name}")
+    
+    def _calculate_background(self, handle):
         """后台计算年假"""
         try:
             # 调用业务逻辑
             result = self.controller.process_leave_calculation(
-                employee_name, leave_date.strftime('%Y-%m-%d')
+                handle.employee_name,
+                handle.leave_date.strftime('%Y-%m-%d'),
+                cancel_event=handle.cancel_event
             )
             
             # 将结果放入队列
-            self.result_queue.put(('success', result))
+            self.result_queue.put((handle, 'success', result))
             
         except Exception as e:
             self.logger.error(f"计算失败: {e}")
-            self.result_queue.put(('error', str(e)))
+            self.result_queue.put((handle, 'error', str(e)))
     
-    def _check_results(self):
-        """检查结果队列并更新UI"""
-        try:
-            # 非阻塞检查队列
-            result_type, result_data = self.result_queue.get_nowait()
+    def _schedule_result_poll(self):
+        """在主线程中开始轮询结果队列（已在轮询时不重复安排）"""
+        if self._result_poll_id is None:
+            self._result_poll_id = self.root.after(RESULT_POLL_INTERVAL_MS, self._poll_results)
+    
+    def _poll_results(self):
+        """主线程定时任务：处理已完成的结果，仍有进行中的计算时继续轮询"""
+        self._result_poll_id = None
+        self._process_results()
+        if self._current_calculation is not None:
+            self._schedule_result_poll()
+    
+    def _process_results(self):
+        """处理结果队列中的所有结果，丢弃已取消或已被取代的计算结果"""
+        while True:
+            try:
+                handle, result_type, result_data = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if handle is not self._current_calculation or handle.cancelled:
+                self.logger.debug(f"丢弃过期的计算结果: #{handle.id} 员工={handle.employee_name}")
+                continue
             
+            self._current_calculation = None
             if result_type == 'success':
                 self._show_success_result(result_data)
             else:
                 self._show_error_result(result_data)
-                
-        except queue.Empty:
-            # 队列为空，继续检查
-            pass
-        
-        # 每100ms检查一次
-        self.root.after(100, self._check_results)
+    
+    def _set_idle(self):
+        """恢复空闲状态的按钮"""
+        self.calc_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
     
     def _show_success_result(self, result_data):
         """显示成功结果 - 简化界面，去掉标题"""
@@ -292,7 +443,7 @@ class MainWindow:
             details_text = ""
             details_text += f"• 理论年假: {calculation_details.get('theoretical_hours', 0):.1f} 小时\n"
             details_text += f"• 已使用: {calculation_details.get('used_hours', 0):.1f} 小时\n"
-            details_text += f"• 实际剩余: {calculation_details.get('actual_remaining_hours', 0):.1f} 小时\n"
+            details_text += f"• 实际剩余: {calculation_details.get('final_remaining_hours', 0):.1f} 小时\n"
             details_text += f"• 时间比例: {calculation_details.get('time_ratio', 0):.2%}\n"
             
             self.result_text.insert(tk.END, details_text, "details_content")
@@ -301,7 +452,7 @@ class MainWindow:
         self.result_text.tag_configure("main_result", justify="center")
         
         self.result_text.config(state=tk.DISABLED)
-        self.calc_button.config(state=tk.NORMAL)
+        self._set_idle()
         
         self.logger.info(f"计算成功: 剩余年假 {remaining_days:.1f} 天")
     
@@ -330,7 +481,7 @@ class MainWindow:
             self.result_text.insert(tk.END, f"❌ {error_msg}", "error_content")
         
         self.result_text.config(state=tk.DISABLED)
-        self.calc_button.config(state=tk.NORMAL)
+        self._set_idle()
         
         self.logger.error(f"计算失败: {error_msg}")
     
@@ -343,11 +494,17 @@ class MainWindow:
     
     def _on_clear(self):
         """处理清空按钮点击事件"""
+        # 取消进行中的计算
+        if self._current_calculation is not None:
+            self._current_calculation.cancel()
+            self._current_calculation = None
+        
         # 重置所有输入字段
         self.name_entry.delete(0, tk.END)
+        self._hide_suggestions()
         self.date_var.set(date.today().strftime('%Y-%m-%d'))
         self._update_result_display("")
-        self.calc_button.config(state=tk.NORMAL)
+        self._set_idle()
     
     def run(self):
         """运行主循环"""
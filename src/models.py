@@ -1,12 +1,49 @@
 """
 数据模型定义
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 
-@dataclass
+def _slotted(cls):
+    """
+    为冻结的 dataclass 重建带 __slots__ 的类，每个实例不再携带 __dict__
+
+    与 Python 3.10+ 的 dataclass(slots=True) 做法相同，但在 3.8/3.9 上同样生效。
+    字段默认值已写入生成的 __init__，因此可以从类属性中移除，避免与 __slots__ 冲突。
+
+    Args:
+        cls: 已由 dataclass(frozen=True) 处理过的类
+
+    Returns:
+        带 __slots__ 的新类
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in field_names:
+        namespace.pop(name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = field_names
+
+    def __getstate__(self):
+        return [getattr(self, name) for name in field_names]
+
+    def __setstate__(self, state):
+        # 冻结实例的 __setattr__ 会抛异常，反序列化时直接写入槽位
+        for name, value in zip(field_names, state):
+            object.__setattr__(self, name, value)
+
+    namespace["__getstate__"] = __getstate__
+    namespace["__setstate__"] = __setstate__
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
+@_slotted
+@dataclass(frozen=True)
 class LeaveBalance:
     """假期余额数据模型"""
     used_hours: float
@@ -20,19 +57,106 @@ class LeaveBalance:
         return self.theoretical_hours
 
 
-@dataclass
+@_slotted
+@dataclass(frozen=True)
+class CalculationFigures:
+    """年假计算的原始中间量，详细信息和公式文本由此按需生成"""
+    theoretical_hours: float
+    used_hours: float
+    remaining_hours_before_calc: float
+    resignation_date: date
+    time_ratio: float
+    entitled_hours: float
+    remaining_hours: float
+    remaining_days: float
+    proration_mode: str = "calendar"
+
+    def formula(self) -> str:
+        """计算公式文本"""
+        return (
+            f"剩余年假 = ({self.theoretical_hours} × {self.time_ratio:.4f}) - {self.used_hours} "
+            f"= {self.entitled_hours:.2f} - {self.used_hours} = {self.remaining_hours:.2f}小时 = {self.remaining_days}天"
+        )
+
+    def to_details(self) -> dict:
+        """生成计算详细信息字典"""
+        return {
+            "theoretical_hours": self.theoretical_hours,
+            "used_hours": self.used_hours,
+            "remaining_hours_before_calc": self.remaining_hours_before_calc,
+            "resignation_date": self.resignation_date.strftime("%Y-%m-%d"),
+            "time_ratio": round(self.time_ratio, 4),
+            "proration_mode": self.proration_mode,
+            "entitled_hours": round(self.entitled_hours, 2),
+            "final_remaining_hours": round(self.remaining_hours, 2),
+            "final_remaining_days": self.remaining_days,
+            "calculation_formula": self.formula()
+        }
+
+
+@_slotted
+@dataclass(frozen=True, init=False)
 class CalculationResult:
-    """计算结果数据模型"""
+    """
+    计算结果数据模型
+
+    成功的结果只保存原始中间量（figures），calculation_details 与 calculation_formula
+    在访问时才生成，只需要 remaining_days 的调用方（批量计算、HTTP服务）不做任何字符串格式化。
+    仍兼容旧的构造方式 CalculationResult(remaining_days, calculation_details, success, error_message)。
+    """
     remaining_days: float
-    calculation_details: dict
     success: bool
-    error_message: str = ""
+    error_message: str
+    figures: Optional[CalculationFigures]
+    # 以旧方式直接传入的计算详细信息，为None时由 figures 按需生成
+    explicit_details: Optional[dict] = field(default=None, init=False, hash=False)
+
+    def __init__(
+        self,
+        remaining_days: float,
+        calculation_details: Optional[dict] = None,
+        success: bool = False,
+        error_message: str = "",
+        *,
+        figures: Optional[CalculationFigures] = None
+    ):
+        """
+        初始化计算结果
+
+        Args:
+            remaining_days: 剩余年假天数
+            calculation_details: 计算详细信息，提供 figures 时可省略
+            success: 计算是否成功
+            error_message: 失败原因
+            figures: 计算的原始中间量（仅限关键字参数）
+        """
+        object.__setattr__(self, "remaining_days", remaining_days)
+        object.__setattr__(self, "success", success)
+        object.__setattr__(self, "error_message", error_message)
+        object.__setattr__(self, "figures", figures)
+        object.__setattr__(self, "explicit_details", calculation_details)
 
     @property
     def remaining_hours(self) -> float:
         """剩余小时数"""
         return self.remaining_days * 24  # 假设一天24小时
 
+    @property
+    def calculation_details(self) -> dict:
+        """计算详细信息（由 figures 生成时每次访问重新生成，失败的结果为空字典）"""
+        if self.explicit_details is not None:
+            return self.explicit_details
+        if self.figures is None:
+            return {}
+        return self.figures.to_details()
+
+    @property
+    def calculation_formula(self) -> str:
+        """计算公式文本，失败的结果为空字符串"""
+        if self.figures is None:
+            return self.calculation_details.get("calculation_formula", "")
+        return self.figures.formula()
+
 
 @dataclass
 class WeChatConfig:
@@ -73,17 +197,92 @@ class CalculationInput:
         if self.resignation_date.year > current_year + 1:
             return ValidationResult(False, f"离职日期不能超过{current_year + 1}年")
 
-        if self.resignation_date.year != 2025:
-            return ValidationResult(False, "目前只支持2025年的年假计算")
-
         return ValidationResult(True)
 
 
-@dataclass
+@_slotted
+@dataclass(frozen=True)
 class Employee:
     """员工信息数据模型"""
     user_id: str
     name: str
     department: Optional[str] = None
     position: Optional[str] = None
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+
+
+@dataclass
+class BatchItem:
+    """批量计算输入行数据模型"""
+    row_number: int
+    employee_name: str
+    resignation_date: str
+
+
+@dataclass
+class BatchItemResult:
+    """批量计算单行结果数据模型"""
+    item: BatchItem
+    result: CalculationResult
+    elapsed_ms: float
+
+
+@dataclass
+class BatchReport:
+    """批量计算报告数据模型"""
+    results: List[BatchItemResult] = field(default_factory=list)
+    total_seconds: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        """成功行数"""
+        return sum(1 for r in self.results if r.result.success)
+
+    @property
+    def failure_count(self) -> int:
+        """失败行数"""
+        return len(self.results) - self.success_count
+
+    @property
+    def throughput(self) -> float:
+        """吞吐量（行/秒）"""
+        if self.total_seconds <= 0:
+            return 0.0
+        return len(self.results) / self.total_seconds
+
+    def latency_percentile(self, percentile: float) -> float:
+        """
+        单行耗时百分位数（毫秒）
+
+        Args:
+            percentile: 百分位 (0-100)
+        """
+        latencies = sorted(r.elapsed_ms for r in self.results)
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, max(0, int(round(percentile / 100 * len(latencies))) - 1))
+        return latencies[index]
+
+
+@dataclass
+class HistoryRecord:
+    """计算历史记录数据模型"""
+    id: int
+    created_at: float
+    employee_name: str
+    resignation_date: str
+    success: bool
+    remaining_days: float
+    error_message: str = ""
+    elapsed_ms: float = 0.0
+    theoretical_hours: Optional[float] = None
+    used_hours: Optional[float] = None
+    time_ratio: Optional[float] = None
+
+
+@dataclass
+class HistoryPage:
+    """计算历史分页结果数据模型"""
+    records: List[HistoryRecord] = field(default_factory=list)
+    # 下一页游标，没有更多记录时为None
+    next_cursor: Optional[str] = None
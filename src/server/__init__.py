@@ -0,0 +1,3 @@
+"""
+HTTP服务模块
+"""
@@ -0,0 +1,506 @@
+"""
+无界面HTTP JSON服务
+
+将业务控制器以本地HTTP JSON接口提供给其他系统（如HR门户）调用。
+所有请求共享同一个已预热的 BusinessController，通讯录索引、access_token 和余额缓存在调用方之间复用；
+请求由固定大小的线程池处理并支持 HTTP/1.1 长连接：空闲的长连接交给轮询线程等待下一个请求，
+不占用工作线程；线程池满时暂停accept，新连接在内核监听队列（SERVER_BACKLOG）中排队。
+
+接口:
+    GET  /health          健康检查
+    GET  /config/status   配置状态
+    GET  /metrics         运行指标（Prometheus文本格式，?format=json 返回JSON快照）
+    POST /calculate       {"employee_name": "张三", "resignation_date": "2025-06-30"}
+    POST /batch           {"items": [{"employee_name": ..., "resignation_date": ...}], "max_workers": 8}
+                          max_workers 可选，不超过 BATCH_MAX_WORKERS 配置
+
+计算接口默认只返回结果，请求体 "details": true 或查询参数 ?details=1 时附带 calculation_details。
+"""
+import json
+import time
+import socket
+import logging
+import selectors
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from models import BatchItem, CalculationResult
+
+
+# 请求体大小上限（字节）
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HTTPError(Exception):
+    """请求处理错误，对应一个HTTP状态码"""
+    def __init__(self, status: int, message: str):
+        self.status = status
+        self.message = message
+        super().__init__(message)
+
+
+def result_to_dict(result: CalculationResult, details: bool = False) -> Dict[str, Any]:
+    """
+    将计算结果转换为JSON响应数据
+
+    Args:
+        result: 计算结果
+        details: 是否附带 calculation_details；计算明细按需生成，默认不输出
+
+    Returns:
+        dict: 响应数据
+    """
+    data = {
+        "success": result.success,
+        "remaining_days": result.remaining_days,
+        "error_message": result.error_message
+    }
+    if details:
+        data["calculation_details"] = result.calculation_details
+    return data
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    线程池HTTP服务器
+
+    每个工作线程一次只处理一个连接上已到达的请求；响应后连接若保持打开，
+    交给轮询线程用 selector 等待，连接再次可读时才重新提交到线程池。
+    """
+
+    # 重启时允许立即复用端口
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        controller,
+        max_workers: int = 32,
+        backlog: int = 128,
+        keepalive_timeout: float = 30
+    ):
+        """
+        初始化服务器
+
+        Args:
+            server_address: (host, port)
+            handler_class: 请求处理类
+            controller: 所有请求共享的业务控制器
+            max_workers: 工作线程数，即同时处理的最大请求数
+            backlog: 内核监听队列长度，线程池满时新连接在此排队
+            keepalive_timeout: 长连接空闲超时（秒），超时后关闭连接
+        """
+        self.request_queue_size = backlog
+        self.controller = controller
+        self.max_workers = max_workers
+        self.keepalive_timeout = keepalive_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-worker")
+        # 已提交到线程池的连接数不超过工作线程数，线程池任务队列不会无限增长
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._closing = threading.Event()
+
+        # 等待下一个请求的长连接：只由轮询线程访问 selector，其他线程经 _parked 移交
+        self._selector = selectors.DefaultSelector()
+        self._parked: List["LeaveCalculatorHandler"] = []
+        self._parked_lock = threading.Lock()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._poller = threading.Thread(target=self._poll_idle, name="http-keepalive", daemon=True)
+
+        # 绑定端口失败时父类会调用 server_close()，因此上面的状态要先于父类初始化
+        super().__init__(server_address, handler_class)
+        self._poller.start()
+
+    def process_request(self, request, client_address):
+        """将新连接提交到线程池；线程池满时阻塞accept，直到有工作线程空闲"""
+        if not self._acquire_slot():
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._serve, request, client_address, None)
+
+    def _acquire_slot(self) -> bool:
+        """等待空闲工作线程，服务停止时返回False"""
+        while not self._slots.acquire(timeout=0.5):
+            if self._closing.is_set():
+                return False
+        return True
+
+    def _serve(self, request, client_address, handler: Optional["LeaveCalculatorHandler"]) -> None:
+        """工作线程：处理连接上已到达的请求，连接保持打开时交回轮询线程"""
+        try:
+            if handler is None:
+                handler = self.RequestHandlerClass(request, client_address, self)
+            else:
+                handler.handle_ready()
+            if handler.close_connection or self._closing.is_set():
+                self._close_handler(handler)
+            else:
+                self._park(handler)
+        except Exception:
+            self.handle_error(request, client_address)
+            if handler is not None:
+                self._close_handler(handler)
+            else:
+                self.shutdown_request(request)
+        finally:
+            self._slots.release()
+
+    def _park(self, handler: "LeaveCalculatorHandler") -> None:
+        """将空闲长连接交给轮询线程"""
+        handler.idle_deadline = time.monotonic() + self.keepalive_timeout
+        with self._parked_lock:
+            self._parked.append(handler)
+        self._wakeup()
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
+
+    def _close_handler(self, handler: "LeaveCalculatorHandler") -> None:
+        handler.close_connection = True
+        try:
+            handler.finish()
+        finally:
+            self.shutdown_request(handler.request)
+
+    def _poll_idle(self) -> None:
+        """轮询线程：连接可读时重新提交到线程池，空闲超时的连接直接关闭"""
+        while not self._closing.is_set():
+            with self._parked_lock:
+                parked, self._parked = self._parked, []
+            for handler in parked:
+                try:
+                    self._selector.register(handler.connection, selectors.EVENT_READ, handler)
+                except (OSError, ValueError):
+                    self._close_handler(handler)
+
+            # 关闭空闲超时的连接，本轮最多等到最近的截止时间
+            now = time.monotonic()
+            wait = 1.0
+            for key in list(self._selector.get_map().values()):
+                if key.data is None:
+                    continue
+                if key.data.idle_deadline <= now:
+                    self._selector.unregister(key.fileobj)
+                    self._close_handler(key.data)
+                else:
+                    wait = min(wait, key.data.idle_deadline - now)
+
+            for key, _ in self._selector.select(timeout=wait):
+                if key.data is None:
+                    try:
+                        while self._wakeup_recv.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                if not self._acquire_slot():
+                    self._close_handler(key.data)
+                    continue
+                self._pool.submit(self._serve, key.data.request, key.data.client_address, key.data)
+
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                self._close_handler(key.data)
+        self._selector.close()
+
+    def shutdown(self):
+        """停止accept循环；已在处理的请求继续执行完毕"""
+        self._closing.set()
+        self._wakeup()
+        super().shutdown()
+
+    def server_close(self):
+        """关闭监听socket、空闲长连接和线程池"""
+        self._closing.set()
+        self._wakeup()
+        super().server_close()
+        if self._poller.is_alive():
+            self._poller.join()
+        else:
+            self._selector.close()
+        self._wakeup_send.close()
+        self._wakeup_recv.close()
+        # 不等待正在处理的请求，与停止前的守护线程行为一致
+        self._pool.shutdown(wait=False)
+
+
+class LeaveCalculatorHandler(BaseHTTPRequestHandler):
+    """年假计算HTTP请求处理器"""
+
+    # HTTP/1.1 默认保持长连接
+    protocol_version = "HTTP/1.1"
+    # 读取单个请求的socket超时（秒）；请求之间的空闲时间由服务器的 keepalive_timeout 控制
+    timeout = 30
+    server_version = "LeaveCalculator/1.0"
+
+    logger = logging.getLogger(__name__)
+
+    # 长连接在轮询线程中等待的截止时间（time.monotonic）
+    idle_deadline = 0.0
+
+    def handle(self):
+        """处理连接上已到达的请求后返回，连接是否保持打开由 close_connection 决定"""
+        self.handle_ready()
+
+    def finish(self):
+        # 连接可能在请求之间交回轮询线程，由服务器在关闭连接时调用
+        if self.close_connection:
+            super().finish()
+
+    def handle_ready(self) -> None:
+        """处理一个请求，以及客户端已经流水线发送过来的后续请求"""
+        self.close_connection = True
+        try:
+            self.handle_one_request()
+            while not self.close_connection and self._request_pending():
+                self.handle_one_request()
+        except Exception:
+            self.close_connection = True
+            raise
+
+    def _request_pending(self) -> bool:
+        """非阻塞检查下一个请求的数据是否已到达（包括已读入缓冲区的部分）"""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            self.close_connection = True
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        """路由请求并写出JSON响应"""
+        started = time.perf_counter()
+        path, _, self.query = self.path.partition("?")
+        path = path.rstrip("/") or "/"
+        routes = {
+            ("GET", "/health"): self._handle_health,
+            ("GET", "/config/status"): self._handle_config_status,
+            ("GET", "/metrics"): self._handle_metrics,
+            ("POST", "/calculate"): self._handle_calculate,
+            ("POST", "/batch"): self._handle_batch
+        }
+
+        try:
+            handler = routes.get((method, path))
+            if handler is None:
+                if any(route_path == path for _, route_path in routes):
+                    raise HTTPError(405, f"不支持的请求方法: {method}")
+                raise HTTPError(404, f"未知接口: {path}")
+            status, payload = handler()
+        except HTTPError as e:
+            # 未读取的请求体会破坏长连接上的下一个请求，出错时关闭连接
+            self.close_connection = True
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            self.logger.error(f"❌ 处理请求 {method} {path} 失败: {str(e)}", exc_info=True)
+            status, payload = 500, {"error": f"服务器内部错误: {str(e)}"}
+
+        if isinstance(payload, str):
+            self._send_body(status, payload.encode("utf-8"), PROMETHEUS_CONTENT_TYPE)
+        else:
+            self._send_json(status, payload)
+        self.logger.debug(f"{method} {path} {status} {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def _read_json(self) -> Dict[str, Any]:
+        """读取并解析JSON请求体"""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length 无效")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"请求体超过 {MAX_BODY_BYTES} 字节")
+        if length <= 0:
+            raise HTTPError(400, "缺少JSON请求体")
+        try:
+            data = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise HTTPError(400, f"JSON解析失败: {str(e)}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "请求体必须是JSON对象")
+        return data
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                        "application/json; charset=utf-8")
+
+    def _send_body(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _require_str(data: Dict[str, Any], key: str) -> str:
+        value = data.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise HTTPError(400, f"缺少参数: {key}")
+        return value
+
+    def _handle_health(self) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"status": "ok"}
+
+    def _handle_config_status(self) -> Tuple[int, Dict[str, Any]]:
+        return 200, self.server.controller.get_config_status()
+
+    def _handle_metrics(self) -> Tuple[int, Union[str, Dict[str, Any]]]:
+        fmt = parse_qs(self.query).get("format", ["prometheus"])[0]
+        try:
+            return 200, self.server.controller.get_metrics(fmt)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    def _wants_details(self, data: Dict[str, Any]) -> bool:
+        """请求体 "details": true 或查询参数 ?details=1 时在结果中附带计算明细"""
+        if data.get("details") is True:
+            return True
+        value = parse_qs(self.query).get("details", [""])[0]
+        return value.lower() in ("1", "true", "yes")
+
+    def _handle_calculate(self) -> Tuple[int, Dict[str, Any]]:
+        data = self._read_json()
+        result = self.server.controller.process_leave_calculation(
+            self._require_str(data, "employee_name"),
+            self._require_str(data, "resignation_date"),
+            trace=bool(data.get("trace", False))
+        )
+        return 200, result_to_dict(result, self._wants_details(data))
+
+    def _handle_batch(self) -> Tuple[int, Dict[str, Any]]:
+        data = self._read_json()
+        raw_items = data.get("items")
+        if not isinstance(raw_items, list) or not raw_items:
+            raise HTTPError(400, "缺少参数: items")
+
+        items = []
+        for i, raw in enumerate(raw_items, start=1):
+            if not isinstance(raw, dict):
+                raise HTTPError(400, f"items[{i - 1}] 必须是JSON对象")
+            items.append(BatchItem(
+                row_number=i,
+                employee_name=self._require_str(raw, "employee_name"),
+                resignation_date=self._require_str(raw, "resignation_date")
+            ))
+
+        # 客户端指定的并发数不能超过 BATCH_MAX_WORKERS 配置
+        max_workers = self.server.controller.config_service.get_batch_config()["max_workers"]
+        requested = data.get("max_workers")
+        if requested is not None:
+            if not isinstance(requested, int) or isinstance(requested, bool) or requested < 1:
+                raise HTTPError(400, "max_workers 必须是正整数")
+            max_workers = min(requested, max_workers)
+
+        report = self.server.controller.process_batch_calculation(items, max_workers=max_workers)
+        details = self._wants_details(data)
+        return 200, {
+            "results": [
+                dict(result_to_dict(r.result, details), row_number=r.item.row_number,
+                     employee_name=r.item.employee_name, elapsed_ms=round(r.elapsed_ms, 1))
+                for r in report.results
+            ],
+            "summary": {
+                "total": len(report.results),
+                "success": report.success_count,
+                "failure": report.failure_count,
+                "total_seconds": round(report.total_seconds, 3),
+                "throughput": round(report.throughput, 1)
+            }
+        }
+
+    def log_message(self, format, *args):
+        # 访问日志降为DEBUG，避免高并发时日志成为瓶颈
+        self.logger.debug(format % args)
+
+
+class LeaveCalculatorServer:
+    """年假计算HTTP服务"""
+
+    def __init__(
+        self,
+        controller,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        max_workers: int = 32,
+        keepalive_timeout: float = 30,
+        backlog: int = 128
+    ):
+        """
+        初始化服务
+
+        Args:
+            controller: 所有请求共享的业务控制器
+            host: 监听地址
+            port: 监听端口，为0时自动分配
+            max_workers: 工作线程数，即同时处理的最大请求数
+            keepalive_timeout: 长连接空闲超时（秒）
+            backlog: 内核监听队列长度
+
+        Raises:
+            OSError: 端口绑定失败时抛出
+        """
+        self.logger = logging.getLogger(__name__)
+        self.controller = controller
+        self._server = PooledHTTPServer(
+            (host, port),
+            LeaveCalculatorHandler,
+            controller,
+            max_workers=max_workers,
+            backlog=backlog,
+            keepalive_timeout=keepalive_timeout
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """实际监听的 (host, port)"""
+        return self._server.server_address[:2]
+
+    def warm_up(self) -> None:
+        """预先拉取access_token和通讯录，使第一个请求无需等待"""
+        try:
+            self.controller.preload_employee_directory()
+            self.logger.info("✅ 通讯录已预热")
+        except Exception as e:
+            self.logger.warning(f"⚠️ 预热失败，将在首个请求时重试: {str(e)}")
+
+    def serve_forever(self) -> None:
+        """在当前线程中运行服务，直到 shutdown() 被调用"""
+        host, port = self.address
+        self.logger.info(f"🚀 HTTP服务已启动: http://{host}:{port} (工作线程 {self._server.max_workers})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self) -> 'LeaveCalculatorServer':
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self.serve_forever, name="http-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        """停止服务"""
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
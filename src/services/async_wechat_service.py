@@ -0,0 +1,376 @@
+"""
+企业微信API异步服务模块
+
+基于 asyncio + aiohttp 的企业微信客户端，与 WeChatWorkService 提供相同的方法。
+所有请求复用一个长连接池，并通过信号量限制同时在途的请求数，
+使大量假期余额查询可以在单个线程内重叠执行。
+"""
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from models import LeaveBalance, Employee
+from .metrics import API_ERRORS, API_LATENCY, API_RETRIES, CACHE_REQUESTS, TOKEN_REFRESHES, endpoint_label
+from .rate_limiter import RATE_LIMIT_ERRCODE
+from .wechat_service import WeChatServiceBase, WeChatAPIError, EmployeeNotFoundError
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp 为可选依赖，仅异步客户端需要
+    aiohttp = None
+
+
+# 与同步客户端 Retry(status_forcelist=...) 保持一致
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncWeChatWorkService(WeChatServiceBase):
+    """企业微信API异步服务"""
+
+    def __init__(self, config_service: 'ConfigService'):
+        """
+        初始化异步企业微信服务
+
+        Args:
+            config_service: 配置服务实例
+
+        Raises:
+            RuntimeError: 未安装aiohttp时抛出
+        """
+        if aiohttp is None:
+            raise RuntimeError("异步企业微信客户端需要安装aiohttp，请运行: pip install aiohttp")
+
+        # 异步客户端通过 _ensure_directory()/refresh_directory() 以 load() 刷新通讯录
+        super().__init__(config_service, self._reject_sync_directory_refresh)
+        async_config = config_service.get_async_config()
+        self.max_concurrency = async_config["max_concurrency"]
+        self.keepalive_timeout = async_config["keepalive_timeout"]
+        self._session: Optional['aiohttp.ClientSession'] = None
+        # 以下对象需绑定到运行中的事件循环，首次使用时创建
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._async_token_lock: Optional[asyncio.Lock] = None
+        self._directory_lock: Optional[asyncio.Lock] = None
+        # 在线程池中执行、尚未完成的token缓存删除，读取token缓存前需等待
+        self._pending_discards: List[asyncio.Future] = []
+
+    @staticmethod
+    def _reject_sync_directory_refresh() -> list:
+        """通讯录索引的同步加载回调：异步客户端不支持在同步调用中拉取通讯录"""
+        raise RuntimeError(
+            "异步企业微信客户端不支持同步刷新通讯录，"
+            "请使用 await find_employee_by_name() 或 await refresh_directory()"
+        )
+
+    async def __aenter__(self) -> 'AsyncWeChatWorkService':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _ensure_session(self) -> 'aiohttp.ClientSession':
+        """创建或复用长连接会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._async_token_lock = asyncio.Lock()
+            self._directory_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self) -> None:
+        """等待未完成的token缓存删除并关闭连接池"""
+        await self._wait_pending_discards()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request_json(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        发送请求并返回JSON响应，对限流和服务端错误按指数退避重试
+
+        开启限流时请求发出前先从该接口的令牌桶取得令牌；响应为频率限制（HTTP 429 或 errcode 45009）时
+        限流器降速，并在重试次数内重新排队发送，不再额外退避。
+
+        Raises:
+            WeChatAPIError: 网络请求失败或响应无法解析时抛出
+        """
+        session = self._ensure_session()
+        url = f"{self.config.base_url}{path}"
+        endpoint = endpoint_label(path)
+        bucket = self._rate_limiter.bucket(endpoint) if self._rate_limiter is not None else None
+        attempt = 0
+
+        while True:
+            # 在信号量之外等待令牌，不占用并发名额
+            if bucket is not None:
+                await bucket.acquire_async()
+            try:
+                async with self._semaphore:
+                    # 只统计请求本身的耗时，不含等待信号量的时间
+                    with API_LATENCY.time(endpoint=endpoint):
+                        async with session.request(method, url, params=params, json=json) as response:
+                            throttled = response.status == 429 and bucket is not None
+                            if throttled:
+                                bucket.on_throttled()
+                            if response.status in RETRY_STATUS_CODES and attempt < self.config.retry_count:
+                                # 限流器已降速的 429 与 45009 相同，按令牌桶重新排队，不再退避
+                                retry_status = RATE_LIMIT_ERRCODE if throttled else response.status
+                            else:
+                                response.raise_for_status()
+                                # 企业微信部分接口返回 text/plain，不校验 Content-Type
+                                data = await response.json(content_type=None)
+                                if bucket is None:
+                                    return data
+                                if not (isinstance(data, dict) and data.get("errcode") == RATE_LIMIT_ERRCODE):
+                                    bucket.on_success()
+                                    return data
+                                bucket.on_throttled()
+                                if attempt >= self.config.retry_count:
+                                    return data
+                                retry_status = RATE_LIMIT_ERRCODE
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.config.retry_count:
+                    API_ERRORS.inc(errcode=-1)
+                    self.logger.error(f"❌ 网络请求失败: {path} {str(e)}")
+                    raise WeChatAPIError(-1, f"网络请求失败: {str(e)}")
+                retry_status = type(e).__name__
+            except ValueError as e:
+                API_ERRORS.inc(errcode=-1)
+                raise WeChatAPIError(-1, f"API响应JSON解析失败: {str(e)}")
+
+            # 退避在信号量之外进行，不占用并发名额
+            delay = 2 ** attempt
+            attempt += 1
+            API_RETRIES.inc(endpoint=endpoint)
+            if retry_status == RATE_LIMIT_ERRCODE:
+                # 限流器已降速，重新排队等待令牌即可
+                self.logger.warning(f"⚠️ 请求 {path} 触发频率限制，降速后第{attempt}次重试")
+                continue
+            self.logger.warning(f"⚠️ 请求 {path} 失败 ({retry_status})，{delay}秒后第{attempt}次重试")
+            await asyncio.sleep(delay)
+
+    def _discard_stored_token(self, token: Optional[str]) -> None:
+        """从本地缓存中删除已失效的token；在事件循环中调用时放到线程池执行，不阻塞事件循环"""
+        if self._token_store is None or not token:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            super()._discard_stored_token(token)
+            return
+        self._pending_discards.append(
+            loop.run_in_executor(None, super()._discard_stored_token, token)
+        )
+
+    async def _wait_pending_discards(self) -> None:
+        """等待线程池中的token缓存删除完成，避免随后又读回刚作废的token"""
+        while self._pending_discards:
+            pending, self._pending_discards = self._pending_discards, []
+            await asyncio.gather(*pending)
+
+    async def _get_access_token(self) -> str:
+        """获取企业微信access_token，并发协程中只有一个会真正请求"""
+        token = self._current_token()
+        if token is not None:
+            CACHE_REQUESTS.inc(cache="token", result="hit")
+            return token
+
+        CACHE_REQUESTS.inc(cache="token", result="miss")
+        self._ensure_session()
+        async with self._async_token_lock:
+            token = self._current_token()
+            if token is not None:
+                return token
+
+            # 复用其他进程写入的token。缓存文件以原子替换方式写入，读取不加文件锁；
+            # 读写文件（保存时需获取阻塞的跨进程文件锁）都放到线程池执行，不阻塞事件循环
+            loop = asyncio.get_running_loop()
+            if self._token_store is not None:
+                await self._wait_pending_discards()
+                try:
+                    cached = await loop.run_in_executor(None, self._token_store.load, self._token_key)
+                except OSError:
+                    cached = None
+                if cached is not None:
+                    self._token_state = cached
+                    TOKEN_REFRESHES.inc(source="file")
+                    self.logger.info("✅ 使用本地缓存的access_token")
+                    return cached[0]
+
+            self.logger.info("🔑 获取新的access_token...")
+            data = await self._request_json("GET", "/cgi-bin/gettoken", params={
+                "corpid": self.config.corp_id,
+                "corpsecret": self.config.corp_secret
+            })
+            try:
+                token = self._store_access_token(self._handle_api_response(data))
+            except WeChatAPIError as e:
+                raise WeChatAPIError(-1, f"获取access_token失败: {str(e)}")
+
+            if self._token_store is not None:
+                try:
+                    await loop.run_in_executor(
+                        None, self._token_store.save, self._token_key, token, self._token_state[1]
+                    )
+                except OSError as e:
+                    self.logger.warning(f"⚠️ 写入token缓存失败: {str(e)}")
+
+            self.logger.info("✅ 成功获取access_token")
+            return token
+
+    async def _fetch_user_list(self) -> list:
+        """拉取企业全量用户列表"""
+        access_token = await self._get_access_token()
+        data = await self._request_json("GET", "/cgi-bin/user/list", params={
+            "access_token": access_token,
+            "department_id": 1,  # 根部门ID，获取所有用户
+            "fetch_child": 1     # 递归获取子部门用户
+        })
+        userlist = self._handle_api_response(data, access_token).get("userlist", [])
+        self.logger.info(f"📊 获取到 {len(userlist)} 个用户")
+        return userlist
+
+    async def refresh_directory(self) -> None:
+        """立即重新拉取通讯录并重建索引"""
+        self._ensure_session()
+        async with self._directory_lock:
+            self._directory.load(await self._fetch_user_list())
+
+    async def _ensure_directory(self, max_age: Optional[float] = None) -> None:
+        """索引不存在或超过有效期时刷新，并发协程中只刷新一次"""
+        if max_age is None:
+            max_age = self.cache_config["directory_ttl"]
+        age = self._directory.age()
+        if age is not None and age < max_age:
+            return
+
+        self._ensure_session()
+        async with self._directory_lock:
+            age = self._directory.age()
+            if age is None or age >= max_age:
+                self._directory.load(await self._fetch_user_list())
+
+    async def find_employee_by_name(self, name: str) -> Employee:
+        """
+        根据姓名查找员工信息
+
+        Args:
+            name: 员工姓名
+
+        Returns:
+            Employee: 员工信息对象
+
+        Raises:
+            EmployeeNotFoundError: 员工不存在时抛出
+            WeChatAPIError: API调用失败时抛出
+        """
+        await self._ensure_directory()
+        employees = self._directory.peek_by_name(name)
+
+        if not employees:
+            # 索引已有一段时间未刷新时强制刷新一次，以发现新员工
+            await self._ensure_directory(max_age=self._directory.miss_refresh_interval)
+            employees = self._directory.peek_by_name(name)
+
+        if not employees:
+            suggestions = self._directory.similar_names(name)
+            self.logger.error(f"❌ 未找到员工: {name}，相近姓名: {suggestions}")
+            raise EmployeeNotFoundError(60011, f"未找到员工: {name}", suggestions)
+
+        return employees[0]
+
+    async def get_leave_balance(self, employee: Employee, year: int = 2025) -> LeaveBalance:
+        """
+        获取员工假期余额
+
+        Args:
+            employee: 员工信息
+            year: 年份
+
+        Returns:
+            LeaveBalance: 假期余额信息
+
+        Raises:
+            WeChatAPIError: API调用失败时抛出
+        """
+        cache_key = (employee.user_id, year)
+        cached = self._quota_cache.get(cache_key)
+        if cached is not None:
+            CACHE_REQUESTS.inc(cache="quota", result="hit")
+            return cached
+        CACHE_REQUESTS.inc(cache="quota", result="miss")
+
+        access_token = await self._get_access_token()
+        data = await self._request_json(
+            "POST",
+            "/cgi-bin/oa/vacation/getuservacationquota",
+            params={"access_token": access_token},
+            json={
+                "userid": employee.user_id,
+                "vacation_type": 1  # 1表示年假
+            }
+        )
+        try:
+            leave_balance = self._parse_leave_balance(
+                employee, year, self._handle_api_response(data, access_token)
+            )
+        except WeChatAPIError:
+            raise
+        except Exception as e:
+            raise WeChatAPIError(-1, f"解析假期余额数据失败: {str(e)}")
+        self._quota_cache.put(cache_key, leave_balance)
+        return leave_balance
+
+    async def get_leave_balances(
+        self,
+        employees: Sequence[Employee],
+        year: int = 2025
+    ) -> List[Union[LeaveBalance, WeChatAPIError]]:
+        """
+        并发获取多名员工的假期余额
+
+        Args:
+            employees: 员工列表
+            year: 年份
+
+        Returns:
+            list: 与输入顺序一致的结果，失败项为对应的 WeChatAPIError
+        """
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.get_leave_balance(employee, year) for employee in employees),
+            return_exceptions=True
+        )
+        for i, result in enumerate(results):
+            if isinstance(result, Exception) and not isinstance(result, WeChatAPIError):
+                results[i] = WeChatAPIError(-1, f"获取假期余额失败: {str(result)}")
+        self.logger.info(
+            f"并发获取 {len(employees)} 名员工假期余额完成, 耗时 {time.perf_counter() - started:.2f}s"
+        )
+        return results
+
+    async def test_connection(self) -> bool:
+        """
+        测试企业微信连接
+
+        Returns:
+            bool: 连接是否成功
+        """
+        try:
+            await self._get_access_token()
+            return True
+        except Exception as e:
+            self.logger.error(f"企业微信连接测试失败: {str(e)}")
+            return False
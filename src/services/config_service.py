@@ -85,7 +85,115 @@ class ConfigService:
             "template_id": os.getenv("ANNUAL_LEAVE_TEMPLATE_ID", ""),
             "default_hours": int(os.getenv("DEFAULT_ANNUAL_LEAVE_HOURS", "120")),
             "working_hours_per_day": 8,
-            "target_vacation_names": target_names_list
+            "target_vacation_names": target_names_list,
+            # 时间比例计算方式：calendar 按自然日，workday 按工作日（考虑法定节假日与调休）
+            "proration_mode": os.getenv("PRORATION_MODE", "calendar").strip().lower(),
+            # 节假日数据文件，置空时使用内置数据
+            "holiday_file": os.getenv("HOLIDAY_CALENDAR_FILE", "").strip()
+        }
+
+    def get_cache_config(self) -> dict:
+        """
+        获取缓存配置
+
+        Returns:
+            dict: 缓存配置字典
+        """
+        enabled = os.getenv("CACHE_ENABLED", "true").strip().lower() == "true"
+        expire_seconds = int(os.getenv("CACHE_EXPIRE_SECONDS", "3600"))
+
+        return {
+            "enabled": enabled,
+            "expire_seconds": expire_seconds,
+            # 通讯录索引有效期，未单独配置时沿用通用缓存有效期；禁用缓存时每次查找都刷新
+            "directory_ttl": int(os.getenv("DIRECTORY_CACHE_TTL", str(expire_seconds))) if enabled else 0,
+            # access_token 跨进程缓存文件，置空或禁用缓存时不落盘
+            "token_file": os.getenv("TOKEN_CACHE_FILE", "logs/token_cache.json").strip() if enabled else "",
+            # 假期余额缓存容量及有效期，同一员工重复计算时不再请求企业微信
+            "quota_cache_size": int(os.getenv("QUOTA_CACHE_SIZE", "1024")) if enabled else 0,
+            "quota_cache_ttl": int(os.getenv("QUOTA_CACHE_TTL", "300"))
+        }
+
+    def get_batch_config(self) -> dict:
+        """
+        获取批量计算配置
+
+        Returns:
+            dict: 批量计算配置字典
+        """
+        return {
+            "max_workers": int(os.getenv("BATCH_MAX_WORKERS", "8"))
+        }
+
+    def get_async_config(self) -> dict:
+        """
+        获取异步客户端配置
+
+        Returns:
+            dict: 异步客户端配置字典
+        """
+        return {
+            "max_concurrency": int(os.getenv("ASYNC_MAX_CONCURRENCY", "50")),
+            "keepalive_timeout": float(os.getenv("ASYNC_KEEPALIVE_TIMEOUT", "30"))
+        }
+
+    def get_rate_limit_config(self) -> dict:
+        """
+        获取企业微信接口限流配置
+
+        Returns:
+            dict: 限流配置字典，速率单位为 次/秒（每个接口单独计算）
+        """
+        return {
+            "enabled": os.getenv("RATE_LIMIT_ENABLED", "true").strip().lower() == "true",
+            "initial_rate": float(os.getenv("RATE_LIMIT_INITIAL_RATE", "50")),
+            "min_rate": float(os.getenv("RATE_LIMIT_MIN_RATE", "1")),
+            "max_rate": float(os.getenv("RATE_LIMIT_MAX_RATE", "150")),
+            "burst": float(os.getenv("RATE_LIMIT_BURST", "20")),
+            # 持续成功时每秒增加的速率；收到45009时速率乘以的系数
+            "increase_step": float(os.getenv("RATE_LIMIT_INCREASE_STEP", "5")),
+            "decrease_factor": float(os.getenv("RATE_LIMIT_DECREASE_FACTOR", "0.5"))
+        }
+
+    def get_history_config(self) -> dict:
+        """
+        获取计算历史配置
+
+        Returns:
+            dict: 计算历史配置字典
+        """
+        return {
+            "enabled": os.getenv("HISTORY_ENABLED", "true").strip().lower() == "true",
+            "db_file": os.getenv("HISTORY_DB_FILE", "logs/history.db"),
+            "batch_size": int(os.getenv("HISTORY_BATCH_SIZE", "100")),
+            "flush_interval": float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+        }
+
+    def get_profile_config(self) -> dict:
+        """
+        获取性能剖析配置
+
+        Returns:
+            dict: 性能剖析配置字典
+        """
+        return {
+            "mode": os.getenv("PROFILE_MODE", "off").strip().lower() or "off",
+            "output_dir": os.getenv("PROFILE_DIR", "logs/profiles")
+        }
+
+    def get_server_config(self) -> dict:
+        """
+        获取HTTP服务配置
+
+        Returns:
+            dict: HTTP服务配置字典
+        """
+        return {
+            "host": os.getenv("SERVER_HOST", "127.0.0.1"),
+            "port": int(os.getenv("SERVER_PORT", "8765")),
+            "max_workers": int(os.getenv("SERVER_MAX_WORKERS", "32")),
+            "keepalive_timeout": float(os.getenv("SERVER_KEEPALIVE_TIMEOUT", "30")),
+            "backlog": int(os.getenv("SERVER_BACKLOG", "128"))
         }
 
     def validate_config(self) -> bool:
@@ -0,0 +1,223 @@
+"""
+员工通讯录索引模块
+
+将企业微信 /cgi-bin/user/list 的全量通讯录构建为紧凑的列式员工表（EmployeeTable），
+按TTL定期刷新，按姓名/userid查找员工为一次内存中的哈希查找（O(1)）。
+姓名联想索引和模糊匹配索引与员工表一起构建，作为同一个快照整体发布。
+"""
+import time
+import logging
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+from models import Employee
+from .employee_table import EmployeeTable
+from .metrics import CACHE_REQUESTS
+from .name_matcher import FuzzyNameIndex
+from .name_suggester import NameSuggester
+
+
+class _Snapshot(NamedTuple):
+    """通讯录索引快照，发布后只读"""
+    table: EmployeeTable
+    built_at: float
+    suggester: NameSuggester
+    fuzzy_index: FuzzyNameIndex
+
+
+class EmployeeDirectory:
+    """员工通讯录内存索引"""
+
+    def __init__(
+        self,
+        loader: Callable[[], List[dict]],
+        ttl: float = 3600,
+        miss_refresh_interval: float = 60
+    ):
+        """
+        初始化通讯录索引
+
+        Args:
+            loader: 拉取全量用户列表的回调，返回企业微信 userlist
+            ttl: 索引有效期（秒），为0时每次查找都会刷新
+            miss_refresh_interval: 查找未命中时允许强制刷新的最小间隔（秒），
+                用于发现TTL内新入职的员工
+        """
+        self.logger = logging.getLogger(__name__)
+        self._loader = loader
+        self._ttl = ttl
+        self._miss_refresh_interval = miss_refresh_interval
+        self._lock = threading.Lock()
+        # 员工表及其姓名索引的快照，整体替换保证读取无需加锁
+        self._index: Optional[_Snapshot] = None
+
+    @staticmethod
+    def build_index(userlist: List[dict]) -> EmployeeTable:
+        """
+        构建员工表
+
+        Args:
+            userlist: 企业微信用户列表
+
+        Returns:
+            EmployeeTable: 支持按姓名和userid查找的列式员工表
+        """
+        return EmployeeTable(userlist)
+
+    def _build_snapshot(self, userlist: List[dict]) -> _Snapshot:
+        """
+        构建员工表及姓名联想、模糊匹配索引
+
+        在刷新线程中一次构建完成，界面线程联想和查找未命中时都不需要再构建索引。
+        """
+        started = time.perf_counter()
+        table = self.build_index(userlist)
+        names = list(table.names())
+        snapshot = _Snapshot(table, time.time(), NameSuggester(names), FuzzyNameIndex(names))
+        self.logger.info(
+            f"📇 通讯录索引已刷新: {len(table)} 名员工, 员工表占用 {table.nbytes() / 1024:.0f}KB, "
+            f"耗时 {(time.perf_counter() - started) * 1000:.1f}ms（含姓名联想及模糊匹配索引）"
+        )
+        return snapshot
+
+    def is_fresh(self) -> bool:
+        """检查索引是否在有效期内"""
+        index = self._index
+        if index is None:
+            return False
+        return time.time() - index.built_at < self._ttl
+
+    def refresh(self) -> None:
+        """重新拉取通讯录并重建索引"""
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        """在持有锁的情况下刷新索引"""
+        self._index = self._build_snapshot(self._loader())
+
+    def ensure_fresh(self) -> None:
+        """索引过期时刷新，多个线程并发时只刷新一次"""
+        self._get_index()
+
+    def _get_index(self) -> _Snapshot:
+        """获取有效的索引快照"""
+        index = self._index
+        if index is not None and time.time() - index.built_at < self._ttl:
+            CACHE_REQUESTS.inc(cache="directory", result="hit")
+            return index
+        CACHE_REQUESTS.inc(cache="directory", result="miss")
+        with self._lock:
+            # 等待锁期间可能已被其他线程刷新
+            if not self.is_fresh():
+                self._refresh_locked()
+            return self._index
+
+    def load(self, userlist: List[dict]) -> None:
+        """
+        用已拉取的用户列表直接重建索引
+
+        供自行完成网络请求的调用方（如异步客户端）使用
+        """
+        self._index = self._build_snapshot(userlist)
+
+    @property
+    def miss_refresh_interval(self) -> float:
+        """查找未命中时允许强制刷新的最小间隔（秒）"""
+        return self._miss_refresh_interval
+
+    def age(self) -> Optional[float]:
+        """索引已构建的时长（秒），尚未构建时为None"""
+        index = self._index
+        return time.time() - index.built_at if index else None
+
+    def peek_by_name(self, name: str) -> List[Employee]:
+        """按姓名查找员工，只查询当前索引，不触发刷新"""
+        index = self._index
+        if index is None:
+            return []
+        return index.table.find_by_name(name)
+
+    def suggester(self) -> Optional[NameSuggester]:
+        """
+        获取当前快照中的姓名联想索引，不触发刷新
+
+        Returns:
+            Optional[NameSuggester]: 联想索引，通讯录尚未加载时为None
+        """
+        index = self._index
+        return index.suggester if index else None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        按姓名或拼音首字母前缀给出候选姓名，不触发刷新
+
+        Args:
+            prefix: 输入前缀
+            limit: 最多返回的候选数
+
+        Returns:
+            List[str]: 候选姓名，通讯录尚未加载时为空列表
+        """
+        suggester = self.suggester()
+        return suggester.suggest(prefix, limit) if suggester else []
+
+    def similar_names(self, name: str, limit: int = 5) -> List[str]:
+        """
+        查找与 name 相近的姓名（"您是否要找"），只使用已加载的索引，不触发刷新
+
+        Args:
+            name: 未精确命中的姓名
+            limit: 最多返回的候选数
+
+        Returns:
+            List[str]: 按相似度降序排列的候选姓名，通讯录尚未加载时为空列表
+        """
+        index = self._index
+        if index is None:
+            return []
+        return [candidate for candidate, _ in index.fuzzy_index.search(name, limit)]
+
+    def invalidate(self) -> None:
+        """使索引失效，下次查找时重新拉取"""
+        self._index = None
+
+    def find_by_name(self, name: str) -> List[Employee]:
+        """
+        按姓名查找员工
+
+        Args:
+            name: 员工姓名（精确匹配）
+
+        Returns:
+            List[Employee]: 同名员工列表，未找到时为空列表
+        """
+        index = self._get_index()
+        employees = index.table.find_by_name(name)
+        if employees:
+            return employees
+
+        # 未命中时，若索引已有一段时间未刷新，则强制刷新一次以发现新员工
+        with self._lock:
+            index = self._index
+            if index is None or time.time() - index.built_at >= self._miss_refresh_interval:
+                self.logger.info(f"🔄 通讯录中未找到 {name}，强制刷新索引")
+                self._refresh_locked()
+                index = self._index
+        return index.table.find_by_name(name)
+
+    def get_by_userid(self, user_id: str) -> Optional[Employee]:
+        """
+        按userid查找员工
+
+        Args:
+            user_id: 企业微信userid
+
+        Returns:
+            Optional[Employee]: 员工对象，未找到时为None
+        """
+        return self._get_index().table.get_by_userid(user_id)
+
+    def __len__(self) -> int:
+        index = self._index
+        return len(index.table) if index else 0
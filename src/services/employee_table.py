@@ -0,0 +1,257 @@
+"""
+列式员工表模块
+
+将企业微信通讯录保存为紧凑的列式结构，而不是每名员工一个对象：
+
+- userid、姓名、邮箱按 UTF-8 连续存入一个 bytes 缓冲区，另用 array('I') 记录各行偏移
+- 部门、职位等大量重复的取值放入编码表，每行只保存一个整数编码
+- 按姓名/userid 查找使用列上的开放寻址哈希索引，为 O(1) 的哈希命中；
+  索引的槽位数组只保存行号，键直接取自列数据，不为每个键另存字符串对象和字典项
+
+10万人的通讯录约占7MB内存，而“原始用户字典 + 每名员工一个对象 + 两个字典索引”约为80MB；
+Employee 对象只在查找命中时按需构建。
+"""
+import sys
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from models import Employee
+
+
+class _PackedStrings:
+    """只读的紧凑字符串列：UTF-8 数据连续存放，按行偏移读取"""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, encoded: List[bytes]):
+        """
+        Args:
+            encoded: 各行的 UTF-8 字节
+        """
+        self._data = b"".join(encoded)
+        self._offsets = array("I", [0])
+        self._offsets.extend(accumulate(map(len, encoded)))
+
+    def raw(self, row: int) -> bytes:
+        """第 row 行的 UTF-8 字节"""
+        offsets = self._offsets
+        return self._data[offsets[row]:offsets[row + 1]]
+
+    def get(self, row: int) -> str:
+        """第 row 行的字符串"""
+        return self.raw(row).decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+
+class _HashIndex:
+    """
+    字符串列上的开放寻址哈希索引（线性探测，负载因子不超过0.5）
+
+    槽位数组保存行号（-1 为空槽），比较时从列中读取键，因此每个键只占一个槽位的4字节。
+    """
+
+    __slots__ = ("_column", "_slots", "_mask")
+
+    def __init__(self, column: _PackedStrings, keys: List[bytes], chain: Optional[array] = None):
+        """
+        构建索引
+
+        按行号倒序插入，重复的键指向其中最靠前的一行。
+
+        Args:
+            column: 被索引的列（由 keys 构建）
+            keys: 各行的键，空键不建索引
+            chain: 同值串联数组，非None时 chain[row] 被设为下一个同键行的行号（没有时为 -1），
+                使同键的各行按行号顺序串联
+        """
+        capacity = 8
+        while capacity < len(keys) * 2:
+            capacity <<= 1
+        mask = capacity - 1
+        slots = array("i", [-1]) * capacity
+        for row in range(len(keys) - 1, -1, -1):
+            key = keys[row]
+            if not key and chain is None:
+                continue
+            slot = hash(key) & mask
+            while True:
+                existing = slots[slot]
+                if existing < 0 or keys[existing] == key:
+                    break
+                slot = (slot + 1) & mask
+            if chain is not None:
+                chain[row] = existing
+            slots[slot] = row
+        self._column = column
+        self._slots = slots
+        self._mask = mask
+
+    def get(self, key: bytes) -> int:
+        """key 对应的行号，不存在时为 -1"""
+        slots = self._slots
+        mask = self._mask
+        raw = self._column.raw
+        slot = hash(key) & mask
+        while True:
+            row = slots[slot]
+            if row < 0 or raw(row) == key:
+                return row
+            slot = (slot + 1) & mask
+
+    def rows(self) -> Iterator[int]:
+        """每个不同的键对应的行号（顺序不定）"""
+        return (row for row in self._slots if row >= 0)
+
+    def nbytes(self) -> int:
+        return self._slots.itemsize * len(self._slots)
+
+
+class _CodeTable:
+    """取值编码表：相同取值只保存一份（字符串经 sys.intern 驻留），每行保存整数编码"""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+        return code
+
+    def freeze(self) -> None:
+        """构建完成后释放编码用的字典"""
+        self._codes = {}
+
+
+class EmployeeTable:
+    """列式员工表（构建后只读，可在线程间共享）"""
+
+    def __init__(self, userlist: Iterable[dict]):
+        """
+        从企业微信 userlist 构建员工表
+
+        userlist 中的字典在构建完成后不再被引用。
+
+        Args:
+            userlist: 企业微信用户列表
+        """
+        user_ids: List[bytes] = []
+        names: List[bytes] = []
+        emails: List[bytes] = []
+        departments = _CodeTable()
+        positions = _CodeTable()
+        department_codes: List[int] = []
+        position_codes: List[int] = []
+
+        for user in userlist:
+            user_ids.append((user.get("userid") or "").encode("utf-8"))
+            names.append((user.get("name") or "").encode("utf-8"))
+            emails.append((user.get("email") or "").encode("utf-8"))
+            department = user.get("department")
+            department_codes.append(departments.encode(department[0] if department else None))
+            position_codes.append(positions.encode(user.get("position")))
+
+        departments.freeze()
+        positions.freeze()
+        self._departments = departments
+        self._positions = positions
+        self._department_codes = array("I", department_codes)
+        self._position_codes = array("I", position_codes)
+        self._size = len(user_ids)
+
+        self._user_ids = _PackedStrings(user_ids)
+        self._names = _PackedStrings(names)
+        self._emails = _PackedStrings(emails)
+
+        # 姓名索引指向第一名同名员工，同名员工按通讯录顺序串联；userid 重复时保留通讯录中靠前的一行
+        self._next_same_name = array("i", [-1]) * self._size
+        self._name_index = _HashIndex(self._names, names, chain=self._next_same_name)
+        self._id_index = _HashIndex(self._user_ids, user_ids)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def employee(self, row: int) -> Employee:
+        """
+        构建第 row 行的员工对象
+
+        Args:
+            row: 行号（通讯录顺序）
+
+        Returns:
+            Employee: 员工信息，邮箱为空时为None
+        """
+        return Employee(
+            user_id=self._user_ids.get(row),
+            name=self._names.get(row),
+            department=self._departments.values[self._department_codes[row]],
+            position=self._positions.values[self._position_codes[row]],
+            email=self._emails.get(row) or None
+        )
+
+    def rows_by_name(self, name: str) -> List[int]:
+        """
+        按姓名查找行号
+
+        Args:
+            name: 员工姓名（精确匹配）
+
+        Returns:
+            List[int]: 同名员工的行号，按通讯录顺序排列
+        """
+        rows = []
+        row = self._name_index.get(name.encode("utf-8"))
+        while row >= 0:
+            rows.append(row)
+            row = self._next_same_name[row]
+        return rows
+
+    def find_by_name(self, name: str) -> List[Employee]:
+        """
+        按姓名查找员工
+
+        Args:
+            name: 员工姓名（精确匹配）
+
+        Returns:
+            List[Employee]: 同名员工列表，未找到时为空列表
+        """
+        return [self.employee(row) for row in self.rows_by_name(name)]
+
+    def get_by_userid(self, user_id: str) -> Optional[Employee]:
+        """
+        按userid查找员工
+
+        Args:
+            user_id: 企业微信userid
+
+        Returns:
+            Optional[Employee]: 员工对象，未找到时为None
+        """
+        if not user_id:
+            return None
+        row = self._id_index.get(user_id.encode("utf-8"))
+        return self.employee(row) if row >= 0 else None
+
+    def names(self) -> Iterator[str]:
+        """按字典序逐个产出去重后的员工姓名（不含空姓名）"""
+        raw_names = sorted(self._names.raw(row) for row in self._name_index.rows())
+        # UTF-8 字节序与字符串的码位序一致
+        return (raw.decode("utf-8") for raw in raw_names if raw)
+
+    def nbytes(self) -> int:
+        """列数据及索引占用的字节数（不含编码表中的取值）"""
+        arrays = (self._department_codes, self._position_codes, self._next_same_name)
+        return (
+            self._user_ids.nbytes() + self._names.nbytes() + self._emails.nbytes()
+            + self._name_index.nbytes() + self._id_index.nbytes()
+            + sum(column.itemsize * len(column) for column in arrays)
+        )
@@ -0,0 +1,339 @@
+"""
+计算历史存储模块
+
+将每次年假计算结果写入本地SQLite数据库（WAL模式）。写入由后台线程批量提交，
+调用方（包括GUI线程）只需将记录放入队列；查询按 (created_at, id) 做游标（keyset）分页，
+翻页成本与已翻过的页数无关。
+"""
+import time
+import queue
+import atexit
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models import CalculationResult, HistoryPage, HistoryRecord
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calculation_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    employee_name TEXT NOT NULL,
+    resignation_date TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    remaining_days REAL NOT NULL,
+    error_message TEXT NOT NULL DEFAULT '',
+    elapsed_ms REAL NOT NULL DEFAULT 0,
+    theoretical_hours REAL,
+    used_hours REAL,
+    time_ratio REAL
+);
+CREATE INDEX IF NOT EXISTS idx_history_employee_created
+    ON calculation_history (employee_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_history_resignation_date
+    ON calculation_history (resignation_date);
+CREATE INDEX IF NOT EXISTS idx_history_created
+    ON calculation_history (created_at);
+"""
+
+INSERT_SQL = """
+INSERT INTO calculation_history (
+    created_at, employee_name, resignation_date, success, remaining_days,
+    error_message, elapsed_ms, theoretical_hours, used_hours, time_ratio
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_COLUMNS = (
+    "id, created_at, employee_name, resignation_date, success, remaining_days, "
+    "error_message, elapsed_ms, theoretical_hours, used_hours, time_ratio"
+)
+
+# 写入线程退出标志
+_STOP = object()
+
+
+class HistoryStore:
+    """SQLite计算历史存储"""
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 1.0):
+        """
+        初始化历史存储并启动后台写入线程
+
+        Args:
+            path: 数据库文件路径
+            batch_size: 单个事务最多写入的记录数
+            flush_interval: 队列中有记录时，最长等待多久凑批提交（秒）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        # 各线程打开的连接，线程结束后由下一次建连回收，close() 时全部关闭
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        self._drop_logged = False
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        获取当前线程的数据库连接（sqlite3连接不能跨线程并发使用）
+
+        Raises:
+            sqlite3.ProgrammingError: 存储已关闭时抛出
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("计算历史存储已关闭")
+            # 连接只在本线程使用；关闭check_same_thread是为了让close()和回收逻辑能在其他线程关闭它
+            connection = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            # WAL模式下读写互不阻塞；NORMAL同步级别在WAL下仍保证数据库一致性
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._track_connection(connection)
+        return connection
+
+    def _track_connection(self, connection: sqlite3.Connection) -> None:
+        """登记当前线程的连接，并关闭已结束线程遗留的连接"""
+        with self._connections_lock:
+            for thread in [t for t in self._connections if not t.is_alive()]:
+                self._connections.pop(thread).close()
+            self._connections[threading.current_thread()] = connection
+
+    def record(
+        self,
+        employee_name: str,
+        resignation_date: str,
+        result: CalculationResult,
+        elapsed_ms: float = 0.0
+    ) -> None:
+        """
+        记录一次计算结果（非阻塞，由后台线程批量写入）
+
+        存储已关闭或写入线程已退出时不再接受记录，直接丢弃。
+
+        Args:
+            employee_name: 员工姓名
+            resignation_date: 离职日期字符串
+            result: 计算结果
+            elapsed_ms: 计算耗时（毫秒）
+        """
+        if self._closed or not self._writer.is_alive():
+            if not self._drop_logged:
+                self._drop_logged = True
+                self.logger.warning("⚠️ 计算历史写入线程已停止，后续记录将被丢弃")
+            return
+        figures = result.figures
+        if figures is None:
+            # 以旧方式构造的结果只有详细信息字典
+            details = result.calculation_details
+            theoretical_hours = details.get("theoretical_hours")
+            used_hours = details.get("used_hours")
+            time_ratio = details.get("time_ratio")
+        else:
+            theoretical_hours = figures.theoretical_hours
+            used_hours = figures.used_hours
+            time_ratio = round(figures.time_ratio, 4)
+        self._queue.put((
+            time.time(),
+            employee_name,
+            resignation_date,
+            1 if result.success else 0,
+            result.remaining_days,
+            result.error_message or "",
+            elapsed_ms,
+            theoretical_hours,
+            used_hours,
+            time_ratio
+        ))
+
+    def _write_loop(self) -> None:
+        """后台写入线程：凑满一批或等待超时后在一个事务中提交"""
+        connection = self._connect()
+        try:
+            self._drain(connection)
+        finally:
+            with self._connections_lock:
+                self._connections.pop(threading.current_thread(), None)
+            connection.close()
+
+    def _drain(self, connection: sqlite3.Connection) -> None:
+        """从队列取记录批量写入，直到收到退出标志"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(0.0, remaining)) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+
+            try:
+                with connection:
+                    connection.executemany(INSERT_SQL, batch)
+            except Exception as e:
+                # 任何异常都只丢弃本批，写入线程必须存活，否则后续记录和 flush() 都会卡住
+                self.logger.error(f"❌ 写入计算历史失败（{len(batch)}条）: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        等待已提交的记录全部写入数据库
+
+        Args:
+            timeout: 最长等待时间（秒），为None时一直等待
+
+        Returns:
+            bool: 记录是否已全部写入；超时或写入线程已退出时为False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if not self._writer.is_alive():
+                    return False
+                # 分段等待，以便及时发现写入线程意外退出
+                wait = 0.5
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._queue.all_tasks_done.wait(wait)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        写完剩余记录，停止后台线程并关闭所有线程的数据库连接
+
+        Args:
+            timeout: 等待写入线程退出的最长时间（秒），为None时一直等待
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+            if self._writer.is_alive():
+                self.logger.warning("⚠️ 计算历史写入线程未能在超时内退出，剩余记录可能丢失")
+        with self._connections_lock:
+            # 未退出的写入线程仍在使用自己的连接，由它退出时自行关闭
+            connections = [c for t, c in self._connections.items() if t is not self._writer]
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+
+    def query(
+        self,
+        employee_name: Optional[str] = None,
+        resignation_date_from: Optional[str] = None,
+        resignation_date_to: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> HistoryPage:
+        """
+        按时间倒序分页查询计算历史
+
+        Args:
+            employee_name: 只查询该员工
+            resignation_date_from: 离职日期下限（含，YYYY-MM-DD）
+            resignation_date_to: 离职日期上限（含，YYYY-MM-DD）
+            limit: 每页记录数
+            cursor: 上一页返回的 next_cursor，为None时从最新记录开始
+
+        Returns:
+            HistoryPage: 本页记录及下一页游标
+
+        Raises:
+            ValueError: 游标格式无效时抛出
+        """
+        conditions: List[str] = []
+        params: list = []
+        if employee_name is not None:
+            conditions.append("employee_name = ?")
+            params.append(employee_name)
+        if resignation_date_from is not None:
+            conditions.append("resignation_date >= ?")
+            params.append(resignation_date_from)
+        if resignation_date_to is not None:
+            conditions.append("resignation_date <= ?")
+            params.append(resignation_date_to)
+        if cursor is not None:
+            created_at, row_id = self._decode_cursor(cursor)
+            conditions.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend((created_at, created_at, row_id))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (
+            f"SELECT {SELECT_COLUMNS} FROM calculation_history {where} "
+            f"ORDER BY created_at DESC, id DESC LIMIT ?"
+        )
+        # 多取一条用于判断是否还有下一页
+        rows = self._connect().execute(sql, (*params, limit + 1)).fetchall()
+
+        records = [self._to_record(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and records:
+            next_cursor = self._encode_cursor(records[-1].created_at, records[-1].id)
+        return HistoryPage(records=records, next_cursor=next_cursor)
+
+    def count(self) -> int:
+        """已写入的记录总数"""
+        return self._connect().execute("SELECT COUNT(*) FROM calculation_history").fetchone()[0]
+
+    @staticmethod
+    def _encode_cursor(created_at: float, row_id: int) -> str:
+        return f"{created_at!r}:{row_id}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, int]:
+        try:
+            created_at, row_id = cursor.rsplit(":", 1)
+            return float(created_at), int(row_id)
+        except ValueError:
+            raise ValueError(f"无效的分页游标: {cursor}")
+
+    @staticmethod
+    def _to_record(row: tuple) -> HistoryRecord:
+        return HistoryRecord(
+            id=row[0],
+            created_at=row[1],
+            employee_name=row[2],
+            resignation_date=row[3],
+            success=bool(row[4]),
+            remaining_days=row[5],
+            error_message=row[6],
+            elapsed_ms=row[7],
+            theoretical_hours=row[8],
+            used_hours=row[9],
+            time_ratio=row[10]
+        )
@@ -0,0 +1,331 @@
+"""
+运行指标模块
+
+进程内的计数器与直方图注册表，记录企业微信接口延迟、token刷新、重试、错误码、缓存命中
+以及每次计算各阶段的耗时。指标可导出为 Prometheus 文本格式或JSON快照。
+
+每个指标的记录为一次加锁的字典更新，直方图按桶边界二分定位，开销在微秒级以下，
+因此默认常开，无需配置。
+"""
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# 延迟直方图的桶上界（秒），覆盖从进程内计算阶段到慢速网络请求的范围
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_float(value: float) -> str:
+    """按 Prometheus 文本格式输出数值"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """带标签的指标基类"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """将标签参数转换为按 labelnames 排列的取值元组"""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        try:
+            return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError as e:
+            raise ValueError(f"指标 {self.name} 缺少标签 {e}")
+
+    def _label_text(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        增加计数
+
+        Args:
+            amount: 增量，必须非负
+            **labels: 标签取值
+        """
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """读取指定标签组合的当前计数"""
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self) -> List[dict]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [{"labels": dict(zip(self.labelnames, key)), "value": value} for key, value in items]
+
+    def prometheus_lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        lines.extend(f"{self.name}{self._label_text(key)} {_format_float(value)}" for key, value in items)
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """累积桶直方图（单位：秒）"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签取值 -> [各桶计数（非累积，最后一个为+Inf）, 总和, 样本数]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        记录一个样本
+
+        Args:
+            value: 样本值（秒）
+            **labels: 标签取值
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """记录代码块的耗时（异常退出时同样记录）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, ...], List[int], float, int]]:
+        with self._lock:
+            return sorted((key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items())
+
+    @staticmethod
+    def _quantile(bounds: Sequence[float], counts: List[int], total: int, q: float) -> Optional[float]:
+        """按桶内线性插值估算分位数（与 Prometheus histogram_quantile 一致）"""
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i >= len(bounds):
+                    # 落在+Inf桶中，只能返回最大的有限上界
+                    return bounds[-1]
+                lower = bounds[i - 1] if i > 0 else 0.0
+                return lower + (bounds[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return bounds[-1]
+
+    def samples(self) -> List[dict]:
+        result = []
+        for key, counts, total_sum, count in self._snapshot():
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                buckets[_format_float(bound)] = cumulative
+            result.append({
+                "labels": dict(zip(self.labelnames, key)),
+                "count": count,
+                "sum": total_sum,
+                "p50": self._quantile(self.buckets, counts, count, 0.5),
+                "p95": self._quantile(self.buckets, counts, count, 0.95),
+                "p99": self._quantile(self.buckets, counts, count, 0.99),
+                "buckets": buckets
+            })
+        return result
+
+    def prometheus_lines(self) -> List[str]:
+        lines = self._header()
+        for key, counts, total_sum, count in self._snapshot():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = self._label_text(key, ("le", _format_float(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_float(total_sum)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"指标 {metric.name} 已以不同的类型或标签注册")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册（或获取已注册的）计数器"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """注册（或获取已注册的）直方图"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _sorted_metrics(self) -> List[_Metric]:
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def to_prometheus(self) -> str:
+        """
+        导出为 Prometheus 文本格式（text/plain; version=0.0.4）
+
+        Returns:
+            str: 指标文本
+        """
+        lines: List[str] = []
+        for metric in self._sorted_metrics():
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        导出为可JSON序列化的快照
+
+        Returns:
+            dict: 指标名 -> {"type", "help", "samples"}；直方图样本附带 p50/p95/p99 估算值（秒）
+        """
+        return {
+            metric.name: {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "samples": metric.samples()
+            }
+            for metric in self._sorted_metrics()
+        }
+
+    def reset(self) -> None:
+        """清空所有指标的取值（保留注册）"""
+        for metric in self._sorted_metrics():
+            metric.reset()
+
+
+# 进程级默认注册表
+REGISTRY = MetricsRegistry()
+
+API_LATENCY = REGISTRY.histogram(
+    "wechat_api_request_seconds", "企业微信接口请求耗时（秒）", ("endpoint",)
+)
+API_RETRIES = REGISTRY.counter(
+    "wechat_api_retries_total", "企业微信接口重试次数", ("endpoint",)
+)
+API_ERRORS = REGISTRY.counter(
+    "wechat_api_errors_total", "企业微信接口错误次数（按错误码，-1为网络或解析错误）", ("errcode",)
+)
+TOKEN_REFRESHES = REGISTRY.counter(
+    "wechat_token_refreshes_total", "access_token 获取次数（source=api 调用gettoken，file 复用本地缓存）", ("source",)
+)
+API_THROTTLED = REGISTRY.counter(
+    "wechat_api_throttled_total", "企业微信接口频率限制次数（errcode 45009 或 HTTP 429）", ("endpoint",)
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "wechat_rate_limit_wait_seconds", "客户端限流器等待令牌的时间（秒）", ("endpoint",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "缓存查询次数", ("cache", "result")
+)
+CALCULATION_STAGE_LATENCY = REGISTRY.histogram(
+    "calculation_stage_seconds", "年假计算各阶段耗时（秒）", ("stage",)
+)
+CALCULATIONS = REGISTRY.counter(
+    "calculations_total", "年假计算次数", ("outcome",)
+)
+
+
+def endpoint_label(path: str) -> str:
+    """
+    将接口路径转换为指标标签
+
+    Args:
+        path: 接口路径或完整URL，如 /cgi-bin/oa/vacation/getuservacationquota
+
+    Returns:
+        str: gettoken、user/list、getuservacationquota、getapprovaldata 等
+    """
+    path = path.split("?", 1)[0]
+    marker = "/cgi-bin/"
+    if marker in path:
+        path = path.split(marker, 1)[1]
+    path = path.strip("/")
+    if path.startswith("oa/"):
+        return path.rsplit("/", 1)[-1]
+    return path or "unknown"
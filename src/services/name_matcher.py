@@ -0,0 +1,137 @@
+"""
+员工姓名模糊匹配模块
+
+对通讯录姓名做归一化（全角/半角、空白、繁简）后建立二元组（bigram）倒排索引，
+姓名精确查找未命中时，只需合并查询串各二元组的倒排列表即可得到按相似度排序的候选，
+无需对全部姓名逐一计算编辑距离。
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import opencc
+    _t2s = opencc.OpenCC("t2s").convert
+except Exception:  # opencc 为可选依赖，缺失时使用内置的姓名常用字繁简对照表
+    _t2s = None
+
+
+# 姓名常用字的繁体 -> 简体对照
+_TRADITIONAL = (
+    "張陳劉黃趙吳楊孫馬許鄭謝韓馮鄧蕭葉蘇呂蔣賈閻鍾盧龍羅鄒湯萬錢嚴陸顧"
+    "國華偉麗強軍艷傑濤紅蘭鳳飛鵬輝東維誌榮廣愛賢靜寧慶義雲瑩穎嬌婭潔銘興"
+    "勝寶長亞曉進達書學順時鐵鋒嶽鄔藍談齊蘆歐陽範閔衛韋詩凱倫"
+)
+_SIMPLIFIED = (
+    "张陈刘黄赵吴杨孙马许郑谢韩冯邓萧叶苏吕蒋贾阎钟卢龙罗邹汤万钱严陆顾"
+    "国华伟丽强军艳杰涛红兰凤飞鹏辉东维志荣广爱贤静宁庆义云莹颖娇娅洁铭兴"
+    "胜宝长亚晓进达书学顺时铁锋岳邬蓝谈齐芦欧阳范闵卫韦诗凯伦"
+)
+_T2S_TABLE = str.maketrans(_TRADITIONAL, _SIMPLIFIED)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# 二元组首尾填充符，使两个字的姓名也能产生多个二元组
+_PAD_START = "\x02"
+_PAD_END = "\x03"
+
+
+def normalize_name(name: str) -> str:
+    """
+    归一化姓名，用于比较
+
+    全角字符转半角（NFKC）、去除所有空白、繁体转简体、字母转小写。
+
+    Args:
+        name: 原始姓名
+
+    Returns:
+        str: 归一化后的姓名
+    """
+    name = unicodedata.normalize("NFKC", name)
+    name = _WHITESPACE.sub("", name)
+    name = _t2s(name) if _t2s is not None else name.translate(_T2S_TABLE)
+    return name.lower()
+
+
+def name_bigrams(normalized: str) -> List[str]:
+    """
+    生成带首尾填充的二元组
+
+    Args:
+        normalized: 归一化后的姓名
+
+    Returns:
+        List[str]: 去重后的二元组，如 张伟 -> [^张, 张伟, 伟$]
+    """
+    padded = f"{_PAD_START}{normalized}{_PAD_END}"
+    return list(dict.fromkeys(padded[i:i + 2] for i in range(len(padded) - 1)))
+
+
+class FuzzyNameIndex:
+    """姓名二元组倒排索引"""
+
+    def __init__(self, names: Iterable[str]):
+        """
+        构建倒排索引
+
+        Args:
+            names: 去重后的员工姓名
+        """
+        self._names: List[str] = []
+        self._gram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._by_normalized: Dict[str, List[int]] = {}
+        for name in names:
+            if not name:
+                continue
+            normalized = normalize_name(name)
+            if not normalized:
+                continue
+            name_id = len(self._names)
+            grams = name_bigrams(normalized)
+            self._names.append(name)
+            self._gram_counts.append(len(grams))
+            self._by_normalized.setdefault(normalized, []).append(name_id)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(name_id)
+
+    def search(self, name: str, limit: int = 5, min_score: float = 0.3) -> List[Tuple[str, float]]:
+        """
+        查找相似姓名
+
+        相似度为二元组集合的 Dice 系数；归一化后完全相同的姓名（如仅全角、空白或繁简不同）得分为1。
+
+        Args:
+            name: 查询姓名
+            limit: 最多返回的候选数
+            min_score: 最低相似度
+
+        Returns:
+            List[Tuple[str, float]]: (姓名, 相似度)，按相似度降序排列
+        """
+        normalized = normalize_name(name)
+        if not normalized or limit <= 0:
+            return []
+
+        scores: Dict[int, float] = {name_id: 1.0 for name_id in self._by_normalized.get(normalized, ())}
+
+        grams = name_bigrams(normalized)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for name_id in self._postings.get(gram, ()):
+                shared[name_id] = shared.get(name_id, 0) + 1
+
+        query_count = len(grams)
+        for name_id, count in shared.items():
+            if name_id in scores:
+                continue
+            score = 2 * count / (query_count + self._gram_counts[name_id])
+            if score >= min_score:
+                scores[name_id] = score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._names[item[0]]))
+        return [(self._names[name_id], round(score, 3)) for name_id, score in ranked[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -0,0 +1,121 @@
+"""
+员工姓名联想模块
+
+将通讯录姓名及其拼音首字母构建为有序数组，输入前缀后通过二分查找定位候选，
+单次查询为 O(log n + 候选数)，5万人规模下远低于1毫秒。
+"""
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pypinyin 为可选依赖，缺失时使用GB2312编码区间推算首字母
+    lazy_pinyin = None
+
+
+# GB2312 一级汉字按拼音排序，各声母首字的区位码（与下一项之间的汉字均属该声母）
+_GB2312_INITIAL_STARTS = (
+    0xB0A1, 0xB0C5, 0xB2C1, 0xB4EE, 0xB6EA, 0xB7A2, 0xB8C1, 0xB9FE, 0xBBF7,
+    0xBFA6, 0xC0AC, 0xC2E8, 0xC4C3, 0xC5B6, 0xC5BE, 0xC6DA, 0xC8BB, 0xC8F6,
+    0xCBFA, 0xCDDA, 0xCEF4, 0xD1B9, 0xD4D1
+)
+_GB2312_INITIALS = "abcdefghjklmnopqrstwxyz"
+_GB2312_LEVEL1_END = 0xD7F9
+
+# 前缀查询的上界哨兵，大于任何实际出现的字符
+_PREFIX_UPPER = "\U0010ffff"
+
+
+def _char_initial(char: str) -> Optional[str]:
+    """推算单个字符的拼音首字母，无法推算时返回None"""
+    if char.isascii():
+        return char.lower() if char.isalnum() else ""
+    try:
+        encoded = char.encode("gb2312")
+    except UnicodeEncodeError:
+        return None
+    if len(encoded) != 2:
+        return None
+    code = encoded[0] << 8 | encoded[1]
+    if code < _GB2312_INITIAL_STARTS[0] or code > _GB2312_LEVEL1_END:
+        # 二级汉字按部首排序，无法由编码推算
+        return None
+    return _GB2312_INITIALS[bisect_left(_GB2312_INITIAL_STARTS, code + 1) - 1]
+
+
+def pinyin_initials(name: str) -> Optional[str]:
+    """
+    获取姓名的拼音首字母
+
+    Args:
+        name: 姓名
+
+    Returns:
+        Optional[str]: 小写首字母串（如 张三 -> zs），含无法推算的字符时为None
+    """
+    if lazy_pinyin is not None:
+        initials = "".join(lazy_pinyin(name, style=Style.FIRST_LETTER, errors="ignore")).lower()
+        return initials or None
+
+    letters = []
+    for char in name:
+        initial = _char_initial(char)
+        if initial is None:
+            return None
+        letters.append(initial)
+    return "".join(letters) or None
+
+
+class NameSuggester:
+    """基于有序数组和二分查找的姓名前缀联想"""
+
+    def __init__(self, names: Iterable[str]):
+        """
+        构建联想索引
+
+        Args:
+            names: 去重后的员工姓名
+        """
+        entries = []
+        for name in names:
+            if not name:
+                continue
+            entries.append((name.lower(), name))
+            initials = pinyin_initials(name)
+            if initials:
+                entries.append((initials, name))
+        entries.sort()
+        # 键和姓名分别存放，二分查找只比较键
+        self._keys: List[str] = [key for key, _ in entries]
+        self._names: List[str] = [name for _, name in entries]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        查找以 prefix 开头的姓名，或拼音首字母以 prefix 开头的姓名
+
+        Args:
+            prefix: 输入前缀（不区分大小写）
+            limit: 最多返回的候选数
+
+        Returns:
+            List[str]: 候选姓名，按键的字典序排列且不重复
+        """
+        prefix = prefix.strip().lower()
+        if not prefix or limit <= 0:
+            return []
+
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + _PREFIX_UPPER, start)
+        results: List[str] = []
+        seen = set()
+        for i in range(start, end):
+            name = self._names[i]
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def __len__(self) -> int:
+        return len(self._keys)
@@ -0,0 +1,215 @@
+"""
+按需性能剖析模块
+
+使用 cProfile 剖析每次年假计算，输出 .pstats 文件（可用 snakeviz、pstats 查看）
+以及折叠栈文本（collapsed stacks，可直接交给 flamegraph.pl / speedscope 生成火焰图）。
+
+cProfile 只记录调用者 -> 被调用者的边而不记录完整调用栈，折叠栈是按各条边的累计耗时
+比例从根函数向下分摊得到的近似值，足以定位热点。
+"""
+import re
+import time
+import atexit
+import pstats
+import logging
+import cProfile
+import threading
+import itertools
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+PROFILE_MODES = ("off", "each", "run")
+
+# 折叠栈的最大深度，及计入的最小耗时（微秒）
+MAX_STACK_DEPTH = 64
+MIN_STACK_MICROSECONDS = 1
+
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _frame_name(func: FunctionKey) -> str:
+    """折叠栈中的帧名称：函数名 (文件名:行号)，内置函数只保留名称"""
+    filename, lineno, name = func
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({Path(filename).name}:{lineno})"
+    # 分号是折叠栈的帧分隔符
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """
+    将 pstats 统计转换为折叠栈文本行
+
+    Args:
+        stats: 剖析统计
+
+    Returns:
+        List[str]: "根帧;子帧;...;叶帧 微秒数" 形式的行，按栈排序
+    """
+    entries = stats.stats
+    children: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    roots = [
+        func for func, (_, _, _, _, callers) in entries.items()
+        if not any(caller in entries for caller in callers)
+    ]
+
+    totals: Dict[str, float] = {}
+
+    def walk(func: FunctionKey, budget: float, path: List[str], on_path: set) -> None:
+        _, _, inline_time, cumulative, _ = entries[func]
+        if cumulative <= 0 or budget * 1e6 < MIN_STACK_MICROSECONDS:
+            return
+        path.append(_frame_name(func))
+        on_path.add(func)
+        scale = budget / cumulative
+        own = inline_time * scale
+        if own > 0:
+            stack = ";".join(path)
+            totals[stack] = totals.get(stack, 0.0) + own
+        if len(path) < MAX_STACK_DEPTH:
+            for child, edge_cumulative in children.get(func, ()):
+                # 递归调用已计入当前路径，不再展开
+                if child not in on_path:
+                    walk(child, edge_cumulative * scale, path, on_path)
+        on_path.discard(func)
+        path.pop()
+
+    for root in roots:
+        walk(root, entries[root][3], [], set())
+
+    return [
+        f"{stack} {round(seconds * 1e6)}"
+        for stack, seconds in sorted(totals.items())
+        if round(seconds * 1e6) >= MIN_STACK_MICROSECONDS
+    ]
+
+
+class CalculationProfiler:
+    """年假计算剖析器"""
+
+    def __init__(self, output_dir: str = "logs/profiles", mode: str = "each"):
+        """
+        初始化剖析器
+
+        Args:
+            output_dir: 剖析结果输出目录
+            mode: each 每次计算输出一组文件（后台线程写出）；run 汇总整个运行期间的计算，
+                在 flush() 或进程退出时输出
+
+        Raises:
+            ValueError: 模式无效时抛出
+        """
+        if mode not in ("each", "run"):
+            raise ValueError(f"无效的剖析模式: {mode}，请使用 each 或 run")
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(output_dir)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._run_stats: Optional[pstats.Stats] = None
+        self._run_count = 0
+        self._skipped = 0
+        self._started = time.strftime("%Y%m%d_%H%M%S")
+        # each 模式在后台线程中生成并写出文件，不计入被剖析计算的耗时
+        self._writer: Optional[ThreadPoolExecutor] = None
+        atexit.register(self.flush)
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        """
+        剖析一段代码（通常为一次计算）
+
+        cProfile 只剖析当前线程；在同一进程只允许一个剖析器同时工作的Python版本上，
+        与其他线程并发的计算会跳过剖析而不是失败。
+
+        Args:
+            label: 输出文件名中的标识，如员工姓名
+        """
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            with self._lock:
+                self._skipped += 1
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._collect(profiler, label)
+
+    def _collect(self, profiler: cProfile.Profile, label: str) -> None:
+        """保存单次剖析结果，剖析失败不影响计算"""
+        try:
+            if self.mode == "each":
+                name = f"{time.strftime('%Y%m%d_%H%M%S')}_{next(self._sequence):04d}_{self._safe_label(label)}"
+                with self._lock:
+                    if self._writer is None:
+                        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+                    self._writer.submit(self._write_profile, profiler, name)
+                return
+            with self._lock:
+                if self._run_stats is None:
+                    self._run_stats = pstats.Stats(profiler)
+                else:
+                    self._run_stats.add(profiler)
+                self._run_count += 1
+        except Exception as e:
+            self.logger.warning(f"⚠️ 保存剖析结果失败: {str(e)}")
+
+    def _write_profile(self, profiler: cProfile.Profile, name: str) -> None:
+        """后台线程：写出单次计算的剖析结果（each 模式）"""
+        try:
+            self._write(pstats.Stats(profiler), name)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 保存剖析结果失败: {str(e)}")
+
+    def flush(self) -> Optional[Path]:
+        """
+        等待 each 模式的剖析文件写完，并写出汇总的剖析结果（run 模式）
+
+        Returns:
+            Path: 汇总 .pstats 文件路径，没有可写出的汇总结果时为None
+        """
+        with self._lock:
+            writer, self._writer = self._writer, None
+            stats, count = self._run_stats, self._run_count
+            self._run_stats, self._run_count = None, 0
+            skipped, self._skipped = self._skipped, 0
+        if writer is not None:
+            writer.shutdown(wait=True)
+        if skipped:
+            self.logger.warning(f"⚠️ 有 {skipped} 次并发计算未被剖析")
+        if stats is None:
+            return None
+        try:
+            return self._write(stats, f"{self._started}_run_{count}calc")
+        except Exception as e:
+            self.logger.warning(f"⚠️ 保存剖析结果失败: {str(e)}")
+            return None
+
+    def _write(self, stats: pstats.Stats, name: str) -> Path:
+        """写出 .pstats 与 .collapsed 文件"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stats_path = self.output_dir / f"{name}.pstats"
+        stats.dump_stats(str(stats_path))
+        collapsed_path = self.output_dir / f"{name}.collapsed"
+        collapsed_path.write_text("\n".join(collapsed_stacks(stats)) + "\n", encoding="utf-8")
+        self.logger.info(f"🔬 剖析结果已保存: {stats_path}")
+        return stats_path
+
+    @staticmethod
+    def _safe_label(label: str) -> str:
+        return _UNSAFE_FILENAME.sub("_", label.strip())[:40] or "calc"
@@ -0,0 +1,222 @@
+"""
+自适应限流模块
+
+按 (企业ID, 接口) 为企业微信请求维护令牌桶，在客户端主动控制请求速率：
+
+- 请求发出前预约一个令牌，令牌不足时等待到可用为止（同步客户端 time.sleep，异步客户端 asyncio.sleep）
+- 收到频率限制（errcode 45009 或 HTTP 429）时按比例降低速率，清空积攒的突发额度，
+  并作废按旧速率排好的预约，等待中的请求醒来后按新速率重新排队
+- 持续成功时每秒线性提高一次速率，直到配置上限
+
+即“乘性减、加性增”：批量查询会稳定在企业微信允许的最大速率附近，
+而不是先突发触发限流、再整体退避数秒。
+"""
+import time
+import asyncio
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import API_THROTTLED, RATE_LIMIT_WAIT
+
+
+# 企业微信“接口调用超过限制”错误码
+RATE_LIMIT_ERRCODE = 45009
+
+# 两次降速之间的最小间隔（秒）：同一批在途请求同时收到的限流响应只降速一次
+DECREASE_COOLDOWN = 1.0
+# 两次提速之间的最小间隔（秒）
+INCREASE_INTERVAL = 1.0
+
+
+class AdaptiveTokenBucket:
+    """速率可自动调整的令牌桶（线程安全）"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        min_rate: float,
+        max_rate: float,
+        increase_step: float,
+        decrease_factor: float,
+        endpoint: str = "",
+        timer: Callable[[], float] = time.monotonic
+    ):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 初始速率（次/秒）
+            burst: 令牌桶容量，即允许的突发请求数
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase_step: 每次提速增加的速率
+            decrease_factor: 限流时速率乘以的系数 (0-1之间)
+            endpoint: 指标中的接口名称
+            timer: 时钟函数
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.endpoint = endpoint
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._rate = min(max(rate, min_rate), max_rate)
+        self._tokens = self.burst
+        now = timer()
+        self._updated = now
+        self._last_increase = now
+        self._last_decrease = now - DECREASE_COOLDOWN
+        # 每次降速加一，用于识别按旧速率做出的预约
+        self._epoch = 0
+
+    @property
+    def rate(self) -> float:
+        """当前速率（次/秒）"""
+        return self._rate
+
+    def _refill(self, now: float) -> None:
+        """按当前速率补充令牌（调用方持有锁）"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _reserve(self) -> Tuple[float, int]:
+        """
+        预约一个令牌
+
+        令牌可以透支：透支部分按当前速率折算为需要等待的时间，
+        因此并发调用方按预约顺序依次放行，不需要在锁内等待。
+
+        Returns:
+            tuple: (发出请求前需要等待的秒数, 预约时的降速序号)
+        """
+        with self._lock:
+            self._refill(self._timer())
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            return wait, self._epoch
+
+    def acquire(self) -> None:
+        """预约令牌并阻塞等待（同步客户端使用）"""
+        started = self._timer()
+        while True:
+            wait, epoch = self._reserve()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            # 等待期间发生降速时，按新速率重新预约
+            if epoch == self._epoch:
+                break
+        RATE_LIMIT_WAIT.observe(self._timer() - started, endpoint=self.endpoint)
+
+    async def acquire_async(self) -> None:
+        """预约令牌并异步等待（异步客户端使用）"""
+        started = self._timer()
+        while True:
+            wait, epoch = self._reserve()
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            if epoch == self._epoch:
+                break
+        RATE_LIMIT_WAIT.observe(self._timer() - started, endpoint=self.endpoint)
+
+    def on_success(self) -> None:
+        """记录一次未被限流的请求，距上次调整足够久时提高速率"""
+        now = self._timer()
+        if self._rate >= self.max_rate or now - self._last_increase < INCREASE_INTERVAL:
+            return
+        with self._lock:
+            if now - self._last_decrease < DECREASE_COOLDOWN or now - self._last_increase < INCREASE_INTERVAL:
+                return
+            self._refill(now)
+            self._rate = min(self.max_rate, self._rate + self.increase_step)
+            self._last_increase = now
+
+    def on_throttled(self) -> None:
+        """记录一次被限流的请求：降低速率并清空突发额度"""
+        API_THROTTLED.inc(endpoint=self.endpoint)
+        now = self._timer()
+        with self._lock:
+            if now - self._last_decrease < DECREASE_COOLDOWN:
+                return
+            self._refill(now)
+            self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+            # 旧预约全部作废，透支清零，由等待中的请求按新速率重新预约
+            self._tokens = 0.0
+            self._epoch += 1
+            self._last_decrease = now
+            self._last_increase = now
+
+
+class RateLimiter:
+    """单个企业的限流器，每个接口一个令牌桶"""
+
+    def __init__(self, config: dict):
+        """
+        Args:
+            config: ConfigService.get_rate_limit_config() 返回的配置
+        """
+        self.config = config
+        self._buckets: Dict[str, AdaptiveTokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> AdaptiveTokenBucket:
+        """
+        获取接口对应的令牌桶，首次使用时创建
+
+        Args:
+            endpoint: 接口名称，如 getuservacationquota
+
+        Returns:
+            AdaptiveTokenBucket: 令牌桶
+        """
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None:
+                    config = self.config
+                    bucket = AdaptiveTokenBucket(
+                        rate=config["initial_rate"],
+                        burst=config["burst"],
+                        min_rate=config["min_rate"],
+                        max_rate=config["max_rate"],
+                        increase_step=config["increase_step"],
+                        decrease_factor=config["decrease_factor"],
+                        endpoint=endpoint
+                    )
+                    self._buckets[endpoint] = bucket
+        return bucket
+
+    def rates(self) -> Dict[str, float]:
+        """各接口当前速率（次/秒）"""
+        with self._lock:
+            return {endpoint: bucket.rate for endpoint, bucket in self._buckets.items()}
+
+
+# 企业微信按企业统计接口调用频率，同一进程内的所有客户端（同步/异步）共享同一企业的限流器
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(corp_id: str, config: dict) -> Optional[RateLimiter]:
+    """
+    获取企业共享的限流器（同一企业首次创建时的配置生效）
+
+    Args:
+        corp_id: 企业ID
+        config: ConfigService.get_rate_limit_config() 返回的配置
+
+    Returns:
+        RateLimiter: 限流器，配置中未开启限流时为None
+    """
+    if not config["enabled"]:
+        return None
+    with _shared_lock:
+        limiter = _shared_limiters.get(corp_id)
+        if limiter is None:
+            limiter = _shared_limiters[corp_id] = RateLimiter(config)
+        return limiter
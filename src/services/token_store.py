@@ -0,0 +1,196 @@
+"""
+access_token 持久化缓存模块
+
+将企业微信 access_token 及其过期时间保存到本地文件，
+同一主机上的多个进程通过文件锁安全共享，避免重复调用 gettoken 接口。
+"""
+import os
+import json
+import time
+import errno
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+_WINDOWS = os.name == "nt"
+
+if _WINDOWS:
+    import msvcrt
+else:
+    import fcntl
+
+
+# Windows 上等待文件锁的最长时间（秒）
+LOCK_TIMEOUT = 60.0
+
+
+class TokenStore:
+    """跨进程共享的 access_token 文件缓存"""
+
+    def __init__(self, path: str, lock_timeout: float = LOCK_TIMEOUT):
+        """
+        初始化token缓存
+
+        Args:
+            path: 缓存文件路径，锁文件为同目录下的 <path>.lock
+            lock_timeout: Windows 上等待文件锁的最长时间（秒）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.lock_timeout = lock_timeout
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        # 同一线程可重入；文件锁只在最外层获取
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+
+    @staticmethod
+    def make_key(corp_id: str, corp_secret: str) -> str:
+        """
+        生成缓存键
+
+        Secret只以摘要形式参与键计算，不会写入缓存文件
+        """
+        digest = hashlib.sha256(corp_secret.encode("utf-8")).hexdigest()[:16]
+        return f"{corp_id}:{digest}"
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """获取跨进程排他锁"""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = open(self.lock_path, "a+b")
+                try:
+                    self._acquire_file_lock(lock_file)
+                except BaseException:
+                    lock_file.close()
+                    raise
+                self._lock_file = lock_file
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    lock_file, self._lock_file = self._lock_file, None
+                    try:
+                        self._release_file_lock(lock_file)
+                    finally:
+                        lock_file.close()
+
+    def _acquire_file_lock(self, lock_file) -> None:
+        """
+        阻塞获取文件锁
+
+        Raises:
+            TimeoutError: Windows 上超过 lock_timeout 仍未获得锁时抛出
+            OSError: 加锁失败时抛出
+        """
+        if _WINDOWS:
+            lock_file.seek(0)
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    return
+                except OSError as e:
+                    # LK_LOCK 重试约10秒后锁仍被占用时抛出 EDEADLOCK/EACCES，在超时前继续等待；其他错误不重试
+                    if e.errno not in (errno.EDEADLOCK, errno.EACCES):
+                        raise
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"等待token缓存文件锁超过 {self.lock_timeout} 秒: {self.lock_path}") from e
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+    @staticmethod
+    def _release_file_lock(lock_file) -> None:
+        """释放文件锁"""
+        if _WINDOWS:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_all(self) -> dict:
+        """读取缓存文件内容，文件不存在或损坏时返回空字典"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ token缓存文件读取失败，将忽略: {e}")
+            return {}
+
+    def _write_all(self, data: dict) -> None:
+        """原子写入缓存文件"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        读取未过期的token
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[str, float]]: (access_token, 过期时间戳)，不存在或已过期时为None
+        """
+        entry = self._read_all().get(key)
+        if not isinstance(entry, dict):
+            return None
+        token = entry.get("access_token")
+        expires_at = entry.get("expires_at")
+        if not token or not isinstance(expires_at, (int, float)):
+            return None
+        if time.time() >= expires_at:
+            return None
+        return token, float(expires_at)
+
+    def save(self, key: str, token: str, expires_at: float) -> None:
+        """
+        保存token
+
+        Args:
+            key: 缓存键
+            token: access_token
+            expires_at: 过期时间戳
+        """
+        with self.lock():
+            data = self._read_all()
+            now = time.time()
+            # 顺带清理已过期的条目
+            data = {
+                k: v for k, v in data.items()
+                if isinstance(v, dict) and isinstance(v.get("expires_at"), (int, float)) and v["expires_at"] > now
+            }
+            data[key] = {"access_token": token, "expires_at": expires_at}
+            self._write_all(data)
+
+    def discard(self, key: str, token: Optional[str] = None) -> None:
+        """
+        删除缓存的token
+
+        Args:
+            key: 缓存键
+            token: 仅当缓存中的token与之相同时才删除，避免误删其他进程刚刷新的token
+        """
+        with self.lock():
+            data = self._read_all()
+            entry = data.get(key)
+            if entry is None:
+                return
+            if token is not None and isinstance(entry, dict) and entry.get("access_token") != token:
+                return
+            del data[key]
+            self._write_all(data)
@@ -0,0 +1,129 @@
+"""
+结构化追踪模块
+
+提供按日志级别门控、惰性格式化的追踪事件。追踪关闭时，
+一次事件调用只有一次级别判断的开销：不格式化字符串，也不计算字段值。
+调试时可通过 trace_request() 为单次请求临时开启追踪，而无需调整全局日志级别。
+"""
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+# 当前上下文（线程/协程）强制开启追踪时的输出级别，None表示未强制开启
+_forced_level = contextvars.ContextVar("trace_forced_level", default=None)
+
+
+@contextmanager
+def trace_request(enabled: bool = True, level: int = logging.INFO) -> Iterator[None]:
+    """
+    为当前请求开启追踪
+
+    在上下文内产生的追踪事件会以 level 级别输出，忽略各模块日志记录器自身的级别设置；
+    只影响当前线程/协程，不影响并发处理的其他请求。
+
+    Args:
+        enabled: 是否开启，为False时不做任何改变
+        level: 追踪事件的输出级别
+    """
+    if not enabled:
+        yield
+        return
+    token = _forced_level.set(level)
+    try:
+        yield
+    finally:
+        _forced_level.reset(token)
+
+
+class _LazyEvent:
+    """追踪事件消息，仅在日志处理器真正输出时才格式化"""
+
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.fields = fields
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        # 字段值可以是无参可调用对象，用于延迟计算代价较高的诊断信息
+        if callable(value):
+            value = value()
+        if isinstance(value, float):
+            return f"{value:.4f}".rstrip("0").rstrip(".")
+        if isinstance(value, str):
+            return repr(value) if (" " in value or not value) else value
+        return str(value)
+
+    def __str__(self) -> str:
+        parts = [self.name]
+        parts.extend(f"{key}={self._format_value(value)}" for key, value in self.fields.items())
+        return " ".join(parts)
+
+
+class Tracer:
+    """结构化追踪器"""
+
+    def __init__(self, logger: logging.Logger, level: int = logging.DEBUG):
+        """
+        初始化追踪器
+
+        Args:
+            logger: 输出追踪事件的日志记录器
+            level: 未强制开启时，日志记录器需启用的级别
+        """
+        self.logger = logger
+        self.level = level
+
+    def _effective_level(self) -> Optional[int]:
+        """返回本次事件的输出级别，追踪关闭时返回None"""
+        forced = _forced_level.get()
+        if forced is not None:
+            return forced
+        if self.logger.isEnabledFor(self.level):
+            return self.level
+        return None
+
+    @property
+    def enabled(self) -> bool:
+        """当前上下文是否开启追踪"""
+        return self._effective_level() is not None
+
+    def event(self, name: str, /, **fields: Any) -> None:
+        """
+        记录追踪事件
+
+        Args:
+            name: 事件名称，如 quota.response
+            **fields: 事件字段；值为可调用对象时仅在输出时计算
+        """
+        level = self._effective_level()
+        if level is None:
+            return
+        record = self.logger.makeRecord(
+            self.logger.name, level, "(trace)", 0, "%s", (_LazyEvent(name, fields),), None
+        )
+        # 绕过日志记录器自身的级别判断（强制开启时），仍经过处理器级别和过滤器
+        self.logger.handle(record)
+
+    @contextmanager
+    def span(self, name: str, /, **fields: Any) -> Iterator[None]:
+        """
+        记录一段操作的耗时，结束时输出 <name>.end 事件
+
+        Args:
+            name: 操作名称
+            **fields: 附加字段
+        """
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        self.event(f"{name}.start", **fields)
+        try:
+            yield
+        finally:
+            self.event(f"{name}.end", elapsed_ms=(time.perf_counter() - started) * 1000, **fields)
@@ -3,12 +3,20 @@
 """
 import time
 import logging
+import threading
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from models import WeChatConfig, LeaveBalance, Employee
+from .employee_directory import EmployeeDirectory
+from .metrics import API_ERRORS, API_LATENCY, API_RETRIES, CACHE_REQUESTS, TOKEN_REFRESHES, endpoint_label
+from .rate_limiter import RATE_LIMIT_ERRCODE, shared_rate_limiter
+from .token_store import TokenStore
+from .tracing import Tracer
+from .ttl_cache import TTLCache
 
 
 class WeChatAPIError(Exception):
@@ -26,35 +34,308 @@ class TokenExpiredError(WeChatAPIError):
 
 class EmployeeNotFoundError(WeChatAPIError):
     """员工未找到异常"""
-    pass
+    def __init__(self, errcode: int, errmsg: str, suggestions: Optional[List[str]] = None):
+        super().__init__(errcode, errmsg)
+        # 通讯录中与查询姓名相近的姓名，按相似度降序排列
+        self.suggestions = suggestions or []
 
 
-class WeChatWorkService:
-    """企业微信API服务"""
+class WeChatServiceBase:
+    """企业微信服务公共逻辑（配置、token状态、响应校验和数据解析），不包含网络IO"""
 
-    def __init__(self, config_service: 'ConfigService'):
+    def __init__(self, config_service: 'ConfigService', directory_loader: Callable[[], list]):
         """
-        初始化企业微信服务
+        初始化企业微信服务公共状态
         
         Args:
             config_service: 配置服务实例
+            directory_loader: 通讯录索引过期时同步拉取全量用户列表的回调
         """
         self.config = config_service.get_wechat_config()
         self.annual_leave_config = config_service.get_annual_leave_config()
+        self.cache_config = config_service.get_cache_config()
         self.logger = logging.getLogger(__name__)
-        self._access_token = None
-        self._token_expires_at = None
+        self.tracer = Tracer(self.logger)
+        # (access_token, 过期时间戳) 作为不可变元组整体发布，读取无需加锁
+        self._token_state: Optional[Tuple[str, float]] = None
+        # 保证同一时刻只有一个线程刷新token，其他线程等待其结果
+        self._token_lock = threading.Lock()
+        self._token_store = TokenStore(self.cache_config["token_file"]) if self.cache_config["token_file"] else None
+        self._token_key = TokenStore.make_key(self.config.corp_id, self.config.corp_secret)
+        self._directory = EmployeeDirectory(
+            directory_loader,
+            ttl=self.cache_config["directory_ttl"]
+        )
+        # (userid, 年份) -> LeaveBalance
+        self._quota_cache = TTLCache(
+            maxsize=self.cache_config["quota_cache_size"],
+            ttl=self.cache_config["quota_cache_ttl"]
+        )
+        # 按接口自适应调整请求速率，同一企业的所有客户端共享；未开启限流时为None
+        self._rate_limiter = shared_rate_limiter(self.config.corp_id, config_service.get_rate_limit_config())
+
+    @property
+    def directory(self) -> EmployeeDirectory:
+        """员工通讯录索引"""
+        return self._directory
+
+    @property
+    def quota_cache(self) -> TTLCache:
+        """假期余额缓存"""
+        return self._quota_cache
+
+    def invalidate_leave_balance(self, user_id: str, year: Optional[int] = None) -> int:
+        """
+        使缓存的假期余额失效（如员工在企业微信中新提交了请假）
+
+        Args:
+            user_id: 员工userid
+            year: 年份，为None时删除该员工所有年份的缓存
+
+        Returns:
+            int: 删除的缓存条目数
+        """
+        if year is not None:
+            return int(self._quota_cache.invalidate((user_id, year)))
+        return self._quota_cache.invalidate_where(lambda key: key[0] == user_id)
+
+    def _current_token(self) -> Optional[str]:
+        """返回未过期的token，无可用token时返回None"""
+        state = self._token_state
+        if state is None or time.time() >= state[1]:
+            return None
+        return state[0]
+
+    def _is_token_valid(self) -> bool:
+        """检查token是否有效"""
+        return self._current_token() is not None
+
+    def _invalidate_token(self, token: Optional[str] = None) -> None:
+        """
+        使失效的token作废（同时清理本地缓存中的同一token）
+
+        Args:
+            token: 被企业微信拒绝的请求所使用的token，为None时作废当前token
+        """
+        state = self._token_state
+        if token is None:
+            if state is None:
+                return
+            token = state[0]
+        self._discard_stored_token(token)
+        # 期间已被其他线程替换为新token时保留新token，只清空与失败请求相同的token
+        if state is not None and state[0] == token and self._token_state is state:
+            self._token_state = None
+
+    def _handle_api_response(self, response_data: Dict[str, Any], token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        处理API响应
+
+        Args:
+            response_data: 接口返回的JSON数据
+            token: 请求所使用的access_token，token失效时只作废这一个token
+
+        Returns:
+            dict: errcode 为0的响应数据
+
+        Raises:
+            TokenExpiredError: token无效或已过期
+            EmployeeNotFoundError: 用户不存在
+            WeChatAPIError: 其他接口错误
+        """
+        errcode = response_data.get("errcode", -1)
+        errmsg = response_data.get("errmsg", "未知错误")
+
+        if errcode == 0:
+            return response_data
+
+        API_ERRORS.inc(errcode=errcode)
+
+        # Token相关错误
+        if errcode in [40001, 40014, 42001]:
+            self._invalidate_token(token)
+            raise TokenExpiredError(errcode, errmsg)
+
+        # 用户不存在
+        if errcode == 60011:
+            raise EmployeeNotFoundError(errcode, errmsg)
+
+        # 其他错误
+        raise WeChatAPIError(errcode, errmsg)
+
+    def _discard_stored_token(self, token: Optional[str]) -> None:
+        """从本地缓存中删除已失效的token"""
+        if self._token_store is None or not token:
+            return
+        try:
+            self._token_store.discard(self._token_key, token)
+        except OSError as e:
+            self.logger.warning(f"⚠️ 清理token缓存失败: {str(e)}")
+
+    def _store_access_token(self, result: Dict[str, Any]) -> str:
+        """根据 gettoken 接口响应更新token和过期时间"""
+        token = result["access_token"]
+        expires_at = time.time() + result.get("expires_in", 7200) - 300  # 提前5分钟过期
+        self._token_state = (token, expires_at)
+        TOKEN_REFRESHES.inc(source="api")
+        return token
+
+    def _parse_leave_balance(self, employee: Employee, year: int, api_result: Dict[str, Any]) -> LeaveBalance:
+        """
+        解析 getuservacationquota 接口响应为假期余额
+
+        Args:
+            employee: 员工信息
+            year: 年份
+            api_result: 已通过 _handle_api_response 校验的响应数据
+
+        Returns:
+            LeaveBalance: 假期余额信息
+
+        Raises:
+            WeChatAPIError: 响应中没有有效的年假数据时抛出
+        """
+        # 获取假期数据
+        lists = api_result.get("lists", [])
+        trace = self.tracer
+        trace.event("quota.lists", user_id=employee.user_id, count=len(lists))
+        
+        # 详细记录每个假期类型（仅在开启追踪时遍历）
+        if trace.enabled:
+            for i, leave_item in enumerate(lists, 1):
+                trace.event(
+                    "quota.item",
+                    index=i,
+                    id=leave_item.get("id", "N/A"),
+                    vacationname=leave_item.get("vacationname", "N/A"),
+                    usedduration=leave_item.get("usedduration", 0),
+                    leftduration=leave_item.get("leftduration", 0),
+                    assigned=leave_item.get("assigned", 0),
+                    real_assigned=leave_item.get("real_assigned", 0),
+                    raw=lambda item=leave_item: item
+                )
+        
+        if not lists:
+            self.logger.warning(f"⚠️ 员工 {employee.name} 没有年假数据")
+            # 使用默认配置
+            default_hours = float(self.annual_leave_config['default_hours'])
+            trace.event("quota.default", user_id=employee.user_id, default_hours=default_hours)
+            return LeaveBalance(
+                used_hours=0.0,
+                remaining_hours=default_hours,
+                theoretical_hours=default_hours,
+                year=year
+            )
+        
+        # 从配置中获取目标假期名称列表
+        target_vacation_names = self.annual_leave_config.get('target_vacation_names', [])
+        
+        # 查找年假数据 - 直接使用环境变量中配置的假期名称进行精确匹配
+        annual_leave_data = next(
+            (item for item in lists if item.get("vacationname", "") in target_vacation_names),
+            None
+        )
+        
+        if not annual_leave_data:
+            self.logger.error(f"❌ 未找到年假数据:")
+            self.logger.error(f"   - 目标假期名称: {target_vacation_names}")
+            self.logger.error(f"   - 查询年份: {year}")
+            self.logger.error(f"   - 可用假期类型: {[item.get('vacationname', 'N/A') for item in lists]}")
+            self.logger.error(f"   - 假期类型详情:")
+            for i, leave_item in enumerate(lists, 1):
+                leave_name = leave_item.get("vacationname", "N/A")
+                self.logger.error(f"     {i}. {leave_name}: ID={leave_item.get('id', 'N/A')}")
+            raise WeChatAPIError(-1, f"员工 {employee.name} 没有年假数据")
+        
+        # 解析假期数据（企业微信返回的时长单位是秒）
+        used_seconds = annual_leave_data.get("usedduration", 0)
+        remaining_seconds = annual_leave_data.get("leftduration", 0)
+        assigned_seconds = annual_leave_data.get("assigned", 0)
+        real_assigned_seconds = annual_leave_data.get("real_assigned", 0)
+        
+        # 转换为小时（1小时 = 3600秒）
+        used_hours = used_seconds / 3600.0
+        remaining_hours = remaining_seconds / 3600.0
+        assigned_hours = assigned_seconds / 3600.0
+        real_assigned_hours = real_assigned_seconds / 3600.0
+        
+        # 计算理论总时长（根据企业微信API文档：理论时长 = 已使用 + 剩余）
+        theoretical_hours = used_hours + remaining_hours
+        
+        trace.event(
+            "quota.matched",
+            user_id=employee.user_id,
+            vacationname=annual_leave_data.get("vacationname"),
+            id=annual_leave_data.get("id"),
+            target_names=target_vacation_names,
+            used_hours=used_hours,
+            remaining_hours=remaining_hours,
+            assigned_hours=assigned_hours,
+            real_assigned_hours=real_assigned_hours,
+            theoretical_hours=theoretical_hours
+        )
+        
+        # 如果理论时长为0，显示详细的调试信息并报错
+        if theoretical_hours <= 0 and assigned_hours <= 0 and real_assigned_hours <= 0:
+            self.logger.error(f"❌ 年假数据异常 - 所有时长均为0:")
+            self.logger.error(f"   - 理论总时长: {theoretical_hours:.2f} 小时")
+            self.logger.error(f"   - 分配时长: {assigned_hours:.2f} 小时")
+            self.logger.error(f"   - 实际分配: {real_assigned_hours:.2f} 小时")
+            self.logger.error(f"   - 完整年假数据: {annual_leave_data}")
+            self.logger.error(f"   - 所有假期汇总:")
+            for i, leave_item in enumerate(lists, 1):
+                name = leave_item.get("vacationname", "N/A")
+                used = leave_item.get("usedduration", 0)
+                left = leave_item.get("leftduration", 0)
+                assigned = leave_item.get("assigned", 0)
+                self.logger.error(f"     {i}. {name}: 已用={used}秒, 剩余={left}秒, 分配={assigned}秒")
+            
+            # 不使用默认配置，直接报错
+            raise WeChatAPIError(-1, f"员工 {employee.name} 在企业微信中没有年假数据")
+        
+        return LeaveBalance(
+            used_hours=used_hours,
+            remaining_hours=remaining_hours,
+            theoretical_hours=theoretical_hours,
+            year=year
+        )
+
+
+class _CountingRetry(Retry):
+    """按接口统计重试次数的urllib3重试策略"""
+
+    def increment(self, method=None, url=None, *args, **kwargs):
+        # 重试次数耗尽时 increment 抛出异常，不计为一次重试
+        new_retry = super().increment(method, url, *args, **kwargs)
+        API_RETRIES.inc(endpoint=endpoint_label(url or ""))
+        return new_retry
+
+
+class WeChatWorkService(WeChatServiceBase):
+    """企业微信API服务"""
+
+    def __init__(self, config_service: 'ConfigService'):
+        """
+        初始化企业微信服务
+        
+        Args:
+            config_service: 配置服务实例
+        """
+        super().__init__(config_service, self._fetch_user_list)
         self._session = self._create_session()
 
     def _create_session(self) -> requests.Session:
         """创建HTTP会话"""
         session = requests.Session()
         
-        # 配置重试策略
-        retry_strategy = Retry(
+        # 配置重试策略；开启限流时 HTTP 429 由 _send 交给限流器处理，urllib3 只重试服务端错误
+        status_forcelist = [500, 502, 503, 504]
+        if self._rate_limiter is None:
+            status_forcelist.insert(0, 429)
+        retry_strategy = _CountingRetry(
             total=self.config.retry_count,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
+            status_forcelist=status_forcelist
         )
         
         adapter = HTTPAdapter(max_retries=retry_strategy)
@@ -64,66 +345,134 @@ class WeChatWorkService:
         
         return session
 
-    def _is_token_valid(self) -> bool:
-        """检查token是否有效"""
-        if not self._access_token or not self._token_expires_at:
-            return False
-        return time.time() < self._token_expires_at
+    def _send(self, endpoint: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送HTTP请求并记录接口耗时
 
-    def _handle_api_response(self, response_data: Dict[str, Any]) -> Dict[str, Any]:
-        """处理API响应"""
-        errcode = response_data.get("errcode", -1)
-        errmsg = response_data.get("errmsg", "未知错误")
+        请求发出前先从该接口的令牌桶取得令牌；响应为频率限制（HTTP 429 或 errcode 45009）时
+        限流器降速，并在重试次数内重新排队发送，不再额外退避。
 
-        if errcode == 0:
-            return response_data
+        Args:
+            endpoint: 指标中的接口名称
+            method: HTTP方法
+            url: 请求URL
+            **kwargs: 传给 requests 的其他参数
 
-        # Token相关错误
-        if errcode in [40001, 40014, 42001]:
-            self._access_token = None
-            self._token_expires_at = None
-            raise TokenExpiredError(errcode, errmsg)
+        Returns:
+            requests.Response: 响应（不检查状态码），重试耗尽时为最后一次的限流响应
+        """
+        bucket = self._rate_limiter.bucket(endpoint) if self._rate_limiter is not None else None
+        attempt = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            with API_LATENCY.time(endpoint=endpoint):
+                try:
+                    response = self._session.request(method, url, **kwargs)
+                except requests.RequestException:
+                    API_ERRORS.inc(errcode=-1)
+                    raise
+            if bucket is None:
+                break
+            if response.status_code != 429 and not self._is_rate_limited(response):
+                bucket.on_success()
+                break
+            bucket.on_throttled()
+            if attempt >= self.config.retry_count:
+                break
+            attempt += 1
+            API_RETRIES.inc(endpoint=endpoint)
+            self.logger.warning(f"⚠️ 接口 {endpoint} 触发频率限制，降速后第{attempt}次重试")
+        if response.status_code >= 400:
+            API_ERRORS.inc(errcode=-1)
+        return response
 
-        # 用户不存在
-        if errcode == 60011:
-            raise EmployeeNotFoundError(errcode, errmsg)
+    @staticmethod
+    def _is_rate_limited(response: requests.Response) -> bool:
+        """响应是否为频率限制错误（45009）"""
+        # 限流响应是很短的错误JSON，只解析短响应，避免重复解析通讯录等大响应
+        content = response.content
+        if len(content) > 256 or str(RATE_LIMIT_ERRCODE).encode() not in content:
+            return False
+        try:
+            return response.json().get("errcode") == RATE_LIMIT_ERRCODE
+        except (ValueError, AttributeError):
+            return False
 
-        # 其他错误
-        raise WeChatAPIError(errcode, errmsg)
+    def _load_or_request_token(self) -> str:
+        """在持有文件锁的情况下，优先复用本地缓存的token，否则重新获取并写入缓存"""
+        cached = self._token_store.load(self._token_key)
+        if cached is not None:
+            self._token_state = cached
+            TOKEN_REFRESHES.inc(source="file")
+            self.logger.info("✅ 使用本地缓存的access_token")
+            return cached[0]
+
+        token = self._request_access_token()
+        try:
+            self._token_store.save(self._token_key, token, self._token_state[1])
+        except OSError as e:
+            self.logger.warning(f"⚠️ 写入token缓存失败: {str(e)}")
+        return token
+
+    def _request_access_token(self) -> str:
+        """调用 gettoken 接口获取新的access_token"""
+        self.logger.info("🔑 获取新的access_token...")
+        
+        # 构建请求URL
+        url = f"{self.config.base_url}/cgi-bin/gettoken"
+        params = {
+            'corpid': self.config.corp_id,
+            'corpsecret': self.config.corp_secret
+        }
+        
+        # 发送请求
+        response = self._send("gettoken", "GET", url, params=params)
+        response.raise_for_status()
+        
+        data = response.json()
+        self.logger.debug(f"📥 获取token API响应: {data}")
+        
+        # 处理API响应
+        result = self._handle_api_response(data)
+        
+        # 更新token和过期时间
+        token = self._store_access_token(result)
+        
+        self.logger.info("✅ 成功获取access_token")
+        return token
 
     def _get_access_token(self) -> str:
         """获取企业微信access_token"""
+        # 快速路径：读取已发布的token元组，不加锁
+        token = self._current_token()
+        if token is not None:
+            CACHE_REQUESTS.inc(cache="token", result="hit")
+            self.logger.debug("✅ 使用缓存的access_token")
+            return token
+        
+        CACHE_REQUESTS.inc(cache="token", result="miss")
+        # 单飞刷新：只有一个线程请求新token，其余线程阻塞在锁上等待其结果
+        with self._token_lock:
+            token = self._current_token()
+            if token is not None:
+                return token
+            return self._refresh_access_token()
+
+    def _refresh_access_token(self) -> str:
+        """在持有 _token_lock 的情况下获取新token"""
         try:
-            # 检查缓存的token是否有效
-            if self._is_token_valid():
-                self.logger.debug("✅ 使用缓存的access_token")
-                return self._access_token
-            
-            self.logger.info("🔑 获取新的access_token...")
-            
-            # 构建请求URL
-            url = f"{self.config.base_url}/cgi-bin/gettoken"
-            params = {
-                'corpid': self.config.corp_id,
-                'corpsecret': self.config.corp_secret
-            }
-            
-            # 发送请求
-            response = self._session.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            self.logger.debug(f"📥 获取token API响应: {data}")
-            
-            # 处理API响应
-            result = self._handle_api_response(data)
-            
-            # 更新token和过期时间
-            self._access_token = result["access_token"]
-            self._token_expires_at = time.time() + result.get("expires_in", 7200) - 300  # 提前5分钟过期
-            
-            self.logger.info("✅ 成功获取access_token")
-            return self._access_token
+            # 多进程通过文件锁共享token，只有一个进程会真正调用gettoken
+            if self._token_store is not None:
+                try:
+                    with self._token_store.lock():
+                        return self._load_or_request_token()
+                except requests.RequestException:
+                    raise
+                except OSError as e:
+                    self.logger.warning(f"⚠️ token缓存不可用，直接获取access_token: {str(e)}")
+            
+            return self._request_access_token()
             
         except requests.RequestException as e:
             self.logger.error(f"❌ 获取access_token网络请求失败: {str(e)}")
@@ -132,23 +481,18 @@ class WeChatWorkService:
             self.logger.error(f"❌ 获取access_token时发生未知错误: {str(e)}")
             raise WeChatAPIError(-1, f"获取access_token失败: {str(e)}")
 
-    def find_employee_by_name(self, name: str) -> Employee:
+    def _fetch_user_list(self) -> list:
         """
-        根据姓名查找员工信息
-        
-        Args:
-            name: 员工姓名
-            
+        拉取企业全量用户列表
+
         Returns:
-            Employee: 员工信息对象
-            
+            list: 企业微信 userlist
+
         Raises:
-            EmployeeNotFoundError: 员工不存在时抛出
             WeChatAPIError: API调用失败时抛出
         """
         try:
-            # 获取access_token
-            self.logger.info(f"🔍 开始查找员工: {name}")
+            self.logger.info("📡 拉取企业微信通讯录...")
             access_token = self._get_access_token()
             
             # 构建请求URL
@@ -162,45 +506,62 @@ class WeChatWorkService:
             }
             
             # 发送GET请求
-            response = self._session.get(url, params=params)
+            response = self._send("user/list", "GET", url, params=params)
             response.raise_for_status()
             
-            data = response.json()
-            self.logger.debug(f"📥 企业微信用户列表API完整响应: {data}")
-            
-            result = self._handle_api_response(data)
-            
-            # 查找员工
+            result = self._handle_api_response(response.json(), access_token)
             userlist = result.get("userlist", [])
             self.logger.info(f"📊 获取到 {len(userlist)} 个用户")
+            return userlist
             
-            for i, user in enumerate(userlist):
-                user_name = user.get("name", "")
-                user_id = user.get("userid", "")
-                self.logger.debug(f"👤 用户 {i+1}: {user_name} (ID: {user_id})")
-                
-                if user_name == name:
-                    self.logger.info(f"✅ 找到匹配员工: {user_name} (ID: {user_id})")
-                    self.logger.debug(f"📋 完整用户信息: {user}")
-                    
-                    return Employee(
-                        user_id=user_id,
-                        name=user_name,
-                        department=user.get("department", [None])[0] if user.get("department") else None,
-                        position=user.get("position"),
-                        email=user.get("email")
-                    )
-            
-            # 如果没有找到员工
-            self.logger.error(f"❌ 未找到员工: {name}")
-            raise EmployeeNotFoundError(60011, f"未找到员工: {name}")
-            
-        except EmployeeNotFoundError:
-            # 重新抛出员工未找到异常，不要包装
+        except WeChatAPIError:
             raise
         except requests.RequestException as e:
             self.logger.error(f"❌ 网络请求失败: {str(e)}")
             raise WeChatAPIError(-1, f"网络请求失败: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"❌ 拉取通讯录时发生未知错误: {str(e)}")
+            raise WeChatAPIError(-1, f"拉取通讯录失败: {str(e)}")
+
+    def refresh_directory(self) -> None:
+        """立即重新拉取通讯录并重建索引"""
+        self._directory.refresh()
+
+    def find_employee_by_name(self, name: str) -> Employee:
+        """
+        根据姓名查找员工信息
+        
+        通讯录索引在有效期内时为一次字典查询，过期后才会重新拉取通讯录
+        
+        Args:
+            name: 员工姓名
+            
+        Returns:
+            Employee: 员工信息对象
+            
+        Raises:
+            EmployeeNotFoundError: 员工不存在时抛出
+            WeChatAPIError: API调用失败时抛出
+        """
+        try:
+            self.logger.info(f"🔍 开始查找员工: {name}")
+            employees = self._directory.find_by_name(name)
+            
+            if not employees:
+                suggestions = self._directory.similar_names(name)
+                self.logger.error(f"❌ 未找到员工: {name}，相近姓名: {suggestions}")
+                raise EmployeeNotFoundError(60011, f"未找到员工: {name}", suggestions)
+            
+            if len(employees) > 1:
+                self.logger.warning(f"⚠️ 存在 {len(employees)} 名同名员工 {name}，使用第一个匹配项")
+            
+            employee = employees[0]
+            self.logger.info(f"✅ 找到匹配员工: {employee.name} (ID: {employee.user_id})")
+            return employee
+            
+        except WeChatAPIError:
+            # 员工未找到及API异常直接抛出，不要包装
+            raise
         except Exception as e:
             self.logger.error(f"❌ 查找员工时发生未知错误: {str(e)}")
             raise WeChatAPIError(-1, f"查找员工失败: {str(e)}")
@@ -222,243 +583,90 @@ class WeChatWorkService:
         Raises:
             WeChatAPIError: API调用失败时抛出
         """
-        # 正常模式：调用企业微信API
+        trace = self.tracer
+        cache_key = (employee.user_id, year)
+        cached = self._quota_cache.get(cache_key)
+        if cached is not None:
+            CACHE_REQUESTS.inc(cache="quota", result="hit")
+            trace.event("quota.cache_hit", user_id=employee.user_id, year=year)
+            return cached
+        CACHE_REQUESTS.inc(cache="quota", result="miss")
+        
         try:
-            # 获取access_token
-            self.logger.info("=" * 80)
-            self.logger.info(f"开始获取员工 {employee.name}({employee.user_id}) 的年假余额")
-            self.logger.info("=" * 80)
-            
-            self.logger.info("🔑 开始获取企业微信access_token...")
-            access_token = self._get_access_token()
-            self.logger.info(f"✅ 成功获取access_token: {access_token[:20]}...{access_token[-10:]}")
-            
-            # 构建请求URL
-            url = f"{self.config.base_url}/cgi-bin/oa/vacation/getuservacationquota"
-            
-            # 构建请求参数
-            params = {
-                "access_token": access_token
-            }
-            
-            # 构建请求体
-            data = {
-                "userid": employee.user_id,
-                "vacation_type": 1  # 1表示年假
-            }
-            
-            self.logger.info(f"📡 准备调用企业微信年假API:")
-            self.logger.info(f"   - 员工姓名: {employee.name}")
-            self.logger.info(f"   - 员工ID: {employee.user_id}")
-            self.logger.info(f"   - 查询年份: {year}")
-            self.logger.info(f"   - URL: {url}")
-            self.logger.info(f"   - 请求参数: {params}")
-            self.logger.info(f"   - 请求体: {data}")
-            
-            # 发送POST请求
-            self.logger.info("📡 发送POST请求到企业微信API...")
-            response = self._session.post(url, params=params, json=data)
-            
-            self.logger.info(f"📥 收到HTTP响应:")
-            self.logger.info(f"   - 状态码: {response.status_code}")
-            self.logger.info(f"   - 响应头: {dict(response.headers)}")
-            self.logger.info(f"   - 响应大小: {len(response.content)} 字节")
-            
-            response.raise_for_status()
-            self.logger.info(f"✅ HTTP请求成功")
-            
-            # 解析JSON响应
-            try:
-                result = response.json()
-                self.logger.info(f"📋 企业微信年假余额API完整响应:")
-                self.logger.info(f"{result}")
-            except Exception as json_error:
-                self.logger.error(f"❌ JSON解析失败:")
-                self.logger.error(f"   - 错误: {str(json_error)}")
-                self.logger.error(f"   - 原始响应: {response.text}")
-                raise WeChatAPIError(-1, f"API响应JSON解析失败: {str(json_error)}")
-            
-            api_result = self._handle_api_response(result)
-            self.logger.info(f"🔍 API响应处理结果: {api_result}")
-            
-            # 获取假期数据
-            lists = api_result.get("lists", [])
-            self.logger.info(f"📊 解析假期数据列表:")
-            self.logger.info(f"   - 假期类型总数: {len(lists)}")
-            
-            if not lists:
-                self.logger.warning("⚠️  假期列表为空")
-            
-            # 详细显示每个假期类型
-            self.logger.info("📝 所有假期类型详细信息:")
-            for i, leave_item in enumerate(lists, 1):
-                leave_name = leave_item.get("vacationname", "N/A")
-                used = leave_item.get("usedduration", 0)
-                left = leave_item.get("leftduration", 0)
-                assigned = leave_item.get("assigned", 0)
-                real_assigned = leave_item.get("real_assigned", 0)
+            with trace.span("quota", user_id=employee.user_id, name=employee.name, year=year):
+                access_token = self._get_access_token()
                 
-                self.logger.info(f"   [{i}] 假期类型: {leave_name}")
-                self.logger.info(f"       - ID: {leave_item.get('id', 'N/A')}")
-                self.logger.info(f"       - usedduration: {used} 秒 ({used/3600:.2f} 小时)")
-                self.logger.info(f"       - leftduration: {left} 秒 ({left/3600:.2f} 小时)")
-                self.logger.info(f"       - assigned: {assigned} 秒 ({assigned/3600:.2f} 小时)")
-                self.logger.info(f"       - real_assigned: {real_assigned} 秒 ({real_assigned/3600:.2f} 小时)")
-                self.logger.info(f"       - vacationname: {leave_name}")
-                self.logger.info(f"       - 总计时长: {used + left} 秒 ({(used + left)/3600:.2f} 小时)")
-                self.logger.info(f"       - 原始数据: {leave_item}")
-                self.logger.info("")
-            
-            if not lists:
-                self.logger.warning(f"⚠️ 员工 {employee.name} 没有年假数据")
-                # 使用默认配置
-                default_hours = float(self.annual_leave_config['default_hours'])
-                self.logger.info(f"🔧 使用默认配置: {default_hours}小时")
-                return LeaveBalance(
-                    used_hours=0.0,
-                    remaining_hours=default_hours,
-                    theoretical_hours=default_hours,
-                    year=year
+                # 构建请求URL
+                url = f"{self.config.base_url}/cgi-bin/oa/vacation/getuservacationquota"
+                
+                # 构建请求参数
+                params = {
+                    "access_token": access_token
+                }
+                
+                # 构建请求体
+                data = {
+                    "userid": employee.user_id,
+                    "vacation_type": 1  # 1表示年假
+                }
+                
+                # 发送POST请求
+                trace.event("quota.request", url=url, body=data)
+                response = self._send("getuservacationquota", "POST", url, params=params, json=data)
+                trace.event(
+                    "quota.response",
+                    status=response.status_code,
+                    size=lambda: len(response.content),
+                    headers=lambda: dict(response.headers)
                 )
-            
-            # 从配置中获取目标假期名称列表
-            target_vacation_names = self.annual_leave_config.get('target_vacation_names', [])
-            
-            # 查找年假数据 - 直接使用环境变量中配置的假期名称进行精确匹配
-            annual_leave_data = None
-            
-            self.logger.info(f"🔍 开始搜索年假数据:")
-            self.logger.info(f"   - 目标假期名称: {target_vacation_names}")
-            
-            match_priority = "无"
-            
-            # 直接使用环境变量中的假期名称进行精确匹配
-            for i, leave_item in enumerate(lists, 1):
-                vacation_name = leave_item.get("vacationname", "")
-                self.logger.info(f"     检查假期 [{i}]: {vacation_name}")
                 
-                # 检查是否与配置的目标假期名称完全匹配
-                if vacation_name in target_vacation_names:
-                    annual_leave_data = leave_item
-                    match_priority = f"精确匹配 (目标假期: {vacation_name})"
-                    self.logger.info(f"       ✅ 精确匹配成功! 假期名称: {vacation_name}")
-                    break
-                else:
-                    self.logger.info(f"       ✗ 不匹配目标假期名称")
-            
-            if not annual_leave_data:
-                self.logger.error(f"❌ 未找到年假数据:")
-                self.logger.error(f"   - 搜索关键词: {annual_leave_keywords}")
-                self.logger.error(f"   - 当前年份: {current_year}")
-                self.logger.error(f"   - 可用假期类型: {[item.get('vacationname', 'N/A') for item in lists]}")
-                self.logger.error(f"   - 假期类型详情:")
-                for i, leave_item in enumerate(lists, 1):
-                    leave_name = leave_item.get("vacationname", "N/A")
-                    self.logger.error(f"     {i}. {leave_name}: ID={leave_item.get('id', 'N/A')}")
-                raise WeChatAPIError(-1, f"员工 {employee.name} 没有年假数据")
-            
-            self.logger.info(f"✅ 找到年假数据:")
-            self.logger.info(f"   - 假期名称: {annual_leave_data.get('vacationname')}")
-            self.logger.info(f"   - 匹配优先级: {match_priority}")
-            self.logger.info(f"   - 假期ID: {annual_leave_data.get('id')}")
-            
-            # 解析假期数据（企业微信返回的时长单位是秒）
-            used_seconds = annual_leave_data.get("usedduration", 0)
-            remaining_seconds = annual_leave_data.get("leftduration", 0)
-            assigned_seconds = annual_leave_data.get("assigned", 0)
-            real_assigned_seconds = annual_leave_data.get("real_assigned", 0)
-            
-            self.logger.info(f"📊 年假原始数据 (秒):")
-            self.logger.info(f"   - 已使用时长: {used_seconds} 秒")
-            self.logger.info(f"   - 剩余时长: {remaining_seconds} 秒")
-            self.logger.info(f"   - 分配时长: {assigned_seconds} 秒")
-            self.logger.info(f"   - 实际分配: {real_assigned_seconds} 秒")
-            
-            # 转换为小时（1小时 = 3600秒）
-            used_hours = used_seconds / 3600.0
-            remaining_hours = remaining_seconds / 3600.0
-            assigned_hours = assigned_seconds / 3600.0
-            real_assigned_hours = real_assigned_seconds / 3600.0
-            
-            # 计算理论总时长（根据企业微信API文档：理论时长 = 已使用 + 剩余）
-            theoretical_hours = used_hours + remaining_hours
-            
-            self.logger.info(f"📊 年假转换数据 (小时):")
-            self.logger.info(f"   - 已使用: {used_hours:.2f} 小时")
-            self.logger.info(f"   - 剩余: {remaining_hours:.2f} 小时")
-            self.logger.info(f"   - 分配时长: {assigned_hours:.2f} 小时")
-            self.logger.info(f"   - 实际分配: {real_assigned_hours:.2f} 小时")
-            self.logger.info(f"   - 理论总时长: {theoretical_hours:.2f} 小时")
-            
-            # 数据有效性检查
-            self.logger.info(f"🔍 数据有效性检查:")
-            self.logger.info(f"   - 理论总时长 > 0: {theoretical_hours > 0}")
-            self.logger.info(f"   - 分配时长 > 0: {assigned_hours > 0}")
-            self.logger.info(f"   - 实际分配 > 0: {real_assigned_hours > 0}")
-            
-            # 如果理论时长为0，显示详细的调试信息并报错
-            if theoretical_hours <= 0 and assigned_hours <= 0 and real_assigned_hours <= 0:
-                self.logger.error(f"❌ 年假数据异常 - 所有时长均为0:")
-                self.logger.error(f"   - 理论总时长: {theoretical_hours:.2f} 小时")
-                self.logger.error(f"   - 分配时长: {assigned_hours:.2f} 小时")
-                self.logger.error(f"   - 实际分配: {real_assigned_hours:.2f} 小时")
-                self.logger.error(f"   - 完整年假数据: {annual_leave_data}")
-                self.logger.error(f"   - 所有假期汇总:")
-                for i, leave_item in enumerate(lists, 1):
-                    name = leave_item.get("vacationname", "N/A")
-                    used = leave_item.get("usedduration", 0)
-                    left = leave_item.get("leftduration", 0)
-                    assigned = leave_item.get("assigned", 0)
-                    self.logger.error(f"     {i}. {name}: 已用={used}秒, 剩余={left}秒, 分配={assigned}秒")
+                response.raise_for_status()
                 
-                # 不使用默认配置，直接报错
-                raise WeChatAPIError(-1, f"员工 {employee.name} 在企业微信中没有年假数据")
-            
-            self.logger.info(f"✅ 年假数据有效，准备返回结果")
-            self.logger.info("=" * 80)
-            
-            return LeaveBalance(
-                used_hours=used_hours,
-                remaining_hours=remaining_hours,
-                theoretical_hours=theoretical_hours,
-                year=year
-            )
+                # 解析JSON响应
+                try:
+                    result = response.json()
+                except Exception as json_error:
+                    self.logger.error(f"❌ JSON解析失败: {str(json_error)}, 原始响应: {response.text}")
+                    raise WeChatAPIError(-1, f"API响应JSON解析失败: {str(json_error)}")
+                
+                trace.event("quota.body", body=lambda: result)
+                api_result = self._handle_api_response(result, access_token)
+                
+                leave_balance = self._parse_leave_balance(employee, year, api_result)
+                self._quota_cache.put(cache_key, leave_balance)
+                return leave_balance
             
         except requests.RequestException as e:
-            self.logger.error(f"❌ 网络请求异常:")
-            self.logger.error(f"   - 异常类型: {type(e).__name__}")
-            self.logger.error(f"   - 异常信息: {str(e)}")
-            self.logger.error(f"   - 请求URL: {url if 'url' in locals() else 'N/A'}")
-            self.logger.error(f"   - 请求参数: {params if 'params' in locals() else 'N/A'}")
+            self.logger.error(f"❌ 网络请求异常: {type(e).__name__}: {str(e)}, 员工ID: {employee.user_id}")
             raise WeChatAPIError(-1, f"网络请求失败: {str(e)}")
         except Exception as e:
-            self.logger.error(f"❌ 获取年假余额失败:")
-            self.logger.error(f"   - 异常类型: {type(e).__name__}")
-            self.logger.error(f"   - 异常信息: {str(e)}")
-            self.logger.error(f"   - 员工姓名: {employee.name}")
+            self.logger.error(f"❌ 获取年假余额失败: {type(e).__name__}: {str(e)}, 员工姓名: {employee.name}")
             if isinstance(e, WeChatAPIError):
                 raise
             raise WeChatAPIError(-1, f"解析假期余额数据失败: {str(e)}")
 
-    def _get_approval_records(self, employee_id: str, year: int) -> list:
+    def _fetch_approval_page(
+        self,
+        employee_id: str,
+        start_time: int,
+        end_time: int,
+        cursor: int,
+        page_size: int
+    ) -> Tuple[list, Optional[int]]:
         """
-        获取审批记录（示例方法）
-        
-        这是一个示例方法，展示如何通过审批记录计算假期余额
-        实际使用时需要根据企业的审批模板ID和字段配置进行调整
+        获取一页审批记录
+
+        Returns:
+            tuple: (本页记录, 下一页游标)，没有下一页时游标为None
         """
         access_token = self._get_access_token()
         url = f"{self.config.base_url}/cgi-bin/oa/getapprovaldata"
         
-        # 计算查询时间范围（整年）
-        start_time = int(time.mktime(time.strptime(f"{year}-01-01", "%Y-%m-%d")))
-        end_time = int(time.mktime(time.strptime(f"{year}-12-31", "%Y-%m-%d")))
-        
         data = {
             "starttime": start_time,
             "endtime": end_time,
-            "cursor": 0,
-            "size": 100,
+            "cursor": cursor,
+            "size": page_size,
             "filters": [
                 {
                     "key": "applyer",
@@ -469,19 +677,89 @@ class WeChatWorkService:
         }
         
         try:
-            response = self._session.post(
+            response = self._send(
+                "getapprovaldata",
+                "POST",
                 url,
                 params={"access_token": access_token},
                 json=data
             )
             response.raise_for_status()
-            result = response.json()
-            
-            return self._handle_api_response(result).get("data", [])
-            
+            result = self._handle_api_response(response.json(), access_token)
         except requests.RequestException as e:
             self.logger.error(f"获取审批记录失败: {str(e)}")
             raise WeChatAPIError(-1, f"网络请求失败: {str(e)}")
+        
+        records = result.get("data", [])
+        next_cursor = result.get("next_cursor")
+        # 没有更多数据：游标缺失、未前进或本页为空
+        if not records or not next_cursor or next_cursor == cursor:
+            next_cursor = None
+        self.tracer.event("approval.page", user_id=employee_id, cursor=cursor, count=len(records), next_cursor=next_cursor)
+        return records, next_cursor
+
+    def iter_approval_records(
+        self,
+        employee_id: str,
+        year: int,
+        page_size: int = 100,
+        prefetch: bool = False
+    ) -> Iterator[dict]:
+        """
+        按游标逐页获取审批记录（示例方法）
+        
+        这是一个示例方法，展示如何通过审批记录计算假期余额
+        实际使用时需要根据企业的审批模板ID和字段配置进行调整
+        
+        记录随每页到达逐条产出，内存占用与总记录数无关。
+        
+        Args:
+            employee_id: 申请人userid
+            year: 年份
+            page_size: 每页记录数
+            prefetch: 是否在消费当前页时后台预取下一页
+            
+        Yields:
+            dict: 审批记录
+            
+        Raises:
+            WeChatAPIError: API调用失败时抛出
+        """
+        # 计算查询时间范围（整年，包含12月31日当天）
+        start_time = int(time.mktime(time.strptime(f"{year}-01-01", "%Y-%m-%d")))
+        end_time = int(time.mktime(time.strptime(f"{year + 1}-01-01", "%Y-%m-%d"))) - 1
+        
+        def fetch(cursor: int) -> Tuple[list, Optional[int]]:
+            return self._fetch_approval_page(employee_id, start_time, end_time, cursor, page_size)
+        
+        if not prefetch:
+            cursor: Optional[int] = 0
+            while cursor is not None:
+                records, cursor = fetch(cursor)
+                yield from records
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="approval-prefetch")
+        try:
+            records, cursor = fetch(0)
+            while True:
+                # 先提交下一页请求，再产出当前页
+                pending = executor.submit(fetch, cursor) if cursor is not None else None
+                yield from records
+                if pending is None:
+                    return
+                records, cursor = pending.result()
+        finally:
+            # 调用方提前停止迭代时不等待预取中的请求
+            executor.shutdown(wait=False)
+
+    def _get_approval_records(self, employee_id: str, year: int) -> list:
+        """
+        获取全年审批记录列表
+
+        大量记录时请使用 iter_approval_records 逐条处理
+        """
+        return list(self.iter_approval_records(employee_id, year))
 
     def test_connection(self) -> bool:
         """
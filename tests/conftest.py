@@ -0,0 +1,11 @@
+"""
+pytest 公共配置
+
+与 main.py 一致，将 src 目录加入模块搜索路径，测试中按 from services.x import ... 导入。
+"""
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
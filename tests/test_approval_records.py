@@ -0,0 +1,106 @@
+"""审批记录游标分页测试（以桩对象代替HTTP请求）"""
+import threading
+import time
+
+import pytest
+
+from services.config_service import ConfigService
+from services.wechat_service import WeChatWorkService
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeApprovalApi:
+    """按游标返回预设分页的审批接口桩"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.threads = set()
+
+    def send(self, endpoint, method, url, params=None, json=None):
+        self.requests.append(json)
+        self.threads.add(threading.current_thread().name)
+        records, next_cursor = self.pages[json["cursor"]]
+        return FakeResponse({"errcode": 0, "errmsg": "ok", "data": records, "next_cursor": next_cursor})
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv("WECHAT_CORP_ID", "test-corp")
+    monkeypatch.setenv("WECHAT_CORP_SECRET", "test-secret")
+    monkeypatch.setenv("WECHAT_AGENT_ID", "1000001")
+    monkeypatch.setenv("TOKEN_CACHE_FILE", "")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    service = WeChatWorkService(ConfigService(env_file=str(tmp_path / "missing.env")))
+    service._token_state = ("test-token", time.time() + 3600)
+    return service
+
+
+def _install(service, monkeypatch, pages):
+    api = FakeApprovalApi(pages)
+    monkeypatch.setattr(service, "_send", api.send)
+    return api
+
+
+PAGES = {
+    0: ([{"sp_no": "1"}, {"sp_no": "2"}], 2),
+    2: ([{"sp_no": "3"}, {"sp_no": "4"}], 4),
+    4: ([{"sp_no": "5"}], None)
+}
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_all_pages_followed(service, monkeypatch, prefetch):
+    api = _install(service, monkeypatch, PAGES)
+
+    records = list(service.iter_approval_records("u1", 2024, page_size=2, prefetch=prefetch))
+
+    assert [r["sp_no"] for r in records] == ["1", "2", "3", "4", "5"]
+    assert [r["cursor"] for r in api.requests] == [0, 2, 4]
+    assert all(r["size"] == 2 and r["filters"][0]["value"] == "u1" for r in api.requests)
+    if prefetch:
+        assert any(name.startswith("approval-prefetch") for name in api.threads)
+
+
+def test_query_window_covers_whole_year(service, monkeypatch):
+    api = _install(service, monkeypatch, {0: ([], None)})
+
+    assert service._get_approval_records("u1", 2024) == []
+
+    request = api.requests[0]
+    assert request["starttime"] == int(time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1)))
+    assert request["endtime"] == int(time.mktime((2024, 12, 31, 23, 59, 59, 0, 0, -1)))
+
+
+@pytest.mark.parametrize("pages, expected, requests", [
+    ({0: ([{"sp_no": "1"}], 0)}, ["1"], 1),
+    ({0: ([{"sp_no": "1"}], 5), 5: ([{"sp_no": "2"}], 5)}, ["1", "2"], 2),
+    ({0: ([{"sp_no": "1"}], 5), 5: ([], 9)}, ["1"], 2)
+])
+def test_stops_when_cursor_does_not_advance(service, monkeypatch, pages, expected, requests):
+    api = _install(service, monkeypatch, pages)
+
+    records = service._get_approval_records("u1", 2024)
+
+    assert [r["sp_no"] for r in records] == expected
+    assert len(api.requests) == requests
+
+
+def test_records_yielded_before_next_page_requested(service, monkeypatch):
+    api = _install(service, monkeypatch, PAGES)
+    records = service.iter_approval_records("u1", 2024, page_size=2)
+
+    assert next(records)["sp_no"] == "1"
+    assert len(api.requests) == 1
+    records.close()
+    assert len(api.requests) == 1
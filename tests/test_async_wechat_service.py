@@ -0,0 +1,203 @@
+"""异步企业微信服务测试（以桩对象代替 aiohttp 会话，不发出网络请求）"""
+import time
+import asyncio
+import itertools
+import threading
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from yarl import URL
+
+from services import async_wechat_service
+from services.async_wechat_service import AsyncWeChatWorkService
+from services.config_service import ConfigService
+from services.wechat_service import WeChatAPIError
+
+
+# 限流器按企业ID在进程内共享，每个服务使用独立的企业ID
+_corp_ids = itertools.count(1)
+# 未被 sleeps 替换的 asyncio.sleep，桩对象用它让出事件循环
+_yield_sleep = asyncio.sleep
+
+
+class FakeResponse:
+    """aiohttp 响应桩"""
+
+    def __init__(self, status: int = 200, data=None):
+        self.status = status
+        self.data = {"errcode": 0, "errmsg": "ok"} if data is None else data
+
+    async def __aenter__(self):
+        # 让出事件循环，使并发协程交错执行
+        await _yield_sleep(0)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            url = URL("http://wechat.test")
+            raise aiohttp.ClientResponseError(aiohttp.RequestInfo(url, "GET", {}, url), (), status=self.status)
+
+    async def json(self, content_type=None):
+        return self.data
+
+
+class FakeSession:
+    """按顺序返回预设响应的 aiohttp 会话桩，响应为异常时抛出"""
+
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, params=None, json=None):
+        self.calls.append((method, url))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def close(self):
+        self.closed = True
+
+
+def _make_service(monkeypatch, tmp_path, rate_limit=True, token_file=False, retry_count=3):
+    monkeypatch.setenv("WECHAT_CORP_ID", f"async-test-corp-{next(_corp_ids)}")
+    monkeypatch.setenv("WECHAT_CORP_SECRET", "test-secret")
+    monkeypatch.setenv("WECHAT_AGENT_ID", "1000001")
+    monkeypatch.setenv("WECHAT_BASE_URL", "http://wechat.test")
+    monkeypatch.setenv("API_RETRY_COUNT", str(retry_count))
+    monkeypatch.setenv("TOKEN_CACHE_FILE", str(tmp_path / "token.json") if token_file else "")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true" if rate_limit else "false")
+    return AsyncWeChatWorkService(ConfigService(env_file=str(tmp_path / "missing.env")))
+
+
+def _install(service, session):
+    """挂载会话桩（需在事件循环中调用）"""
+    service._session = session
+    service._semaphore = asyncio.Semaphore(service.max_concurrency)
+    service._async_token_lock = asyncio.Lock()
+    service._directory_lock = asyncio.Lock()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录 asyncio.sleep 的等待时间，实际不等待"""
+    recorded = []
+
+    async def fake_sleep(delay, *args, **kwargs):
+        recorded.append(delay)
+        await _yield_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def _request(service, session):
+    async def run():
+        _install(service, session)
+        return await service._request_json("GET", "/cgi-bin/user/list")
+    return asyncio.run(run())
+
+
+def test_http_429_requeued_on_rate_limiter_without_backoff(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path)
+    session = FakeSession([FakeResponse(429), FakeResponse(200)])
+
+    assert _request(service, session)["errcode"] == 0
+    assert len(session.calls) == 2
+    # 只有令牌桶按降速后的速率排队等待，没有 2**attempt 秒的指数退避
+    assert all(delay < 1 for delay in sleeps)
+    bucket = service._rate_limiter.bucket("user/list")
+    assert bucket.rate < service._rate_limiter.config["initial_rate"]
+
+
+def test_errcode_45009_requeued_without_backoff(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path)
+    session = FakeSession([FakeResponse(200, {"errcode": 45009, "errmsg": "api freq out of limit"}),
+                           FakeResponse(200)])
+
+    assert _request(service, session)["errcode"] == 0
+    assert all(delay < 1 for delay in sleeps)
+
+
+def test_http_429_backs_off_without_rate_limiter(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path, rate_limit=False)
+    session = FakeSession([FakeResponse(429), FakeResponse(200)])
+
+    assert _request(service, session)["errcode"] == 0
+    assert sleeps == [1]
+
+
+def _token_response(token="fresh-token"):
+    return FakeResponse(200, {"errcode": 0, "errmsg": "ok", "access_token": token, "expires_in": 7200})
+
+
+def test_concurrent_token_requests_share_one_refresh(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path, token_file=True)
+    session = FakeSession([_token_response()])
+
+    async def run():
+        _install(service, session)
+        return await asyncio.gather(*(service._get_access_token() for _ in range(5)))
+
+    assert asyncio.run(run()) == ["fresh-token"] * 5
+    assert [url for _, url in session.calls] == ["http://wechat.test/cgi-bin/gettoken"]
+    # 新token已写入本地缓存，供其他进程复用
+    assert service._token_store.load(service._token_key)[0] == "fresh-token"
+
+
+def test_discarded_token_not_reloaded_from_store(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path, token_file=True)
+    service._token_store.save(service._token_key, "stale-token", time.time() + 3600)
+    discard_threads = []
+    original_discard = service._token_store.discard
+
+    def discard(key, token=None):
+        discard_threads.append(threading.current_thread())
+        original_discard(key, token)
+
+    monkeypatch.setattr(service._token_store, "discard", discard)
+    session = FakeSession([_token_response()])
+
+    async def run():
+        _install(service, session)
+        # 企业微信拒绝token时在事件循环中同步调用，删除放到线程池执行
+        service._invalidate_token("stale-token")
+        return await service._get_access_token()
+
+    assert asyncio.run(run()) == "fresh-token"
+    assert len(discard_threads) == 1 and discard_threads[0] is not threading.main_thread()
+
+
+def test_server_error_retried_with_backoff(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path, rate_limit=False)
+    session = FakeSession([FakeResponse(500), FakeResponse(200)])
+
+    assert _request(service, session)["errcode"] == 0
+    assert len(session.calls) == 2
+    assert sleeps == [1]
+
+
+def test_connection_error_retried(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path, rate_limit=False)
+    session = FakeSession([aiohttp.ClientConnectionError("connection reset"), FakeResponse(200)])
+
+    assert _request(service, session)["errcode"] == 0
+    assert sleeps == [1]
+
+
+def test_exhausted_retries_raise_wechat_api_error(monkeypatch, tmp_path, sleeps):
+    service = _make_service(monkeypatch, tmp_path, rate_limit=False, retry_count=2)
+    session = FakeSession([FakeResponse(500), FakeResponse(503), FakeResponse(502)])
+
+    with pytest.raises(WeChatAPIError) as excinfo:
+        _request(service, session)
+    assert excinfo.value.errcode == -1
+    assert len(session.calls) == 3
+    assert sleeps == [1, 2]
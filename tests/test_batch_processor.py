@@ -0,0 +1,132 @@
+"""批量年假计算测试"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from business.batch_processor import BatchProcessor
+from models import BatchItem, CalculationResult
+
+
+class FakeDirectory:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.warmed = 0
+
+    def ensure_fresh(self):
+        self.warmed += 1
+        if self.fail:
+            raise RuntimeError("通讯录不可用")
+
+
+class FakeService:
+    def __init__(self, directory):
+        self.directory = directory
+
+
+class FakeController:
+    """按姓名返回预设结果的控制器，姓名越靠前处理越慢，用于打乱完成顺序"""
+
+    def __init__(self, directory_fails=False):
+        self.wechat_service = FakeService(FakeDirectory(directory_fails))
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def process_leave_calculation(self, name, resignation_date):
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+        if name == "异常":
+            raise RuntimeError("boom")
+        index = int(name[2:]) if name.startswith("员工") else 0
+        time.sleep(max(0, 5 - index) * 0.002)
+        return CalculationResult(remaining_days=float(index), success=name != "失败",
+                                 error_message="员工不存在" if name == "失败" else "")
+
+
+def _items(names):
+    return [BatchItem(row_number=i + 2, employee_name=name, resignation_date="2025-06-30")
+            for i, name in enumerate(names)]
+
+
+def test_csv_with_bom_and_header_aliases(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text(
+        "离职日期,备注,姓名\n2025-06-30,,张伟\n,,\n2025-07-01,x,李娜\n2025-07-02\n",
+        encoding="utf-8-sig"
+    )
+    items = BatchProcessor(FakeController()).read_input(str(path))
+    assert items == [
+        BatchItem(row_number=2, employee_name="张伟", resignation_date="2025-06-30"),
+        BatchItem(row_number=4, employee_name="李娜", resignation_date="2025-07-01"),
+        BatchItem(row_number=5, employee_name="", resignation_date="2025-07-02")
+    ]
+
+
+def test_csv_without_header_uses_first_two_columns(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text(" 张伟 ,2025-06-30\n李娜,2025-07-01\n", encoding="utf-8")
+    items = BatchProcessor(FakeController()).read_input(str(path))
+    assert [(i.row_number, i.employee_name, i.resignation_date) for i in items] == [
+        (1, "张伟", "2025-06-30"), (2, "李娜", "2025-07-01")
+    ]
+
+
+def test_header_missing_date_column_rejected(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text("姓名,部门\n张伟,研发\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        BatchProcessor(FakeController()).read_input(str(path))
+
+
+def test_unsupported_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BatchProcessor(FakeController()).read_input(str(tmp_path / "input.txt"))
+
+
+def test_xlsx_dates_formatted(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["员工姓名", "离职日期"])
+    sheet.append(["张伟", datetime(2025, 6, 30)])
+    sheet.append([None, None])
+    sheet.append(["李娜", "2025-07-01"])
+    path = tmp_path / "input.xlsx"
+    workbook.save(path)
+
+    items = BatchProcessor(FakeController()).read_input(str(path))
+    assert [(i.row_number, i.employee_name, i.resignation_date) for i in items] == [
+        (2, "张伟", "2025-06-30"), (4, "李娜", "2025-07-01")
+    ]
+
+
+def test_run_keeps_input_order_and_isolates_failures():
+    controller = FakeController()
+    names = [f"员工{i}" for i in range(6)] + ["失败", "异常"]
+    progress = []
+
+    report = BatchProcessor(controller, max_workers=4).run(_items(names), progress.append)
+
+    assert [r.item.employee_name for r in report.results] == names
+    assert [r.item.employee_name for r in progress] == names
+    assert [r.result.remaining_days for r in report.results[:6]] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert report.success_count == 6 and report.failure_count == 2
+    assert "boom" in report.results[-1].result.error_message
+    assert all(r.elapsed_ms >= 0 for r in report.results)
+    assert len(controller.threads) > 1
+    assert controller.wechat_service.directory.warmed == 1
+    assert report.throughput > 0
+    assert report.latency_percentile(100) == max(r.elapsed_ms for r in report.results)
+
+
+def test_run_continues_when_warm_up_fails():
+    controller = FakeController(directory_fails=True)
+    report = BatchProcessor(controller, max_workers=2).run(_items(["员工1", "员工2"]))
+    assert report.success_count == 2
+
+
+def test_run_with_no_items():
+    report = BatchProcessor(FakeController()).run([])
+    assert report.results == [] and report.throughput == 0.0
+    assert report.latency_percentile(50) == 0.0
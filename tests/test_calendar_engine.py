@@ -0,0 +1,46 @@
+"""日历计算测试"""
+from datetime import date, timedelta
+
+import pytest
+
+from business import calendar_engine
+
+
+@pytest.mark.parametrize("year, leap", [(2024, True), (2025, False), (1900, False), (2000, True), (2100, False)])
+def test_is_leap_year(year, leap):
+    assert calendar_engine.is_leap_year(year) is leap
+    assert calendar_engine.days_in_year(year) == (366 if leap else 365)
+
+
+@pytest.mark.parametrize("year", [2023, 2024, 2000, 2100])
+def test_ratio_table_layout(year):
+    table = calendar_engine.ratio_table(year)
+    total = calendar_engine.days_in_year(year)
+    assert len(table) == total + 1
+    assert table[0] == 0.0
+    assert table[total] == 1.0
+    assert table[1] == 1 / total
+
+
+def test_ratio_table_is_cached_per_year():
+    assert calendar_engine.ratio_table(2024) is calendar_engine.ratio_table(2024)
+    assert calendar_engine.ratio_table(2024) is not calendar_engine.ratio_table(2025)
+
+
+def test_leap_day_ratio():
+    # 2024-02-29 为第60天，2024-03-01 为第61天
+    assert calendar_engine.day_of_year(date(2024, 2, 29)) == 60
+    assert calendar_engine.day_of_year(date(2024, 3, 1)) == 61
+    assert calendar_engine.day_of_year(date(2025, 3, 1)) == 60
+    assert calendar_engine.time_ratio(date(2024, 2, 29)) == 60 / 366
+    assert calendar_engine.time_ratio(date(2025, 12, 31)) == 1.0
+    assert calendar_engine.time_ratio(date(2024, 12, 31)) == 1.0
+
+
+@pytest.mark.parametrize("year", [2024, 2025])
+def test_time_ratio_matches_direct_calculation(year):
+    start = date(year, 1, 1)
+    total = calendar_engine.days_in_year(year)
+    for offset in range(total):
+        current = start + timedelta(days=offset)
+        assert calendar_engine.time_ratio(current) == (offset + 1) / total
@@ -0,0 +1,75 @@
+"""列式员工表测试"""
+import pytest
+
+from models import Employee
+from services.employee_table import EmployeeTable
+
+
+USERLIST = [
+    {"userid": "u1", "name": "张伟", "department": [2, 3], "position": "工程师", "email": "u1@example.com"},
+    {"userid": "u2", "name": "李娜", "department": [3], "position": "经理"},
+    {"userid": "u3", "name": "张伟", "department": [], "position": "工程师", "email": ""},
+    {"userid": "u4", "name": "王芳"},
+    {"userid": "u5", "name": "张伟", "department": [2], "position": None, "email": "u5@example.com"},
+    {"userid": "", "name": "无账号"},
+    {"userid": "u6", "name": ""}
+]
+
+
+@pytest.fixture(scope="module")
+def table():
+    return EmployeeTable(USERLIST)
+
+
+def test_len(table):
+    assert len(table) == len(USERLIST)
+
+
+def test_employee_round_trip(table):
+    assert table.get_by_userid("u1") == Employee(
+        user_id="u1", name="张伟", department=2, position="工程师", email="u1@example.com"
+    )
+    # 缺失的部门、职位为None，空邮箱为None
+    assert table.get_by_userid("u3") == Employee(user_id="u3", name="张伟", department=None, position="工程师")
+    assert table.get_by_userid("u4") == Employee(user_id="u4", name="王芳")
+    assert table.employee(1) == Employee(user_id="u2", name="李娜", department=3, position="经理")
+
+
+def test_duplicate_names_in_directory_order(table):
+    assert [employee.user_id for employee in table.find_by_name("张伟")] == ["u1", "u3", "u5"]
+    assert table.rows_by_name("张伟") == [0, 2, 4]
+    assert [employee.user_id for employee in table.find_by_name("李娜")] == ["u2"]
+
+
+def test_missing_keys(table):
+    assert table.find_by_name("赵敏") == []
+    assert table.find_by_name("张") == []
+    assert table.get_by_userid("u404") is None
+    # 空userid不建索引
+    assert table.get_by_userid("") is None
+
+
+def test_names_sorted_unique_non_empty(table):
+    assert list(table.names()) == sorted({"张伟", "李娜", "王芳", "无账号"})
+
+
+def test_duplicate_userid_keeps_first_row():
+    table = EmployeeTable([{"userid": "u1", "name": "甲"}, {"userid": "u1", "name": "乙"}])
+    assert table.get_by_userid("u1").name == "甲"
+
+
+def test_empty_table():
+    table = EmployeeTable([])
+    assert len(table) == 0
+    assert table.find_by_name("张伟") == []
+    assert table.get_by_userid("u1") is None
+    assert list(table.names()) == []
+
+
+def test_large_table_lookups():
+    userlist = [{"userid": f"u{i:06d}", "name": f"员工{i % 5000}"} for i in range(20000)]
+    table = EmployeeTable(userlist)
+    for i in (0, 4999, 5000, 12345, 19999):
+        assert table.get_by_userid(f"u{i:06d}").name == f"员工{i % 5000}"
+    assert table.rows_by_name("员工7") == [7, 5007, 10007, 15007]
+    assert sum(1 for _ in table.names()) == 5000
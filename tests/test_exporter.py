@@ -0,0 +1,127 @@
+"""计算结果导出测试"""
+import csv
+import json
+from datetime import date
+
+import pytest
+
+from business.exporter import BATCH_COLUMNS, ResultExporter, batch_row, calculation_row, detect_format
+from models import BatchItem, BatchItemResult, CalculationFigures, CalculationResult
+
+
+FIGURES = CalculationFigures(
+    theoretical_hours=40.0,
+    used_hours=8.0,
+    remaining_hours_before_calc=32.0,
+    resignation_date=date(2025, 6, 30),
+    time_ratio=0.49589041,
+    entitled_hours=19.8,
+    remaining_hours=11.8,
+    remaining_days=1.5
+)
+
+SUCCESS = CalculationResult(remaining_days=1.5, success=True, figures=FIGURES)
+FAILURE = CalculationResult(remaining_days=0.0, success=False, error_message="员工不存在")
+
+
+def _rows():
+    return [calculation_row("张伟", SUCCESS), calculation_row("李娜", FAILURE, "2025-07-01")]
+
+
+def test_calculation_row_from_figures():
+    assert calculation_row("张伟", SUCCESS) == {
+        "employee_name": "张伟",
+        "resignation_date": "2025-06-30",
+        "success": True,
+        "remaining_days": 1.5,
+        "theoretical_hours": 40.0,
+        "used_hours": 8.0,
+        "time_ratio": 0.4959,
+        "error_message": ""
+    }
+
+
+def test_calculation_row_from_legacy_details():
+    details = {"resignation_date": "2025-06-30", "theoretical_hours": 40.0, "used_hours": 8.0, "time_ratio": 0.5}
+    row = calculation_row("张伟", CalculationResult(1.5, details, True, ""))
+    assert (row["resignation_date"], row["theoretical_hours"], row["time_ratio"]) == ("2025-06-30", 40.0, 0.5)
+
+    row = calculation_row("李娜", FAILURE, "2025-07-01")
+    assert row["remaining_days"] is None and row["theoretical_hours"] is None
+    assert row["error_message"] == "员工不存在"
+
+
+def test_batch_row_adds_row_number_and_elapsed():
+    item = BatchItem(row_number=3, employee_name="张伟", resignation_date="2025-06-29")
+    row = batch_row(BatchItemResult(item=item, result=SUCCESS, elapsed_ms=12.345))
+    assert row["row_number"] == 3 and row["elapsed_ms"] == 12.3
+    assert row["resignation_date"] == "2025-06-29"
+
+
+@pytest.mark.parametrize("name, fmt", [
+    ("out.csv", "csv"), ("OUT.XLSX", "xlsx"), ("out.json", "jsonl"), ("out.jsonl", "jsonl")
+])
+def test_detect_format(name, fmt):
+    assert detect_format(name) == fmt
+
+
+@pytest.mark.parametrize("name", ["out.txt", "out"])
+def test_detect_format_rejects_unknown(name):
+    with pytest.raises(ValueError):
+        detect_format(name)
+
+
+def test_csv_has_bom_and_display_values(tmp_path):
+    path = tmp_path / "nested" / "out.csv"
+
+    assert ResultExporter().export(iter(_rows()), str(path)) == 2
+
+    raw = path.read_bytes()
+    assert raw.startswith(b"\xef\xbb\xbf")
+    lines = list(csv.reader(raw.decode("utf-8-sig").splitlines()))
+    assert lines[0][:3] == ["姓名", "离职日期", "是否成功"]
+    assert lines[1] == ["张伟", "2025-06-30", "是", "1.5", "40.0", "8.0", "0.4959", ""]
+    assert lines[2] == ["李娜", "2025-07-01", "否", "", "", "", "", "员工不存在"]
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_jsonl_keeps_raw_types(tmp_path):
+    path = tmp_path / "out.jsonl"
+    ResultExporter().export(_rows(), str(path))
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records[0]["success"] is True and records[0]["remaining_days"] == 1.5
+    assert records[1]["success"] is False and records[1]["remaining_days"] is None
+
+
+def test_xlsx_output(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "out.xlsx"
+    item = BatchItem(row_number=2, employee_name="张伟", resignation_date="2025-06-30")
+
+    ResultExporter(BATCH_COLUMNS).export([batch_row(BatchItemResult(item, SUCCESS, 1.0))], str(path))
+
+    sheet = openpyxl.load_workbook(path).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][0] == "行号" and rows[0][-1] == "耗时(ms)"
+    assert rows[1][:4] == (2, "张伟", "2025-06-30", "是")
+
+
+def test_failed_export_keeps_existing_file(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("previous", encoding="utf-8")
+
+    def rows():
+        yield calculation_row("张伟", SUCCESS)
+        raise RuntimeError("数据源中断")
+
+    with pytest.raises(RuntimeError):
+        ResultExporter().export(rows(), str(path))
+
+    assert path.read_text(encoding="utf-8") == "previous"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_unknown_explicit_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResultExporter().export([], str(tmp_path / "out.csv"), fmt="parquet")
@@ -0,0 +1,183 @@
+"""计算历史存储测试"""
+import sqlite3
+import threading
+
+import pytest
+
+from models import CalculationResult
+from services import history_store as history_module
+from services.config_service import ConfigService
+from services.history_store import HistoryStore
+
+
+SUCCESS = CalculationResult(remaining_days=1.5, success=True)
+
+
+class CommitCountingStore(HistoryStore):
+    """统计写入线程提交事务次数的历史存储"""
+
+    def __init__(self, *args, **kwargs):
+        self.commits = 0
+        super().__init__(*args, **kwargs)
+
+    def _connect(self):
+        connection = super()._connect()
+        if threading.current_thread().name == "history-writer" and not getattr(self._local, "traced", False):
+            self._local.traced = True
+            connection.set_trace_callback(self._trace)
+        return connection
+
+    def _trace(self, statement):
+        if statement.strip().upper() == "COMMIT":
+            self.commits += 1
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+def _count_rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM calculation_history").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def _run_in_thread(func):
+    """在新线程中调用func，返回其结果或重新抛出其异常"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def test_writer_commits_in_batches(db_path):
+    store = CommitCountingStore(db_path, batch_size=3, flush_interval=5.0)
+    for i in range(7):
+        store.record(f"员工{i}", "2025-06-30", SUCCESS)
+    store.close()
+
+    assert _count_rows(db_path) == 7
+    # 3 + 3 + 1，最后一批由 close() 的退出标志结束，不等待 flush_interval
+    assert store.commits == 3
+
+
+def test_flush_waits_for_pending_records(db_path):
+    store = HistoryStore(db_path, batch_size=100, flush_interval=0.01)
+    try:
+        for i in range(5):
+            store.record("张伟", "2025-06-30", SUCCESS)
+        assert store.flush() is True
+        assert store.count() == 5
+    finally:
+        store.close()
+
+
+def test_flush_times_out(db_path):
+    store = HistoryStore(db_path, batch_size=100, flush_interval=5.0)
+    store.record("张伟", "2025-06-30", SUCCESS)
+    # 写入线程仍在凑批，flush 超时返回而不是一直阻塞
+    assert store.flush(timeout=0.05) is False
+    store.close()
+    assert _count_rows(db_path) == 1
+
+
+def test_writer_survives_non_sqlite_errors(db_path):
+    store = HistoryStore(db_path, batch_size=100, flush_interval=0.01)
+    try:
+        # 超出SQLite整数范围，绑定参数时抛 OverflowError 而不是 sqlite3.Error
+        store.record("张伟", "2025-06-30", SUCCESS, elapsed_ms=2 ** 70)
+        assert store.flush() is True
+        store.record("李娜", "2025-06-30", SUCCESS)
+        assert store.flush() is True
+        assert [r.employee_name for r in store.query().records] == ["李娜"]
+    finally:
+        store.close()
+
+
+def test_record_after_close_is_dropped(db_path):
+    store = HistoryStore(db_path)
+    store.close()
+    store.record("张伟", "2025-06-30", SUCCESS)
+    assert store.flush(timeout=0.1) is True
+    assert _count_rows(db_path) == 0
+    # 重复关闭无副作用
+    store.close()
+
+
+def test_close_closes_connections_of_other_threads(db_path):
+    store = HistoryStore(db_path)
+    connection = _run_in_thread(store._connect)
+    # 读线程已结束，下一次建连时回收其连接
+    _run_in_thread(store.count)
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+
+    reader = _run_in_thread(store._connect)
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        reader.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        _run_in_thread(store._connect)
+
+
+def test_keyset_pagination_with_equal_timestamps(db_path, monkeypatch):
+    times = iter([100.0, 100.0, 100.0, 200.5, 200.5, 300.0])
+    monkeypatch.setattr(history_module.time, "time", lambda: next(times))
+    store = HistoryStore(db_path, flush_interval=0.01)
+    try:
+        for i in range(6):
+            store.record("张伟" if i % 2 == 0 else "李娜", f"2025-0{i + 1}-01", SUCCESS)
+        assert store.flush() is True
+
+        seen = []
+        cursor = None
+        while True:
+            page = store.query(limit=2, cursor=cursor)
+            seen.extend((r.created_at, r.id) for r in page.records)
+            if page.next_cursor is None:
+                break
+            assert page.next_cursor == f"{page.records[-1].created_at!r}:{page.records[-1].id}"
+            cursor = page.next_cursor
+
+        assert len(seen) == 6
+        assert seen == sorted(seen, reverse=True)
+
+        page = store.query(employee_name="张伟", limit=2)
+        assert [r.resignation_date for r in page.records] == ["2025-05-01", "2025-03-01"]
+        page = store.query(employee_name="张伟", limit=2, cursor=page.next_cursor)
+        assert [r.resignation_date for r in page.records] == ["2025-01-01"]
+        assert page.next_cursor is None
+
+        page = store.query(resignation_date_from="2025-02-01", resignation_date_to="2025-04-30")
+        assert [r.resignation_date for r in page.records] == ["2025-04-01", "2025-03-01", "2025-02-01"]
+    finally:
+        store.close()
+
+
+def test_invalid_cursor_rejected(db_path):
+    store = HistoryStore(db_path)
+    try:
+        with pytest.raises(ValueError):
+            store.query(cursor="not-a-cursor")
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("value, enabled", [(" True\n", True), ("false ", False), ("", False)])
+def test_history_enabled_flag_parsing(tmp_path, monkeypatch, value, enabled):
+    monkeypatch.setenv("HISTORY_ENABLED", value)
+    config = ConfigService(env_file=str(tmp_path / "missing.env"))
+    assert config.get_history_config()["enabled"] is enabled
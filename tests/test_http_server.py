@@ -0,0 +1,124 @@
+"""HTTP服务线程池与长连接测试"""
+import json
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+
+from server.http_server import LeaveCalculatorServer
+
+
+class FakeController:
+    """只提供 /config/status 所需接口的控制器，可阻塞以占住工作线程"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_config_status(self):
+        self.release.wait(5)
+        return {"thread": threading.current_thread().name}
+
+
+@pytest.fixture
+def controller():
+    return FakeController()
+
+
+@pytest.fixture
+def make_server(controller):
+    servers = []
+
+    def make(**kwargs):
+        server = LeaveCalculatorServer(controller, port=0, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield make
+    controller.release.set()
+    for server in servers:
+        server.shutdown()
+
+
+def _get(connection, path="/health"):
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_idle_keepalive_connections_do_not_hold_workers(make_server):
+    server = make_server(max_workers=2)
+    host, port = server.address
+    idle = [HTTPConnection(host, port, timeout=5) for _ in range(4)]
+    for connection in idle:
+        assert _get(connection) == (200, {"status": "ok"})
+
+    # 4 条空闲长连接之外的新客户端仍能立即得到响应
+    started = time.monotonic()
+    fresh = HTTPConnection(host, port, timeout=5)
+    assert _get(fresh)[0] == 200
+    assert time.monotonic() - started < 1.0
+
+    # 空闲的长连接可继续复用，请求由线程池中的工作线程处理
+    for connection in idle:
+        status, payload = _get(connection, "/config/status")
+        assert status == 200 and payload["thread"].startswith("http-worker")
+        connection.close()
+    fresh.close()
+
+
+def test_busy_pool_queues_new_connections(make_server, controller):
+    server = make_server(max_workers=1)
+    host, port = server.address
+    controller.release.clear()
+
+    busy = HTTPConnection(host, port, timeout=5)
+    blocked = threading.Thread(target=_get, args=(busy, "/config/status"))
+    blocked.start()
+    time.sleep(0.2)
+
+    # 唯一的工作线程被占用，新连接在监听队列中等待而不是被拒绝
+    waiting = HTTPConnection(host, port, timeout=5)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(_get(waiting)))
+    thread.start()
+    thread.join(0.3)
+    assert result == []
+
+    controller.release.set()
+    thread.join(5)
+    blocked.join(5)
+    assert result == [(200, {"status": "ok"})]
+    busy.close()
+    waiting.close()
+
+
+def test_pipelined_requests_are_all_answered(make_server):
+    server = make_server(max_workers=1)
+    with socket.create_connection(server.address, timeout=5) as sock:
+        sock.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n" * 3)
+        received = b""
+        while received.count(b'{"status": "ok"}') < 3:
+            chunk = sock.recv(4096)
+            assert chunk
+            received += chunk
+    assert received.count(b"HTTP/1.1 200") == 3
+
+
+def test_idle_connection_closed_after_keepalive_timeout(make_server):
+    server = make_server(max_workers=1, keepalive_timeout=0.2)
+    with socket.create_connection(server.address, timeout=5) as sock:
+        sock.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n")
+        received = b""
+        while b'{"status": "ok"}' not in received:
+            received += sock.recv(4096)
+        # 轮询线程在空闲超时后关闭连接，客户端读到EOF
+        assert sock.recv(4096) == b""
+
+
+def test_bind_failure_raises_oserror(make_server, controller):
+    server = make_server(max_workers=1)
+    with pytest.raises(OSError):
+        LeaveCalculatorServer(controller, host=server.address[0], port=server.address[1])
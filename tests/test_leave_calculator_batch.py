@@ -0,0 +1,79 @@
+"""批量年假计算（列式接口）测试"""
+from datetime import date, datetime
+
+import pytest
+
+from business import leave_calculator
+from business.leave_calculator import LeaveCalculator
+from models import LeaveBalance
+
+
+THEORETICAL = [40.0, 120.0, 80.0, 0.0, 96.0, 64.0]
+USED = [8.0, 0.0, 80.0, 0.0, 12.5, 70.0]
+DATES = [
+    date(2025, 6, 30),
+    "2024-02-29",
+    datetime(2023, 12, 31, 18, 0),
+    date(2025, 1, 1),
+    "2024-12-31",
+    date(2025, 3, 15)
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """分别覆盖 numpy 向量化实现和未安装 numpy 时的逐行实现"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(leave_calculator, "_numpy", None)
+    else:
+        monkeypatch.setattr(leave_calculator, "_numpy", False)
+    return request.param
+
+
+def _scalar_results(calculator):
+    results = []
+    for theoretical, used, value in zip(THEORETICAL, USED, DATES):
+        balance = LeaveBalance(used_hours=used, remaining_hours=theoretical - used,
+                               theoretical_hours=theoretical, year=2025)
+        results.append(calculator.calculate_remaining_leave(balance, LeaveCalculator._to_date(value)))
+    return results
+
+
+@pytest.mark.parametrize("mode", ["calendar", "workday"])
+def test_batch_matches_scalar(backend, mode):
+    calculator = LeaveCalculator(proration_mode=mode)
+    columns = calculator.calculate_remaining_leave_batch(THEORETICAL, USED, DATES)
+    expected = _scalar_results(calculator)
+
+    assert len(columns) == len(expected)
+    for row, (result, scalar) in enumerate(zip(columns.to_results(), expected)):
+        assert result.remaining_days == scalar.remaining_days, row
+        assert result.figures.time_ratio == pytest.approx(scalar.figures.time_ratio, abs=1e-12)
+        assert result.figures.remaining_hours == pytest.approx(scalar.figures.remaining_hours, abs=1e-9)
+        assert result.figures.resignation_date == scalar.figures.resignation_date
+        assert result.figures.proration_mode == mode
+        assert result.calculation_details.keys() == scalar.calculation_details.keys()
+
+
+def test_remaining_never_negative(backend):
+    columns = LeaveCalculator().calculate_remaining_leave_batch([40.0], [100.0], ["2025-01-31"])
+    result = columns.result_at(0)
+    assert result.success and result.remaining_days == 0.0
+    assert result.figures.remaining_hours == 0.0
+    assert result.figures.remaining_hours_before_calc == -60.0
+
+
+def test_empty_batch(backend):
+    columns = LeaveCalculator().calculate_remaining_leave_batch([], [], [])
+    assert len(columns) == 0 and columns.to_results() == []
+
+
+def test_column_lengths_must_match(backend):
+    with pytest.raises(ValueError):
+        LeaveCalculator().calculate_remaining_leave_batch([40.0, 80.0], [8.0], ["2025-06-30"])
+
+
+def test_invalid_date_rejected(backend):
+    with pytest.raises(ValueError):
+        LeaveCalculator().calculate_remaining_leave_batch([40.0], [8.0], ["2025-13-40"])
@@ -0,0 +1,121 @@
+"""运行指标测试"""
+import json
+
+import pytest
+
+from services.metrics import Histogram, MetricsRegistry, endpoint_label
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_values_and_labels(registry):
+    counter = registry.counter("requests_total", "请求次数", ("endpoint",))
+    counter.inc(endpoint="user/list")
+    counter.inc(2.5, endpoint="user/list")
+
+    assert counter.value(endpoint="user/list") == 3.5
+    assert counter.value(endpoint="gettoken") == 0
+    with pytest.raises(ValueError):
+        counter.inc(-1, endpoint="user/list")
+    with pytest.raises(ValueError):
+        counter.inc(cache="token")
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_register_returns_existing_metric(registry):
+    counter = registry.counter("requests_total", "请求次数", ("endpoint",))
+    assert registry.counter("requests_total", "请求次数", ("endpoint",)) is counter
+    with pytest.raises(ValueError):
+        registry.histogram("requests_total", "请求次数", ("endpoint",))
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "请求次数", ("cache",))
+
+
+def test_histogram_bucket_boundaries_are_inclusive(registry):
+    histogram = registry.histogram("latency_seconds", "耗时", buckets=(1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+
+    sample = histogram.samples()[0]
+    assert sample["buckets"] == {"1": 2, "2": 3, "+Inf": 4}
+    assert sample["count"] == 4 and sample["sum"] == 6.0
+
+
+def test_histogram_quantiles_interpolate_within_bucket(registry):
+    histogram = registry.histogram("latency_seconds", "耗时", buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 0.5, 1.5, 1.5):
+        histogram.observe(value)
+
+    sample = histogram.samples()[0]
+    assert sample["p50"] == pytest.approx(1.0)
+    assert sample["p95"] == pytest.approx(1.9)
+    assert sample["p99"] == pytest.approx(1.98)
+
+
+def test_quantile_edge_cases():
+    bounds = (1.0, 2.0)
+    assert Histogram._quantile(bounds, [0, 0, 0], 0, 0.5) is None
+    # 落在+Inf桶中时返回最大的有限上界
+    assert Histogram._quantile(bounds, [0, 0, 3], 3, 0.5) == 2.0
+    # 跳过空桶
+    assert Histogram._quantile(bounds, [0, 2, 0], 2, 0.5) == pytest.approx(1.5)
+
+
+def test_histogram_time_records_on_exception(registry):
+    histogram = registry.histogram("stage_seconds", "耗时", ("stage",))
+    with pytest.raises(RuntimeError):
+        with histogram.time(stage="quota"):
+            raise RuntimeError("boom")
+
+    sample = histogram.samples()[0]
+    assert sample["labels"] == {"stage": "quota"} and sample["count"] == 1
+
+
+def test_prometheus_text_format(registry):
+    registry.counter("b_total", "计数", ("code",)).inc(3, code='4"5\\\n')
+    histogram = registry.histogram("a_seconds", "耗时", ("endpoint",), buckets=(0.5, 1.0))
+    histogram.observe(0.25, endpoint="gettoken")
+    histogram.observe(2, endpoint="gettoken")
+
+    assert registry.to_prometheus() == "\n".join([
+        "# HELP a_seconds 耗时",
+        "# TYPE a_seconds histogram",
+        'a_seconds_bucket{endpoint="gettoken",le="0.5"} 1',
+        'a_seconds_bucket{endpoint="gettoken",le="1"} 1',
+        'a_seconds_bucket{endpoint="gettoken",le="+Inf"} 2',
+        'a_seconds_sum{endpoint="gettoken"} 2.25',
+        'a_seconds_count{endpoint="gettoken"} 2',
+        "# HELP b_total 计数",
+        "# TYPE b_total counter",
+        'b_total{code="4\\"5\\\\\\n"} 3',
+    ]) + "\n"
+
+
+def test_snapshot_is_json_serializable_and_reset_keeps_registration(registry):
+    registry.counter("calculations_total", "计算次数", ("outcome",)).inc(outcome="success")
+    registry.histogram("stage_seconds", "耗时").observe(0.01)
+
+    snapshot = json.loads(json.dumps(registry.snapshot()))
+    assert snapshot["calculations_total"]["type"] == "counter"
+    assert snapshot["calculations_total"]["samples"] == [{"labels": {"outcome": "success"}, "value": 1}]
+    assert snapshot["stage_seconds"]["samples"][0]["count"] == 1
+
+    registry.reset()
+    assert {name: entry["samples"] for name, entry in registry.snapshot().items()} == {
+        "calculations_total": [], "stage_seconds": []
+    }
+
+
+@pytest.mark.parametrize("path, label", [
+    ("/cgi-bin/gettoken", "gettoken"),
+    ("https://qyapi.weixin.qq.com/cgi-bin/user/list?department_id=1", "user/list"),
+    ("/cgi-bin/oa/vacation/getuservacationquota", "getuservacationquota"),
+    ("/cgi-bin/oa/getapprovaldata", "getapprovaldata"),
+    ("/", "unknown")
+])
+def test_endpoint_label(path, label):
+    assert endpoint_label(path) == label
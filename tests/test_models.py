@@ -0,0 +1,67 @@
+"""值对象数据模型测试"""
+import copy
+import dataclasses
+import pickle
+from datetime import date
+
+import pytest
+
+from models import CalculationFigures, CalculationResult, Employee, LeaveBalance
+
+
+FIGURES = CalculationFigures(
+    theoretical_hours=40.0,
+    used_hours=8.0,
+    remaining_hours_before_calc=32.0,
+    resignation_date=date(2025, 6, 30),
+    time_ratio=0.5,
+    entitled_hours=20.0,
+    remaining_hours=12.0,
+    remaining_days=1.5
+)
+
+
+@pytest.mark.parametrize("value", [
+    Employee("u1", "张伟"),
+    LeaveBalance(8.0, 32.0, 40.0, 2025),
+    FIGURES,
+    CalculationResult(1.5, success=True, figures=FIGURES)
+])
+def test_value_objects_use_slots(value):
+    assert not hasattr(value, "__dict__")
+    assert pickle.loads(pickle.dumps(value)) == value
+    assert copy.deepcopy(value) == value
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        value.__setattr__(dataclasses.fields(value)[0].name, None)
+
+
+def test_slotted_defaults_preserved():
+    employee = Employee("u1", "张伟")
+    assert employee.department is None and employee.email is None
+    assert dataclasses.replace(employee, name="李娜") == Employee("u1", "李娜")
+    assert FIGURES.proration_mode == "calendar"
+    assert FIGURES.to_details()["final_remaining_hours"] == 12.0
+
+
+def test_calculation_result_legacy_constructor():
+    details = {"theoretical_hours": 40.0, "used_hours": 8.0, "time_ratio": 0.5,
+               "calculation_formula": "剩余年假 = 12小时"}
+    positional = CalculationResult(1.5, details, True, "")
+    keyword = CalculationResult(remaining_days=1.5, calculation_details=details, success=True)
+    assert positional == keyword
+    assert positional.calculation_details is details
+    assert positional.calculation_formula == "剩余年假 = 12小时"
+    assert positional.figures is None
+
+    failure = CalculationResult(0.0, {}, False, "员工不存在")
+    assert failure.calculation_details == {} and failure.error_message == "员工不存在"
+    hash(positional)
+
+
+def test_calculation_result_figures_keyword_only():
+    result = CalculationResult(remaining_days=1.5, success=True, figures=FIGURES)
+    assert result.calculation_details == FIGURES.to_details()
+    assert result.calculation_formula == FIGURES.formula()
+    with pytest.raises(TypeError):
+        CalculationResult(1.5, None, True, "", FIGURES)
+    assert dataclasses.replace(result, remaining_days=2.0).figures is FIGURES
@@ -0,0 +1,51 @@
+"""姓名模糊匹配测试"""
+import pytest
+
+from services.name_matcher import FuzzyNameIndex, name_bigrams, normalize_name
+
+
+NAMES = ["张伟", "张伟华", "陈丽", "刘洋", "欧阳娜娜"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzyNameIndex(NAMES)
+
+
+@pytest.mark.parametrize("raw, normalized", [
+    ("張偉", "张伟"),
+    ("陳麗", "陈丽"),
+    ("张 伟", "张伟"),
+    ("　刘洋 ", "刘洋"),
+    ("ＡＬＩＣＥ", "alice")
+])
+def test_normalize_name(raw, normalized):
+    assert normalize_name(raw) == normalized
+
+
+def test_name_bigrams_are_padded():
+    assert name_bigrams("张伟") == ["\x02张", "张伟", "伟\x03"]
+
+
+def test_traditional_name_matches_exactly(index):
+    assert index.search("張偉")[0] == ("张伟", 1.0)
+    assert index.search("陳麗") == [("陈丽", 1.0)]
+
+
+def test_whitespace_and_full_width_variants_match_exactly(index):
+    assert index.search("张　伟")[0] == ("张伟", 1.0)
+
+
+def test_similar_names_ranked_by_score(index):
+    results = index.search("张伟明")
+    names = [name for name, _ in results]
+    assert names[:2] == ["张伟", "张伟华"]
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 < score < 1 for score in scores)
+
+
+def test_unrelated_name_below_min_score(index):
+    assert index.search("王芳") == []
+    assert index.search("") == []
+    assert index.search("张伟", limit=0) == []
@@ -0,0 +1,41 @@
+"""姓名联想测试"""
+import pytest
+
+from services.name_suggester import NameSuggester, pinyin_initials
+
+
+NAMES = ["张伟", "张三", "王芳", "李娜", "赵敏", "Alice"]
+
+
+@pytest.fixture(scope="module")
+def suggester():
+    return NameSuggester(NAMES)
+
+
+@pytest.mark.parametrize("name, initials", [("张伟", "zw"), ("王芳", "wf"), ("李娜", "ln"), ("Alice", "alice")])
+def test_pinyin_initials(name, initials):
+    assert pinyin_initials(name) == initials
+
+
+def test_suggest_by_name_prefix(suggester):
+    assert sorted(suggester.suggest("张")) == ["张三", "张伟"]
+    assert suggester.suggest("王芳") == ["王芳"]
+
+
+def test_suggest_by_pinyin_initials(suggester):
+    assert suggester.suggest("zw") == ["张伟"]
+    assert sorted(suggester.suggest("z")) == ["张三", "张伟", "赵敏"]
+    # 不区分大小写，忽略首尾空白
+    assert suggester.suggest(" LN ") == ["李娜"]
+
+
+def test_suggest_does_not_repeat_names(suggester):
+    # Alice 的姓名和首字母键相同，只返回一次
+    assert suggester.suggest("a") == ["Alice"]
+
+
+def test_suggest_limit_and_empty_prefix(suggester):
+    assert len(suggester.suggest("z", limit=2)) == 2
+    assert suggester.suggest("z", limit=0) == []
+    assert suggester.suggest("  ") == []
+    assert suggester.suggest("q") == []
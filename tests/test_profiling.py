@@ -0,0 +1,46 @@
+"""按需性能剖析测试"""
+import threading
+
+from services.profiling import CalculationProfiler
+
+
+def _work():
+    return sum(i * i for i in range(1000))
+
+
+def test_each_mode_writes_files_outside_profiled_region(tmp_path, monkeypatch):
+    profiler = CalculationProfiler(str(tmp_path), mode="each")
+    release = threading.Event()
+    original = profiler._write
+
+    def slow_write(stats, name):
+        release.wait(5)
+        return original(stats, name)
+
+    monkeypatch.setattr(profiler, "_write", slow_write)
+
+    with profiler.profile("张 伟/测试"):
+        _work()
+    # 写文件被阻塞时计算已经返回，文件尚未生成
+    assert list(tmp_path.iterdir()) == []
+
+    release.set()
+    assert profiler.flush() is None
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert len(names) == 2
+    assert names[0].endswith("_0001_张_伟_测试.collapsed")
+    assert names[1].endswith("_0001_张_伟_测试.pstats")
+
+
+def test_run_mode_aggregates_until_flush(tmp_path):
+    profiler = CalculationProfiler(str(tmp_path), mode="run")
+    for _ in range(3):
+        with profiler.profile("calc"):
+            _work()
+    assert list(tmp_path.iterdir()) == []
+
+    path = profiler.flush()
+    assert path is not None and path.name.endswith("_run_3calc.pstats")
+    collapsed = path.with_suffix(".collapsed").read_text(encoding="utf-8")
+    assert "_work (test_profiling.py" in collapsed
+    assert profiler.flush() is None
@@ -0,0 +1,140 @@
+"""自适应限流测试"""
+import pytest
+
+from services.rate_limiter import (
+    DECREASE_COOLDOWN, INCREASE_INTERVAL, AdaptiveTokenBucket, RateLimiter, shared_rate_limiter
+)
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _config(**overrides):
+    config = {
+        "enabled": True,
+        "initial_rate": 10.0,
+        "min_rate": 1.0,
+        "max_rate": 20.0,
+        "burst": 5.0,
+        "increase_step": 2.0,
+        "decrease_factor": 0.5
+    }
+    config.update(overrides)
+    return config
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def bucket(clock):
+    return AdaptiveTokenBucket(rate=10, burst=5, min_rate=1, max_rate=20, increase_step=2,
+                               decrease_factor=0.5, endpoint="test", timer=clock)
+
+
+def test_initial_rate_is_clamped(clock):
+    assert AdaptiveTokenBucket(100, 5, 1, 20, 2, 0.5, timer=clock).rate == 20
+    assert AdaptiveTokenBucket(0.1, 5, 1, 20, 2, 0.5, timer=clock).rate == 1
+
+
+def test_burst_then_wait_at_current_rate(bucket):
+    waits = [bucket._reserve()[0] for _ in range(5)]
+    assert waits == [0.0] * 5
+    # 透支的令牌按当前速率折算为等待时间
+    assert bucket._reserve()[0] == pytest.approx(0.1)
+    assert bucket._reserve()[0] == pytest.approx(0.2)
+
+
+def test_tokens_refill_over_time(bucket, clock):
+    for _ in range(5):
+        bucket._reserve()
+    clock.advance(0.35)
+    assert [bucket._reserve()[0] for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._reserve()[0] > 0
+
+
+def test_throttle_decreases_rate_once_per_cooldown(bucket, clock):
+    _, epoch = bucket._reserve()
+    bucket.on_throttled()
+    assert bucket.rate == 5
+    # 同一批在途请求的限流响应只降速一次
+    bucket.on_throttled()
+    assert bucket.rate == 5
+    # 突发额度清零，旧预约作废
+    wait, new_epoch = bucket._reserve()
+    assert new_epoch == epoch + 1
+    assert wait == pytest.approx(1 / 5)
+
+    clock.advance(DECREASE_COOLDOWN)
+    bucket.on_throttled()
+    assert bucket.rate == 2.5
+
+
+def test_throttle_respects_min_rate(bucket, clock):
+    for _ in range(10):
+        bucket.on_throttled()
+        clock.advance(DECREASE_COOLDOWN)
+    assert bucket.rate == 1
+
+
+def test_success_increases_rate_once_per_interval(bucket, clock):
+    bucket.on_success()
+    assert bucket.rate == 10
+    clock.advance(INCREASE_INTERVAL)
+    bucket.on_success()
+    bucket.on_success()
+    assert bucket.rate == 12
+    clock.advance(INCREASE_INTERVAL)
+    bucket.on_success()
+    assert bucket.rate == 14
+
+
+def test_success_respects_max_rate(bucket, clock):
+    for _ in range(20):
+        clock.advance(INCREASE_INTERVAL)
+        bucket.on_success()
+    assert bucket.rate == 20
+
+
+def test_no_increase_within_decrease_cooldown(bucket, clock):
+    bucket.on_throttled()
+    clock.advance(DECREASE_COOLDOWN / 2)
+    bucket.on_success()
+    assert bucket.rate == 5
+    clock.advance(DECREASE_COOLDOWN / 2)
+    bucket.on_success()
+    assert bucket.rate == 7
+
+
+def test_acquire_without_waiting_inside_burst(bucket):
+    for _ in range(5):
+        bucket.acquire()
+    assert bucket._reserve()[0] > 0
+
+
+def test_rate_limiter_keeps_one_bucket_per_endpoint():
+    limiter = RateLimiter(_config())
+    quota = limiter.bucket("getuservacationquota")
+    assert limiter.bucket("getuservacationquota") is quota
+    assert limiter.bucket("user/list") is not quota
+    assert limiter.rates() == {"getuservacationquota": 10.0, "user/list": 10.0}
+
+
+def test_shared_rate_limiter():
+    assert shared_rate_limiter("test-corp-disabled", _config(enabled=False)) is None
+    limiter = shared_rate_limiter("test-corp-shared", _config())
+    # 同一企业首次创建时的配置生效
+    assert shared_rate_limiter("test-corp-shared", _config(initial_rate=99)) is limiter
+    assert shared_rate_limiter("test-corp-other", _config()) is not limiter
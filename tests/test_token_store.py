@@ -0,0 +1,137 @@
+"""access_token 文件缓存测试"""
+import errno
+import json
+import time
+
+import pytest
+
+from services import token_store as token_store_module
+from services.token_store import TokenStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TokenStore(str(tmp_path / "cache" / "token.json"))
+
+
+def test_make_key_does_not_contain_secret():
+    key = TokenStore.make_key("corp", "super-secret")
+    assert key.startswith("corp:")
+    assert "super-secret" not in key
+    assert key != TokenStore.make_key("corp", "other-secret")
+
+
+def test_save_and_load(store):
+    expires_at = time.time() + 3600
+    store.save("corp:a", "token-1", expires_at)
+    assert store.load("corp:a") == ("token-1", expires_at)
+    assert store.load("corp:b") is None
+
+
+def test_shared_between_instances(store):
+    store.save("corp:a", "token-1", time.time() + 3600)
+    other = TokenStore(str(store.path))
+    assert other.load("corp:a")[0] == "token-1"
+
+
+def test_expired_token_is_not_loaded(store):
+    store.save("corp:a", "token-1", time.time() - 1)
+    assert store.load("corp:a") is None
+
+
+def test_save_prunes_expired_entries(store):
+    store.save("corp:old", "token-old", time.time() - 1)
+    store.save("corp:a", "token-1", time.time() + 3600)
+    data = json.loads(store.path.read_text(encoding="utf-8"))
+    assert list(data) == ["corp:a"]
+
+
+def test_discard_only_matching_token(store):
+    store.save("corp:a", "token-2", time.time() + 3600)
+    # 其他进程已刷新为 token-2，作废旧的 token-1 时保留新token
+    store.discard("corp:a", "token-1")
+    assert store.load("corp:a")[0] == "token-2"
+
+    store.discard("corp:a", "token-2")
+    assert store.load("corp:a") is None
+
+
+def test_discard_without_token_removes_entry(store):
+    store.save("corp:a", "token-1", time.time() + 3600)
+    store.save("corp:b", "token-b", time.time() + 3600)
+    store.discard("corp:a")
+    assert store.load("corp:a") is None
+    assert store.load("corp:b")[0] == "token-b"
+    # 不存在的键
+    store.discard("corp:missing")
+
+
+def test_corrupt_file_is_ignored(store):
+    store.path.parent.mkdir(parents=True, exist_ok=True)
+    store.path.write_text("not json", encoding="utf-8")
+    assert store.load("corp:a") is None
+    store.save("corp:a", "token-1", time.time() + 3600)
+    assert store.load("corp:a")[0] == "token-1"
+
+
+def test_lock_is_reentrant(store):
+    with store.lock():
+        with store.lock():
+            store.save("corp:a", "token-1", time.time() + 3600)
+    assert store.load("corp:a")[0] == "token-1"
+
+
+class FakeMsvcrt:
+    """msvcrt 桩：前几次加锁按给定 errno 失败"""
+
+    LK_LOCK = 1
+    LK_UNLCK = 0
+
+    def __init__(self, errnos):
+        self.errnos = list(errnos)
+        self.calls = 0
+
+    def locking(self, fd, mode, nbytes):
+        self.calls += 1
+        if mode == self.LK_LOCK and self.errnos:
+            code = self.errnos.pop(0)
+            raise OSError(code, "locked")
+
+
+@pytest.fixture
+def windows_lock(monkeypatch):
+    def install(errnos):
+        fake = FakeMsvcrt(errnos)
+        monkeypatch.setattr(token_store_module, "_WINDOWS", True)
+        monkeypatch.setattr(token_store_module, "msvcrt", fake, raising=False)
+        return fake
+    return install
+
+
+def test_windows_lock_retries_while_locked(store, windows_lock):
+    fake = windows_lock([errno.EDEADLOCK, errno.EACCES])
+    with store.lock():
+        pass
+    assert fake.calls == 4  # 两次失败、一次成功、一次解锁
+
+
+def test_windows_lock_gives_up_after_timeout(tmp_path, windows_lock):
+    fake = windows_lock([errno.EDEADLOCK] * 100)
+    store = TokenStore(str(tmp_path / "token.json"), lock_timeout=0)
+    with pytest.raises(TimeoutError):
+        with store.lock():
+            pass
+    assert fake.calls == 1
+    # 超时后锁状态已复原，下一次加锁可以成功
+    fake.errnos.clear()
+    with store.lock():
+        pass
+
+
+def test_windows_lock_other_errors_not_retried(store, windows_lock):
+    fake = windows_lock([errno.EBADF])
+    with pytest.raises(OSError) as excinfo:
+        with store.lock():
+            pass
+    assert excinfo.value.errno == errno.EBADF
+    assert fake.calls == 1
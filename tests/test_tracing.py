@@ -0,0 +1,109 @@
+"""结构化追踪测试"""
+import logging
+import threading
+
+import pytest
+
+from services.tracing import Tracer, _LazyEvent, trace_request
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def capture():
+    return ListHandler()
+
+
+@pytest.fixture
+def logger(capture):
+    logger = logging.getLogger("test_tracing")
+    logger.propagate = False
+    logger.setLevel(logging.WARNING)
+    logger.addHandler(capture)
+    yield logger
+    logger.removeHandler(capture)
+
+
+def test_disabled_event_skips_formatting(logger, capture):
+    tracer = Tracer(logger)
+    calls = []
+
+    tracer.event("quota.response", items=lambda: calls.append(1))
+    with tracer.span("quota"):
+        pass
+
+    assert not tracer.enabled
+    assert capture.records == [] and calls == []
+
+
+def test_logger_level_enables_tracer(logger, capture):
+    logger.setLevel(logging.DEBUG)
+    Tracer(logger).event("quota.request", userid="u1")
+    assert [(r.levelno, r.getMessage()) for r in capture.records] == [(logging.DEBUG, "quota.request userid=u1")]
+
+
+def test_trace_request_forces_level(logger, capture):
+    tracer = Tracer(logger)
+    with trace_request(level=logging.INFO):
+        assert tracer.enabled
+        tracer.event("quota.matched", hours=12.5)
+    tracer.event("quota.after")
+
+    assert [(r.levelno, r.getMessage()) for r in capture.records] == [(logging.INFO, "quota.matched hours=12.5")]
+
+
+def test_trace_request_disabled_is_noop(logger, capture):
+    tracer = Tracer(logger)
+    with trace_request(enabled=False):
+        tracer.event("quota.request")
+    assert capture.records == []
+
+
+def test_forced_level_still_respects_handler_level(logger, capture):
+    capture.setLevel(logging.WARNING)
+    with trace_request(level=logging.INFO):
+        Tracer(logger).event("quota.request")
+    assert capture.records == []
+
+
+def test_forced_level_is_context_local(logger, capture):
+    tracer = Tracer(logger)
+    seen = []
+
+    def other_request():
+        seen.append(tracer.enabled)
+        tracer.event("other.request")
+
+    with trace_request():
+        worker = threading.Thread(target=other_request)
+        worker.start()
+        worker.join()
+
+    assert seen == [False] and capture.records == []
+
+
+def test_span_emits_start_and_end(logger, capture):
+    tracer = Tracer(logger)
+    with trace_request():
+        with pytest.raises(RuntimeError):
+            with tracer.span("quota", userid="u1"):
+                raise RuntimeError("boom")
+
+    start, end = [r.getMessage() for r in capture.records]
+    assert start == "quota.start userid=u1"
+    assert end.startswith("quota.end elapsed_ms=") and end.endswith(" userid=u1")
+
+
+def test_lazy_event_formatting():
+    event = _LazyEvent("quota.item", {
+        "ratio": 0.50000, "whole": 2.0, "name": "年假", "note": "a b", "empty": "",
+        "count": 3, "lazy": lambda: "computed"
+    })
+    assert str(event) == "quota.item ratio=0.5 whole=2 name=年假 note='a b' empty='' count=3 lazy=computed"
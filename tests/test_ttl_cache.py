@@ -0,0 +1,91 @@
+"""LRU + TTL 缓存测试"""
+from services.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+    cache.put("a", 1)
+
+    clock.now += 59.9
+    assert cache.get("a") == 1
+    assert "a" in cache
+
+    clock.now += 0.1
+    assert "a" not in cache
+    assert cache.get("a", "missing") == "missing"
+    # 过期条目在读取时删除
+    assert len(cache) == 0
+
+
+def test_put_resets_expiry():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+    cache.put("a", 1)
+    clock.now += 50
+    cache.put("a", 2)
+    clock.now += 50
+    assert cache.get("a") == 2
+
+
+def test_reading_does_not_extend_expiry():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+    cache.put("a", 1)
+    clock.now += 30
+    assert cache.get("a") == 1
+    clock.now += 30
+    assert cache.get("a") is None
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60, timer=FakeClock())
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # 读取 a 使其成为最近使用，写入 c 时淘汰 b
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_maxsize_disables_cache():
+    cache = TTLCache(maxsize=0, ttl=60, timer=FakeClock())
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_invalidate():
+    cache = TTLCache(maxsize=10, ttl=60, timer=FakeClock())
+    cache.put(("u1", 2024), 1)
+    cache.put(("u1", 2025), 2)
+    cache.put(("u2", 2025), 3)
+    assert cache.invalidate(("u2", 2025)) is True
+    assert cache.invalidate(("u2", 2025)) is False
+    assert cache.invalidate_where(lambda key: key[0] == "u1") == 2
+    assert len(cache) == 0
+
+
+def test_stats_count_expired_reads_as_misses():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+    cache.put("a", 1)
+    cache.get("a")
+    clock.now += 60
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 0)
+    assert stats["hit_rate"] == 1 / 3
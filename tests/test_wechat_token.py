@@ -0,0 +1,45 @@
+"""企业微信服务token失效处理测试"""
+import time
+
+import pytest
+
+from services.config_service import ConfigService
+from services.wechat_service import TokenExpiredError, WeChatWorkService
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv("WECHAT_CORP_ID", "test-corp")
+    monkeypatch.setenv("WECHAT_CORP_SECRET", "test-secret")
+    monkeypatch.setenv("WECHAT_AGENT_ID", "1000001")
+    monkeypatch.setenv("TOKEN_CACHE_FILE", str(tmp_path / "token.json"))
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    return WeChatWorkService(ConfigService(env_file=str(tmp_path / "missing.env")))
+
+
+def _expire(service, token):
+    with pytest.raises(TokenExpiredError):
+        service._handle_api_response({"errcode": 42001, "errmsg": "access_token expired"}, token)
+
+
+def test_expired_token_is_invalidated(service):
+    expires_at = time.time() + 3600
+    service._token_state = ("token-1", expires_at)
+    service._token_store.save(service._token_key, "token-1", expires_at)
+
+    _expire(service, "token-1")
+
+    assert service._current_token() is None
+    assert service._token_store.load(service._token_key) is None
+
+
+def test_late_failure_keeps_newer_token(service):
+    # 使用 token-1 的请求失败前，其他线程已刷新为 token-2
+    expires_at = time.time() + 3600
+    service._token_state = ("token-2", expires_at)
+    service._token_store.save(service._token_key, "token-2", expires_at)
+
+    _expire(service, "token-1")
+
+    assert service._current_token() == "token-2"
+    assert service._token_store.load(service._token_key)[0] == "token-2"
@@ -0,0 +1,85 @@
+"""工作日日历测试"""
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from business.workday_calendar import WorkdayCalendar
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    return WorkdayCalendar()
+
+
+def _brute_force_count(calendar, start, end):
+    count = 0
+    current = start
+    while current <= end:
+        count += calendar.is_workday(current)
+        current += timedelta(days=1)
+    return count
+
+
+def test_workdays_in_year(calendar):
+    assert calendar.workdays_in_year(2024) == 251
+    assert calendar.workdays_in_year(2025) == 248
+
+
+def test_make_up_workdays_and_holidays(calendar):
+    # 2025-01-26 周日、2025-02-08 周六为春节调休上班日
+    assert date(2025, 1, 26).weekday() == 6
+    assert calendar.is_workday(date(2025, 1, 26))
+    assert calendar.is_workday(date(2025, 2, 8))
+    # 2025-01-28 周二为春节假期
+    assert not calendar.is_workday(date(2025, 1, 28))
+    # 普通周末
+    assert not calendar.is_workday(date(2025, 1, 25))
+
+
+def test_count_workdays_cross_year(calendar):
+    # 2024-12-30、12-31 上班，2025-01-01 元旦，01-02 上班
+    assert calendar.count_workdays(date(2024, 12, 30), date(2025, 1, 2)) == 3
+    start, end = date(2024, 11, 15), date(2026, 2, 20)
+    assert calendar.count_workdays(start, end) == _brute_force_count(calendar, start, end)
+
+
+def test_count_workdays_includes_make_up_day_at_boundaries(calendar):
+    day = date(2025, 1, 26)
+    assert calendar.count_workdays(day, day) == 1
+    assert calendar.count_workdays(date(2025, 1, 25), day) == 1
+    assert calendar.count_workdays(day, day - timedelta(days=1)) == 0
+
+
+def test_time_ratio_uses_workdays(calendar):
+    assert calendar.time_ratio(date(2025, 12, 31)) == 1.0
+    through = calendar.workdays_through(date(2025, 6, 30))
+    assert calendar.time_ratio(date(2025, 6, 30)) == through / 248
+    assert calendar.ratio_table(2025)[0] == 0.0
+
+
+def test_missing_year_falls_back_to_weekdays(tmp_path):
+    data_file = tmp_path / "holidays.json"
+    data_file.write_text(json.dumps({"years": {
+        "2030": {"holidays": ["2030-01-01"], "workdays": ["2030-01-05"]}
+    }}), encoding="utf-8")
+    calendar = WorkdayCalendar(str(data_file))
+
+    assert calendar.has_year(2030)
+    assert not calendar.has_year(2031)
+    # 2030-01-05 周六调休上班，2030-01-01 周二放假
+    assert calendar.is_workday(date(2030, 1, 5))
+    assert not calendar.is_workday(date(2030, 1, 1))
+    # 2031年没有数据，按周一至周五计算
+    weekdays = sum(1 for day in range(365) if (date(2031, 1, 1) + timedelta(days=day)).weekday() < 5)
+    assert calendar.workdays_in_year(2031) == weekdays
+
+
+def test_invalid_data_file_falls_back_to_weekdays(tmp_path):
+    data_file = tmp_path / "broken.json"
+    data_file.write_text("{", encoding="utf-8")
+    calendar = WorkdayCalendar(str(data_file))
+
+    assert not calendar.has_year(2025)
+    assert calendar.is_workday(date(2025, 1, 1))
+    assert not calendar.is_workday(date(2025, 1, 26))